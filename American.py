@@ -15,7 +15,7 @@ class American(European):
 
     """
 
-    def calc_px(self, deg=5, **kwargs):
+    def calc_px(self, deg=5, basis='laguerre', bounds=False, ninner=100, **kwargs):
         """ Wrapper function that calls appropriate valuation method.
 
         Parameters
@@ -23,6 +23,20 @@ class American(European):
         deg : int
             Degree of polynomial used for least Squares Monte Carlo (LSM) method (in MC pricing).
             Normally, ``deg=5`` is used to fit 5th degree polynomial to payouts at each step in backward induction.
+        basis : {'laguerre', 'hermite', 'monomial'}
+            Basis functions of LSM regression (in MC pricing). See ``LSM``.
+        bounds : bool
+            If ``True``, MC method also estimates low-biased (``px_spec.px_lower``) and high-biased (``px_spec.px_upper``)
+            prices: the fitted exercise policy is applied to independent paths
+            and to a dual problem (with ``npaths // 10`` outer paths).
+            Variance reduction (``antithetic``, ``control_variate='european'`` or ``'underlying'``)
+            applies to the LSM price only. See ``European.calc_px()``.
+            Exercise policy is fitted on all paths. If streaming is requested (``chunk_size``, ``mem_budget``
+            or ``nworkers``), paths are streamed in chunks (blocks of ``PathGenerator.block_size()`` paths, or fewer),
+            and the policy is fitted on the first chunk only (a pilot of at least a few thousand paths is advisable)
+            and applied to the other chunks.
+        ninner : int
+            Number of inner (one-step) paths per node in a dual (high-biased) estimate. Used only if ``bounds=True``.
         kwargs : dict
             Keyword arguments (``method``, ``nsteps``, ``npaths``, ``keep_hist``, ``rng_seed``, ...)
             are passed to the parent. See ``European.calc_px()`` for details.
@@ -69,14 +83,16 @@ class American(European):
         since inn such way we discount deterministic (known-in-advance) future option prices.
         A proper technique is to determine a distribution of option prices, compute expected value and discount it
         to present, while comparing it to the option payouts at each node.
-        Among many other methods, Longstaff and Schwartz (UCLA, 2011) developed Least Squares MC (LSM) model
-        that fits a polynomial (usually, of degree 5) to the payouts at each node.
-        The fitted coefficients are used to derive the need expected value of the option price.
-        This is equivalent to computing linear regression coefficients for a dependent variable x in different powers:
+        Among many other methods, Longstaff and Schwartz (UCLA, 2001) developed Least Squares MC (LSM) model
+        that regresses discounted cash flows of in-the-money paths on basis functions of the stock price at each node.
+        The fitted coefficients are used to derive the expected (continuation) value of the option.
+        With weighted Laguerre polynomials (default basis) of scaled price x, this is a linear regression
 
-        y = a_0 + a_1*x + a_2*x^2 + a_3*x^3 + a_4*x^4 + a_5*x^5
+        y = a_0 L_0(x) e^{-x/2} + a_1 L_1(x) e^{-x/2} + ... + a_5 L_5(x) e^{-x/2}
 
         where a_i are unknown coefficients.
+        In-sample LSM price is slightly biased. Exercise policy applied to fresh paths gives a low-biased price,
+        while the dual (martingale) formulation of Andersen and Broadie gives a high-biased price.
 
         *References:*
 
@@ -148,7 +164,7 @@ class American(European):
         Returns a binomial (recombining) tree for price progression of the American option:
 
         >>> o.px_spec.opt_tree  # doctest: +ELLIPSIS
-        ((7.428401902...), (14.959088965...0.932697829...), (24.559418195..., 2.0, 0))
+        ((7.428401902...), (14.959088965...0.932697829...), (24.559418195..., 2.0, 0.0))
 
         >>> o.pxLT(nsteps=10, keep_hist=False)  # Higher precision price.  doctest: +ELLIPSIS
         7.509768467
@@ -159,7 +175,39 @@ class American(European):
 
         >>> s = Stock(S0=50, vol=.3)
         >>> American(ref=s, right='put', K=52, T=2, rf_r=.05, desc='').pxMC(nsteps=10, npaths=10, rng_seed=0)
-        8.3915333010000008
+        9.58914223
+
+        *Verifiable example:* Longstaff and Schwartz (2001), Table 1: American put with 50 exercise dates
+        is valued at 4.472 (finite difference value is 4.478). LSM price is bracketed by low and high biased estimates.
+
+        >>> o = American(ref=Stock(S0=36, vol=.2), right='put', K=40, T=1, rf_r=.06)
+        >>> o.pxMC(nsteps=50, npaths=20000, rng_seed=0, deg=3)
+        4.514017609
+        >>> o.calc_px(method='MC', nsteps=50, npaths=20000, rng_seed=0, deg=3, bounds=True).px_spec  # doctest: +ELLIPSIS
+        PriceSpec...px_lower: 4.4773...px_upper: 4.6900...
+
+        European put, valued by BS formula when the American put is exercised (or expires), is a martingale.
+        As a control variate, it cuts standard error of LSM price by an order of magnitude:
+
+        >>> o.pxMC(nsteps=50, npaths=20000, rng_seed=0, deg=3, control_variate='european')
+        4.472664549
+        >>> round(o.px_spec.stderr, 4), round(o.px_spec.vr_ratio)
+        (0.0015, 200)
+
+        The underlying is a control variate too: with dividends, ``exp(-(rf_r - q) t) S_t`` is the martingale,
+        whose mean is the spot price.
+
+        >>> o2 = American(ref=Stock(S0=50, vol=.3, q=.08), right='put', K=52, T=2, rf_r=.05)
+        >>> o2.pxMC(nsteps=50, npaths=20000, rng_seed=1, deg=3, control_variate='underlying'), o2.pxLT(nsteps=500)
+        (10.042837522, 10.023530654)
+
+        Streamed paths (in chunks of ``chunk_size``) bound memory regardless of ``npaths``. Exercise policy
+        is then fitted on the first chunk and applied out of sample to the rest, so the price is low-biased (like ``px_lower``):
+
+        >>> o.pxMC(nsteps=50, npaths=200000, rng_seed=0, deg=3, control_variate='european', chunk_size=5000)
+        4.463537788
+        >>> o.pxMC(nsteps=50, npaths=200000, rng_seed=0, deg=3, control_variate='european', chunk_size=5000, nworkers=2)
+        4.463537788
 
 
         **Compare:**
@@ -171,7 +219,7 @@ class American(European):
         >>> s = Stock(S0=40, vol=.2)
         >>> o = American(ref=s, right='put', K=35, T=.5833, rf_r=.0488, desc='Example From Hull and White 2001')
         >>> (o.pxBS(), o.pxLT(nsteps=100), o.pxMC(nsteps=100, npaths=1000, rng_seed=0, deg=5))
-        (0.432627059, 0.434706028, 0.41384716900000001)
+        (0.432627059, 0.434706028, 0.466182317)
 
         Next, we visually compare the convergence performance of 3 methods.
         Notice the scale on counters ``nsteps`` and ``npaths``.,
@@ -184,8 +232,8 @@ class American(European):
         >>> from pandas import DataFrame
         >>> d = DataFrame({'BS': dBS, 'LT': dLT, 'MC': dMC});  d   # doctest: +ELLIPSIS
                  BS        LT        MC
-        0  0.432627  0.571782  0.804060
-        1  0.432627  0.437243  0.556852
+        0  0.432627  0.571782  0.637629
+        1  0.432627  0.437243  0.488216
         ...
         >>> d.plot(grid=1, title='Price of American vs scaled iterations (3 methods)')  # doctest: +ELLIPSIS
         <matplotlib.axes._subplots.AxesSubplot...>
@@ -195,8 +243,144 @@ class American(European):
             Oleg Melnikov <xisreal@gmail.com>, Andrew Weatherly <andrewweatherly1@gmail.com>
         """
 
-        self.save2px_spec(deg=deg, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        self.save2px_spec(deg=deg, basis=basis, bounds=bounds, ninner=ninner, **kwargs)
+        return self._dispatch_px()
+
+    @staticmethod
+    def implied_vol(px, specs=None, method='LT', nsteps=100, tol=1e-8, maxiter=100, **kwargs):
+        """ Implied volatilities of a whole chain of American options, solved simultaneously for all quotes.
+
+        All quotes are priced in one batch of binomial lattices (see ``BinomialLattice``) at every iteration.
+        Vega is a forward difference of lattice prices (one more batch roll back). Iteration starts from European
+        approximation and is safeguarded by bisection, as in ``European.implied_vol()``.
+
+        Parameters
+        ----------
+        px : float, array_like
+            option prices (quotes); broadcast against specs
+        specs : dict, pandas.DataFrame, numpy.ndarray (structured), optional
+            option specs, see ``European.calc_px_batch()``. ``vol`` is not needed.
+        method : {'LT'}
+            pricing model
+        nsteps : int
+            number of time steps of binomial trees
+        tol : float
+            tolerance of price error
+        maxiter : int
+            maximum number of iterations
+        kwargs : optional
+            array_like specs ``S0``, ``K``, ``T``, ``rf_r``, ``q``, ``frf_r``, ``right``.
+
+        Returns
+        -------
+        PriceSpec
+            ``vol``, ``converged``, ``iterations`` and ``status`` arrays. See ``European.implied_vol()``.
+
+        Examples
+        --------
+        American put from J.C.Hull's OFOD, Fig.13.10, p.289 is worth 7.43 at 30% volatility (2 step tree).
+
+        >>> iv = American.implied_vol(7.428401903, S0=50, K=52, T=2, rf_r=.05, right='put', nsteps=2)
+        >>> iv.vol, iv.status
+        (array([0.3]), array(['converged'], dtype='<U9'))
+
+        >>> import numpy as np;  K = np.linspace(40, 60, 1000);  vol = np.linspace(.1, .6, 1000)
+        >>> px = [American(ref=Stock(S0=50, vol=v), right='put', K=k, T=1, rf_r=.05).pxLT(nsteps=100) for k, v in zip(K, vol)]
+        >>> iv = American.implied_vol(px, S0=50, K=K, T=1, rf_r=.05, right='put', nsteps=100)
+        >>> bool(iv.converged.all()), bool(abs(iv.vol - vol).max() < 1e-6)
+        (True, True)
+        """
+        assert method.upper() == 'LT', 'Ooops. Implied volatility of American options is available for LT method only'
+        sp = European._batch_specs(specs, **dict(kwargs, vol=np.nan))
+        px, S0, K, T, rf_r, yld, signCP = (np.ravel(x) for x in np.broadcast_arrays(
+            np.asarray(px, dtype=float), sp['S0'], sp['K'], sp['T'], sp['rf_r'], sp['q'] + sp['frf_r'], sp['signCP']))
+        dt = T / nsteps
+        price = lambda vol: American._rollback_batch(S0, vol, K, T, rf_r, yld, signCP, nsteps)[0]
+
+        def f(vol, h=1e-6):
+            px_vol = price(vol)
+            return px_vol, (price(vol + h) - px_vol) / h, None
+
+        lo = np.abs(rf_r - yld) * np.sqrt(dt) + 1e-4   # keeps risk-neutral probabilities within (0, 1)
+        vol0 = European._implied_vol_guess(px, S0, K, T, rf_r, yld, signCP)
+        out = European._solve_vol(f, px, vol0, lo=lo, hi=5., tol=tol, maxiter=maxiter)
+        return PriceSpec(method='LT', sub_method='Newton; binomial tree', **out)
+
+    @staticmethod
+    def _rollback_batch(S0, vol, K, T, rf_r, yld, signCP, nsteps):
+        """ Prices a batch of American options on binomial (CRR) lattices rolled back at once.
+
+        Parameters
+        ----------
+        S0, vol, K, T, rf_r, yld, signCP : numpy.ndarray
+            1-D arrays of specs, one element per option (``yld`` is dividend yield plus foreign risk free rate)
+        nsteps : int
+            number of time steps of every lattice
+
+        Returns
+        -------
+        tuple
+            prices (array) and the rolled back ``BinomialLattice``
+        """
+        dt = T / nsteps
+        payoff = lambda S: np.maximum(signCP[:, None] * (S - K[:, None]), 0)
+        u = np.exp(vol * np.sqrt(dt));  d = 1 / u
+        p = (np.exp((rf_r - yld) * dt) - d) / (u - d)
+        bl = BinomialLattice(S0=S0, u=u, d=d, p=p, df_dt=np.exp(-rf_r * dt), nsteps=nsteps)
+        return bl.rollback(payoff, exercise=payoff), bl
+
+    @staticmethod
+    def calc_px_batch(specs=None, method='LT', nsteps=100, greeks=False, h=1e-3, **kwargs):
+        """ Prices a whole book of American options on a batch of binomial lattices, rolled back at once.
+
+        Parameters
+        ----------
+        specs : dict, pandas.DataFrame, numpy.ndarray (structured), list of OptionSpec, optional
+            option specs, see ``European.calc_px_batch()``
+        method : {'LT'}
+            pricing model
+        nsteps : int
+            number of time steps of binomial trees
+        greeks : bool
+            If ``True``, ``greeks`` (dictionary of arrays) are also computed: delta, gamma and theta from lattice nodes,
+            vega and rho by central differences of batches with bumped volatilities (by ``h`` relative) and rates
+            (by ``h / 10``). See ``OptionValuation.calc_greeks()`` for units.
+        kwargs : optional
+            array_like specs ``S0``, ``vol``, ``K``, ``T``, ``rf_r``, ``q``, ``frf_r``, ``right``.
+
+        Returns
+        -------
+        PriceSpec
+            ``px`` array (and ``greeks``, if requested)
+
+        Examples
+        --------
+        >>> ps = American.calc_px_batch(S0=50, vol=.4, K=50, T=5/12, rf_r=.1, right=['put', 'call'], nsteps=5, greeks=True)
+        >>> ps.px
+        array([4.48845853, 6.35954586])
+
+        Batch prices and greeks are those of option objects (up to bump sizes):
+
+        >>> o = American(ref=Stock(S0=50, vol=.4), right='put', K=50, T=5/12, rf_r=.1)
+        >>> g = o.calc_greeks(method='LT', nsteps=5).px_spec.greeks
+        >>> bool(abs(o.px_spec.px - ps.px[0]) < 1e-12), [bool(abs(ps.greeks[k][0] - g[k]) < 1e-3) for k in sorted(g)]
+        (True, [True, True, True, True, True])
+        """
+        assert method.upper() == 'LT', 'Ooops. Batch pricing of American options is available for LT method only'
+        sp = European._batch_specs(specs, **kwargs)
+        shape = sp['S0'].shape
+        S0, vol, K, T, rf_r, yld, signCP = (np.ravel(x) for x in (sp['S0'], sp['vol'], sp['K'], sp['T'], sp['rf_r'],
+                                                                  sp['q'] + sp['frf_r'], sp['signCP']))
+        px, bl = American._rollback_batch(S0, vol, K, T, rf_r, yld, signCP, nsteps)
+        out = PriceSpec(px=px.reshape(shape), method='LT', sub_method='binomial tree; batch of lattices', nsteps=nsteps)
+        if greeks:
+            g = bl.greeks(dt=T / nsteps) if nsteps >= 2 else {}
+            bump = lambda **b: American._rollback_batch(**dict(dict(S0=S0, vol=vol, K=K, T=T, rf_r=rf_r, yld=yld,
+                                                                    signCP=signCP, nsteps=nsteps), **b))[0]
+            g['vega'] = (bump(vol=vol * (1 + h)) - bump(vol=vol * (1 - h))) / (2 * h * vol)
+            g['rho'] = (bump(rf_r=rf_r + h / 10) - bump(rf_r=rf_r - h / 10)) / (2 * h / 10)
+            out.add(greeks={k: g[k].reshape(shape) for k in ('delta', 'gamma', 'vega', 'theta', 'rho') if k in g})
+        return out
 
     def _calc_BS(self):
         """ Internal function for option valuation.  See ``calc_px()`` for complete documentation.
@@ -268,22 +452,12 @@ class American(European):
         :Authors:
             Oleg Melnikov <xisreal@gmail.com>
         """
-        n, keep_hist = self.px_spec.nsteps, self.px_spec.keep_hist
-        _ = self._LT_specs()
-
-        S = Vec(_['d']) ** Util.arange(n, -1, -1) * Vec(_['u']) ** Util.arange(0, n + 1) * self.ref.S0  # terminal stock prices
-        O = Vec(Util.maximum((S - self.K) * self.signCP, 0))          # terminal option payouts
-        S_tree, O_tree  = (tuple(S),), (tuple(O),)      # use tuples of floats (instead of numpy.float)
-
-        for i in range(n, 0, -1):
-            O = (O[:i] * (1 - _['p']) + O[1:] * _['p']) * _['df_dt']  #prior option prices (@time step=i-1)
-            S = S[1:i+1] * _['d']                   # prior stock prices (@time step=i-1)
-            Payout = ((S - self.K) * self.signCP).max(0)   # payout at time step i-1 (moving backward in time)
-            O = O.max(Payout)
-            S_tree, O_tree = (tuple(S),) + S_tree, (tuple(O),) + O_tree
-
-        self.px_spec.add(px=float(Util.demote(O)), sub_method='binomial tree; Hull Ch.13',
-                         ref_tree = S_tree if keep_hist else None, opt_tree = O_tree if keep_hist else None)
+        self._LT_specs()
+        bl = self._lattice()
+        payout = lambda S: np.maximum((S - self.K) * self.signCP, 0)     # terminal and early exercise payouts
+
+        px = bl.rollback(payout, exercise=payout)
+        self.px_spec.add(px=px, sub_method='binomial tree; Hull Ch.13', ref_tree=bl.ref_tree, opt_tree=bl.opt_tree)
         return self
 
     def _calc_MC(self):
@@ -292,30 +466,56 @@ class American(European):
         :Authors:
             Oleg Melnikov <xisreal@gmail.com>
         """
-        rng_seed, deg, n, m = self.px_spec.rng_seed, self.px_spec.deg, self.px_spec.nsteps, self.px_spec.npaths
-        sp = self._LT_specs()
-        dt, df = sp['dt'], sp['df_dt']
-
-        S0, vol = self.ref.S0, self.ref.vol
-        K, r, signCP = self.K, self.rf_r, self._signCP
-
-        np.random.seed(rng_seed)
-        norm_mtx = np.random.normal((r - 0.5 * vol ** 2) * dt, vol * math.sqrt(dt), (n + 1, m))
-        S = S0 * np.exp(np.cumsum(norm_mtx, axis=0))
-        S[0] = S0
-        payout = np.maximum(signCP * (S - K), 0)
-        v = np.copy(payout)  # terminal payouts
-
-        # Least-Squares Monte Carlo (LSM):
-        for i in range(n - 1, 0, -1):          # American Option Valuation by Backwards Induction
-            rg = np.polyfit(S[i], v[i + 1] * df, deg)      # fit 5th degree polynomial to PV of current inner values
-            C = np.polyval(rg, S[i])              # continuation values.
-            v[i] = np.where(payout[i] > C, payout[i], v[i + 1] * df)  # exercise decision
-        v[0] = v[1] * df
-
-        v0 = np.mean(v[0])
-        self.px_spec.add(px=v0, submethod='Least Squares Monte Carlo (LSM)')
-
+        _ = self.px_spec;   rng_seed, deg, n, m = _.rng_seed, _.deg, _.nsteps, _.npaths
+        basis, bounds, ninner = _.basis, _.bounds, _.ninner
+        df = self._LT_specs()['df_dt']
+        payout = lambda i, S: np.maximum(self._signCP * (S - self.K), 0)     # terminal and early exercise payouts
+
+        # Least-Squares Monte Carlo (LSM): regression of discounted cash flows on ITM paths at every step.
+        # Exercise policy is fitted on all paths, unless streaming is requested (``chunk_size``, ``mem_budget``,
+        # ``nworkers``). Then paths are streamed in chunks, the policy is fitted on the first (pilot) chunk
+        # and applied to the remaining chunks out of sample, so only one chunk is kept in memory
+        # and the price does not depend on ``nworkers``.
+        g = self._path_generator(nsteps=n, npaths=m, rng_seed=rng_seed)
+        lsm = LSM(deg=deg, basis=basis)
+        E0 = float(np.mean(payout(0, g.S0)))        # immediate exercise
+        stop = {}                                   # exercise steps of the current chunk
+
+        def pv(S):
+            if lsm.coef is None:
+                lsm.rollback(payout(None, S), S, df=df)
+                stop['tau'] = lsm.tau;  return lsm.pv
+            cf, stop['tau'] = lsm.apply(payout(None, S), S, df=df)
+            return cf
+
+        # Control variates: European option and the underlying (net of dividends), valued at the exercise time
+        # and discounted. Both are martingales, so their means are today's BS price and spot price (optional stopping).
+        # They are evaluated after cash flows ``pv`` of the same chunk.
+        bs = lambda S0, T: European.calc_px_batch(S0=S0, vol=self.ref.vol, K=self.K, T=T, rf_r=self.rf_r,
+                                                  q=self.ref.q, right=self.right).px
+
+        def european(S):
+            tau = stop['tau'];  S_tau = S[tau, np.arange(S.shape[1])];  T_left = self.T * (1 - tau / n)
+            return df ** tau * np.where(tau < n, bs(S_tau, np.where(tau < n, T_left, 1.)), payout(n, S_tau))
+
+        def underlying(S):
+            tau = stop['tau'];  S_tau = S[tau, np.arange(S.shape[1])]
+            return df ** tau * S_tau * np.exp(self.ref.q * self.T * tau / n)     # e^{-(r-q) tau} S_tau is a martingale
+
+        controls = dict(european=(european, lambda: float(bs(self.ref.S0, self.T))),
+                        underlying=(underlying, lambda: self.ref.S0))
+        px = self._mc_stream(g, pv, controls=controls, pilot=True)
+        self.px_spec.add(px=max(E0, px.px), sub_method='Least Squares Monte Carlo (LSM); ' + basis + ' basis')
+
+        if bounds:  # exercise policy is applied to independent paths (low bias) and to the dual problem (high bias)
+            seed = None if rng_seed is None else rng_seed + 1
+            S = self._path_generator(nsteps=n, npaths=m, rng_seed=seed, antithetic=False).paths()
+            px_lower = lsm.lower_bound(payout(None, S), S, df=df)[0]
+            g = self._path_generator(nsteps=n, npaths=max(m // 10, 2), rng_seed=None if seed is None else seed + 1,
+                                     antithetic=False)
+            px_upper = lsm.upper_bound(payout, g.paths(), df=df, successors=g.successors,
+                                       ninner=ninner, rng_seed=seed)[0]
+            self.px_spec.add(px_lower=float(px_lower), px_upper=float(px_upper))
         return self
 
     def _calc_FD(self):
@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 try: from qfrm.European import *  # production:  if qfrm package is installed
@@ -105,7 +104,7 @@ class Asian(European):
         >>> o = Asian(ref=s, right='call', K=100, T=1., rf_r=.05, desc='Nielsen, Lars. 2001. Pricing Asian Options.')
         >>> o.pxMC(nsteps=12, npaths=50000, rng_seed=1, sub_method='A', strike='K')
         ... # doctest: +ELLIPSIS
-        2.94037098...
+        2.926717295
 
         ``vol`` = 15%
 
@@ -113,7 +112,7 @@ class Asian(European):
         >>> o = Asian(ref=s, right='call', K=100, T=1., rf_r=.05, desc='Nielsen, Lars. 2001. Pricing Asian Options.')
         >>> o.pxMC(nsteps=12, npaths=50000, rng_seed=1, sub_method='A', strike='K')
         ... # doctest: +ELLIPSIS
-        5.04298420...
+        5.013745465
 
         ``vol`` = 45%
 
@@ -121,7 +120,15 @@ class Asian(European):
         >>> o = Asian(ref=s, right='call', K=100, T=1., rf_r=.05, desc='Nielsen, Lars. 2001. Pricing Asian Options.')
         >>> o.pxMC(nsteps=12, npaths=50000, rng_seed=1, sub_method='A', strike='K')
         ... # doctest: +ELLIPSIS
-        12.0311406...
+        11.978327466
+
+        Geometric average Asian (priced exactly) is an efficient control variate for the arithmetic average:
+        5000 paths and the control give a smaller standard error than 50000 paths without it.
+
+        >>> o.pxMC(nsteps=12, npaths=5000, rng_seed=1, sub_method='A', strike='K', control_variate='geometric')
+        11.971761578
+        >>> round(o.px_spec.stderr, 4), round(o.px_spec.vr_ratio)
+        (0.0171, 257)
 
         In the following example the previous test will be run with only 100 trials on a different seed.
 
@@ -129,7 +136,7 @@ class Asian(European):
         >>> o = Asian(ref=s, right='call', K=100, T=1., rf_r=.05, desc='Nielsen, Lars. 2001. Pricing Asian Options.')
         >>> o.pxMC(nsteps=12, npaths=100, rng_seed=1, sub_method='A', strike='K')
         ... # doctest: +ELLIPSIS
-        3.15932733...
+        2.746106486
 
         In the following example, a average strike geometric put with the Hull example inputs is priced.
 
@@ -137,7 +144,7 @@ class Asian(European):
         >>> o = Asian(ref=s, right='put', K=50, T=1., rf_r=.1, desc='Hull p. 610 Example 26.3')
         >>> o.pxMC(nsteps=12, npaths=50000, rng_seed=12, sub_method='G', strike='S')
         ... # doctest: +ELLIPSIS
-        0.217125523...
+        0.218166465
 
         In the following example, a vector of fixed strikes generates a vector of Asian prices and is plotted.
 
@@ -200,7 +207,7 @@ class Asian(European):
         """
 
         self.save2px_spec(sub_method=sub_method, strike=strike, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.   See ``calc_px()`` for complete documentation.
@@ -251,6 +258,27 @@ class Asian(European):
             self.px_spec.add(px=float(px), method='BSM', sub_method='Geometric')
         return self
 
+    def _greeks_BS(self, **kwargs):
+        """ Closed-form greeks of a geometric average Asian option. See ``OptionValuation.calc_greeks()``.
+
+        Price is that of a vanilla option with volatility ``vol / sqrt(3)`` and yield ``(r + q + vol^2 / 6) / 2``.
+        Hence, vega and rho pick up the sensitivity to this adjusted yield (chain rule).
+
+        Examples
+        --------
+        >>> o = Asian(ref=Stock(S0=30, vol=.3, q=.02), right='put', K=29, T=1., rf_r=.08)
+        >>> g = o.calc_greeks(method='BS').px_spec.greeks
+        >>> n = o._greeks_bump(method='BS')
+        >>> all(abs(g[k] - n[k]) < 1e-4 * (1 + abs(n[k])) for k in g)
+        True
+        """
+        _ = self
+        r, vol = _.rf_r, _.ref.vol
+        g = European._BS_greeks(_.ref.S0, _.K, _.T, vol / np.sqrt(3.), r, .5 * (r + _.ref.q + vol ** 2 / 6.), _.signCP)
+        g['vega'] = g['vega'] / np.sqrt(3.) + g['phi'] * vol / 6.
+        g['rho'] = g['rho'] + g['phi'] * .5
+        return {k: float(g[k]) for k in ('delta', 'gamma', 'vega', 'theta', 'rho')}
+
     def _calc_LT(self):
         """ Internal function for option valuation.      See ``calc_px()`` for complete documentation.
 
@@ -434,42 +462,80 @@ class Asian(European):
         #Generate evenly spaced observations of stock price with the Geometric Brownian Motion process.
         dt = T / n_steps
 
-        np.random.seed(seed=rng_seed)
-        S = S0*np.cumprod(np.exp((r-0.5*vol**2)*dt+vol*np.sqrt(dt)*np.random.randn(n_paths,n_steps)),1)
-
-        #Calculate an average stock price over (0,T] for each path by the selected sub-method.
-        S_avg = np.zeros(S.shape[1])
-        if sub_method == 'G':
-            # self.px_spec.add(sub_method='Geometric')
-            S_avg = np.exp(np.sum(np.log(S),axis=1)/(n_steps+1))
-        if sub_method == 'A':
-            # self.px_spec.add(sub_method='Arithmethic')
-            S_avg = np.mean(S,axis=1)
-
-        #The price at maturity is needed if the user wants a Average-Strike Asian option.
-        S_T = S.transpose()[n_steps-1]
-
+        gen = self._path_generator(nsteps=n_steps, npaths=n_paths, rng_seed=rng_seed)
         df = np.exp(-r*T)
 
-        #Payoffs calculated: 2 rights x 2 variants = 4 outcomes
-        #Payoffs calculated: 4 outcomes x 2 definitions of "mean" = 8 different prices
-        pay = np.zeros(S_avg.shape)
+        def payoff(S):
+            S = S[1:].T     # observations of a chunk of paths, one path per row
+
+            #Calculate an average stock price over (0,T] for each path by the selected sub-method.
+            S_avg = np.zeros(S.shape[1])
+            if sub_method == 'G':
+                # self.px_spec.add(sub_method='Geometric')
+                S_avg = np.exp(np.sum(np.log(S),axis=1)/(n_steps+1))
+            if sub_method == 'A':
+                # self.px_spec.add(sub_method='Arithmethic')
+                S_avg = np.mean(S,axis=1)
+
+            #The price at maturity is needed if the user wants a Average-Strike Asian option.
+            S_T = S.transpose()[n_steps-1]
+
+            #Payoffs calculated: 2 rights x 2 variants = 4 outcomes
+            #Payoffs calculated: 4 outcomes x 2 definitions of "mean" = 8 different prices
+            pay = np.zeros(S_avg.shape)
+            if strike == 'K':
+                if right == 'call':
+                    pay = np.maximum(0,S_avg-K) #fixed strike call
+                if right == 'put':
+                    pay = np.maximum(0,K-S_avg) #fixed strike put
+            if strike == 'S':
+                if right == 'call':
+                    pay = np.maximum(0,S_T-S_avg) #average strike call
+                if right == 'put':
+                    pay = np.maximum(0,S_avg-S_T) #average strike put
+            return df * pay
+
+        #compute the average of the distribution as the price of the option, streaming chunks of paths.
+        #Geometric average of the same observations (fixed strike) and terminal price are control variates.
+        controls = dict(underlying=(lambda S: df * S[-1], self._fwd_pv))
         if strike == 'K':
-            if right == 'call':
-                pay = np.maximum(0,S_avg-K) #fixed strike call
-            if right == 'put':
-                pay = np.maximum(0,K-S_avg) #fixed strike put
-        if strike == 'S':
-            if right == 'call':
-                pay = np.maximum(0,S_T-S_avg) #average strike call
-            if right == 'put':
-                pay = np.maximum(0,S_avg-S_T) #average strike put
-
-        #compute the average of the distribution as the price of the option.
-        v0 = sum(pay)/n_paths*df
-        self.px_spec.add(px=float(v0))
+            G = lambda S: np.exp(np.mean(np.log(S[1:]), axis=0))
+            controls['geometric'] = (lambda S: df * np.maximum(self.signCP * (G(S) - K), 0),
+                                     lambda: self._geometric_discrete_px(n_steps))
+        v0 = self._mc_stream(gen, payoff, controls=controls)
+        self.px_spec.add(px=float(v0.px))
         return self
 
+    def _geometric_discrete_px(self, n):
+        """ Exact price of a fixed strike Asian option on a geometric average of ``n`` equally spaced prices on (0,T].
+
+        Log of the geometric average is normal with mean ``ln S0 + (r - q - vol^2 / 2) * dt * (n + 1) / 2``
+        and variance ``vol^2 * dt * (n + 1) * (2n + 1) / (6n)``. Used as a control variate in MC method.
+
+        Parameters
+        ----------
+        n : int
+            number of observations (at times ``dt, 2dt, ..., T``)
+
+        Returns
+        -------
+        float
+            option price
+
+        Examples
+        --------
+        >>> o = Asian(ref=Stock(S0=100, vol=.15), right='call', K=100, T=1., rf_r=.05)
+        >>> abs(o._geometric_discrete_px(10 ** 6) - o.pxBS()) < 1e-5   # continuous average is a limit
+        True
+        """
+        S0, K, T, vol, r, q, sCP = self.ref.S0, self.K, self.T, self.ref.vol, self.rf_r, self.ref.q, self.signCP
+        dt = T / n
+        mu = math.log(S0) + (r - q - vol ** 2 / 2) * dt * (n + 1) / 2
+        sd = vol * math.sqrt(dt * (n + 1) * (2 * n + 1) / (6 * n))
+        d1 = (mu - math.log(K) + sd ** 2) / sd;     d2 = d1 - sd
+        N = Util.norm_cdf
+        return float(math.exp(-r * T) * sCP * (math.exp(mu + sd ** 2 / 2) * N(sCP * d1) - K * N(sCP * d2)))
+
     def _calc_FD(self):
         """ Internal function for option valuation. See ``calc_px()`` for complete documentation.
 
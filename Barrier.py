@@ -1,6 +1,4 @@
-import scipy.stats
 import numpy as np
-import scipy.special
 import math
 
 try: from qfrm.European import *  # production:  if qfrm package is installed
@@ -136,22 +134,31 @@ class Barrier(European):
 
 
         **MC** All examples below can be verified with DerivaGem software.
-        *Note*: you would like to get the close results you would have to use ``nsteps = 500``, ``npaths = 10000``
+        Paths are simulated at once (or in chunks of ``chunk_size`` paths, or as many as fit in ``mem_budget``).
+        Barrier is monitored continuously: chance of crossing it between time steps is accounted for
+        with a Brownian bridge. So, few time steps suffice and precision is mostly driven by ``npaths``.
 
         >>> s = Stock(S0=50, vol=.3)
         >>> o = Barrier(ref=s, right='put', K=50, T=1, rf_r=.1, desc='DerviaGem Up and Out Barrier')
         >>> o.pxMC(H=60, knock='up', dir='out', nsteps=100, rng_seed=0, npaths=100)
-        3.964058729
+        2.764418225
 
         >>> s = Stock(S0=50, vol=.3)
         >>> o = Barrier(ref=s, right='call', K=50, T=1, rf_r=.1, desc='Up and in call')
         >>> o.pxMC(H=60, knock='up', dir='in', rng_seed=0, nsteps=500, npaths=100)
-        7.173989151
+        7.384616817
 
         >>> s = Stock(S0=50, vol=.25)
         >>> o = Barrier(ref=s, right='call', K=45, T=2, rf_r=.3, desc='down and in call')
         >>> o.pxMC(H=35, knock='down', dir='in', rng_seed=4, nsteps=500, npaths=300)
-        0.041420563
+        0.150566438
+
+        Compare with the continuously monitored down-and-out call valued by **BS** method above (14.4744148):
+
+        >>> s = Stock(S0=50, vol=.25)
+        >>> o = Barrier(ref=s, right='call', K=45, T=2, rf_r=.1)
+        >>> o.pxMC(H=35, knock='down', dir='out', rng_seed=0, nsteps=10, npaths=100000)
+        14.475366614
 
         :Authors:
             Scott Morgan,
@@ -172,7 +179,7 @@ class Barrier(European):
             assert dir is not None, 'Assert failed: required input dir'
 
         self.save2px_spec(knock=knock, dir=dir, H=H, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation. See ``calc_px()`` for complete documentation.
@@ -271,6 +278,21 @@ class Barrier(European):
 
         return self
 
+    def _greeks_LT(self, **kwargs):
+        """ Tree greeks. Knock-in price comes from in-out parity (or a combinatorial sum), not from tree nodes,
+        so its greeks are computed by repricing, see ``OptionValuation._greeks_bump()``.
+
+        Examples
+        --------
+        >>> from qfrm import *
+        >>> o = Barrier(ref=Stock(S0=50, vol=.25), right='call', K=45, T=2, rf_r=.1)
+        >>> g = o.calc_greeks(method='LT', H=60, knock='up', dir='in', nsteps=200).px_spec.greeks
+        >>> [round(g[k], 3) for k in ('delta', 'gamma', 'theta')]
+        [0.905, -0.166, -4.162]
+        """
+        if self.px_spec.dir == 'in': return self._greeks_bump(method='LT', **kwargs)
+        return super()._greeks_LT(**kwargs)
+
     def _calc_LT(self):
         """ Internal function for option valuation.  See ``calc_px()`` for complete documentation.
 
@@ -291,24 +313,14 @@ class Barrier(European):
         _ = self._LT_specs()
         T, K, r, right, S0 = self.T, self.K, self.rf_r, self.right, self.ref.S0
 
-        S = S0 * _['d'] ** np.arange(n, -1, -1) * _['u'] ** np.arange(0, n + 1)  # terminal stock prices
-        S2 = np.maximum(s*(S - H),0) # Find where crossed the barrier
-        S2 = np.minimum(S2,1)  # 0 when across the barrier, 1 otherwise
-        O = np.maximum(self.signCP * (S - K), 0)
-        O = O * S2        # terminal option payouts
-        S_tree = (tuple([float(s) for s in S]),)  # use tuples of floats (instead of np.float)
-        O_tree = (tuple([float(o) for o in O]),)
+        bl = self._lattice()
+        payout = lambda S: np.maximum(self.signCP * (S - K), 0)
 
-        for i in range(n, 0, -1):
-            O = _['df_dt'] * ((1 - _['p']) * O[:i] + ( _['p']) * O[1:])  #prior option prices (@time step=i-1)
-            S = _['d'] * S[1:i+1]                   # prior stock prices (@time step=i-1)
-            S2 = np.maximum(s*(S - H),0)
-            S2 = np.minimum(S2,1)
-            O = O * S2
-            S_tree = (tuple([float(s) for s in S]),) + S_tree
-            O_tree = (tuple([float(o) for o in O]),) + O_tree
+        def knock_out(i, S, O):  # 0 when across the barrier, 1 otherwise
+            O *= np.minimum(np.maximum(s * (S - H), 0), 1)
 
-        out_px = float(Util.demote(O))
+        out_px = bl.rollback(payout, step=knock_out)
+        S_tree, O_tree = bl.ref_tree, bl.opt_tree
 
 
         if dir == 'out':
@@ -318,9 +330,10 @@ class Barrier(European):
 
             return self
 
+        from scipy.special import binom
         k = int(math.ceil(np.log(K/(S0*_['d']**n))/np.log(_['u']/_['d'])))
         h = int(math.floor(np.log(H/(S0*_['d']**n))/np.log(_['u']/_['d'])))
-        l = list(map(lambda j: scipy.special.binom(n,n-2*h+j)*(_['p']**j)*((1-_['p'])**(n-j))* \
+        l = list(map(lambda j: binom(n,n-2*h+j)*(_['p']**j)*((1-_['p'])**(n-j))* \
                                (S0*(_['u']**j)*(_['d']**(n-j))-K), range(k,n+1)))
         down_in_call = np.exp(-r*T)*sum(l)
 
@@ -360,117 +373,28 @@ class Barrier(European):
             Thawda Aung <thawda.aung1@gmail.com>
         """
 
-        _ = self;           T, K, rf_r, net_r, right, ref = _.T, _.K, _.rf_r, _.net_r, _.right, _.ref
-        _ = self.ref;       spot, sigma, q = _.S0, _.vol, _.q
+        _ = self;           T, K, rf_r, sCP = _.T, _.K, _.rf_r, _.signCP
+        _ = self.ref;       vol = _.vol
         _ = self.px_spec;   rng_seed, dir, knock, H, n, m = _.rng_seed, _.dir, _.knock, _.H, _.nsteps, _.npaths
-        Sb = H
-
-        np.random.seed(rng_seed)
-
-        def AssetPaths(spot, r, sigma, T, n, m):
-            sim_paths = np.zeros((m, n + 1))
-            sim_paths[:,0] = spot
-            dt = T / n
-            for i in range(int(m)):
-                for j in range(1,int(n +1) ):
-                    wt = np.random.randn()
-                    sim_paths[i,j] = sim_paths[i, j -1] * np.exp((r - 0.5 * sigma **2) * dt + sigma * np.sqrt(dt) * wt)
-
-            return(sim_paths)
-
-        def barrierCrossing2(spot, sb, path):
-            if sb < spot:
-                temp = [1 if i <= sb else 0 for i in path[0,]]
-                if sum(temp) > 1: knocked = 1
-                else: knocked = 0
-            else:
-                temp = [ 1 if i >= sb else 0 for i in path[0,]]
-                if sum(temp) > 1: knocked = 1
-                else: knocked = 0
-            return(knocked)
-
-        def knockedout_put(spot, Sb, K, r, T, sigma, n, m):
-            payoff = np.zeros((m, 1))
-            for i in range(m):
-                path = AssetPaths( spot, r, sigma, T, n, 1)
-                knocked = barrierCrossing(spot, Sb, path)
-                if knocked == 0: payoff[i] = max(0, K - path[0, n ])
-            return(scipy.stats.norm.fit(np.exp(-r*T) * payoff)[0])
-
-        def knockedin_put(spot, Sb, K, r, T, sigma, n, m):
-            payoff = np.zeros((m, 1))
-            for i in range(m):
-                path = AssetPaths( spot, r, sigma, T, n, 1)
-                knocked = barrierCrossing(spot, Sb, path)
-                if knocked == 1: payoff[i] = max(0, K - path[0,n])
-            return(scipy.stats.norm.fit(np.exp(-r*T) * payoff)[0])
-
-        def barrierCrossing(spot, sb, path):
-            if sb < spot:
-                temp = [1 if i <= sb else 0 for i in path[0,]]
-                if sum(temp) >= 1: knocked = 1
-                else: knocked = 0
-            else:
-                temp = [ 1 if i >= sb else 0 for i in path[0,]]
-                if sum(temp) >= 1: knocked = 1
-                else: knocked = 0
-            return(knocked)
-
-
-        def knockout_call(spot, Sb, K, r, T, sigma, n, m):
-            payoff = np.zeros((m, 1))
+        s = 1 if knock == 'down' else -1        # barrier is crossed when s * (S - H) <= 0
+        v2dt = vol ** 2 * T / n
 
-            for i in range(m):
-                path = AssetPaths(spot, r, sigma, T, n, 1 )
-                knocked = barrierCrossing(spot, Sb, path)
-                if knocked == 0: payoff[i] = max(0, path[0, n] - K)
-            return(scipy.stats.norm.fit(np.exp(-r*T) * payoff)[0])
+        df = math.exp(-rf_r * T)
 
+        def payoff(S):
+            # Distance to barrier in log space, floored at 0 for simulated prices on or across the barrier
+            L = np.log(S / H);  L *= s;  np.maximum(L, 0, out=L)
 
-        def knockin_call(spot, Sb, K, r, T, sigma, n, m):
-            payoff = np.zeros((m, 1))
-
-            for i in range(m):
-                path = AssetPaths(spot, r, sigma, T, n, 1 )
-                knocked = barrierCrossing(spot, Sb, path)
-                if knocked == 1: payoff[i] = max(0, path[0, n] - K)
-            return(scipy.stats.norm.fit(np.exp(-r*T) * payoff)[0])
-
-        px = 0
-        if dir == 'out' and right == 'call' and knock == 'down':
-            if spot > Sb: px = knockout_call(spot, Sb, K, net_r, T, sigma, n, m)
-            else: px = European(ref=ref, right='call', K=K, T=T, rf_r=rf_r, desc='reference').pxBS()
-
-        elif dir == 'in' and right == 'call' and knock == 'down':
-            if spot > Sb: px = knockin_call(spot, Sb, K, net_r, T, sigma, n, m)
-            else: px = European(ref=ref, right='call', K=K, T=T, rf_r=rf_r, desc='reference').pxBS()
-
-        elif dir == 'in' and right == 'put' and knock == 'down':
-            if spot > Sb: px = knockedin_put(spot, Sb, K, net_r, T, sigma, n, m)
-            else: px = European(ref=ref, right='put', K=K, T=T, rf_r=rf_r, desc='reference').pxBS()
-
-        elif dir == 'out' and right == 'put' and knock == 'down':
-            if spot > Sb: px = knockedout_put(spot, Sb, K, net_r, T, sigma, n, m)
-            else: px = European(ref=ref, right='put', K=K, T=T, rf_r=rf_r, desc='reference').pxBS()
-
-        elif dir == 'out' and right == 'call' and knock == 'up':
-            if spot < Sb: px = knockout_call(spot, Sb, K, net_r, T, sigma, n, m)
-            else: px = European(ref=ref, right='call', K=K, T=T, rf_r=rf_r, desc='reference').pxBS()
-
-        elif dir == 'in' and right == 'call' and knock == 'up':
-            if spot < Sb: px = knockin_call(spot, Sb, K, net_r, T, sigma, n, m)
-            else: px = European(ref=ref, right='call', K=K, T=T, rf_r=rf_r, desc='reference').pxBS()
-
-        elif dir == 'in' and right == 'put' and knock == 'up':
-            if spot < Sb: px = knockedin_put(spot, Sb, K, net_r, T, sigma, n, m)
-            else: px = European(ref=ref, right='put', K=K, T=T, rf_r=rf_r, desc='reference').pxBS()
-
-        elif dir == 'out' and right == 'put' and knock == 'up':
-            if spot < Sb: px = knockedout_put(spot, Sb, K, net_r, T, sigma, n, m)
-            else: px = European(ref=ref, right='put', K=K, T=T, rf_r=rf_r, desc='reference').pxBS()
+            # Brownian bridge: between two monitoring dates, log price hits the barrier with probability
+            # exp(-2 * L_i * L_i+1 / (vol^2 * dt)). Survival probability of a path is a product over all time steps.
+            # It is 0 if the barrier is reached at any monitoring date (L is 0 then).
+            surv = np.prod(-np.expm1(-2 / v2dt * L[:-1] * L[1:]), axis=0)
 
-        self.px_spec.add(px=float(px), sub_method='Monte Carlo Simulation')
+            payout = np.maximum(sCP * (S[-1] - K), 0)
+            return df * payout * (surv if dir == 'out' else 1 - surv)
 
+        px = self._mc_stream(self._path_generator(nsteps=n, npaths=m, rng_seed=rng_seed), payoff).px
+        self.px_spec.add(px=float(px), sub_method='Monte Carlo; Brownian bridge crossing correction')
 
         return self
 
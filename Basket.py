@@ -1,4 +1,3 @@
-import numpy.random
 import numpy as np
 
 try: from qfrm.European import *  # production:  if qfrm package is installed
@@ -20,8 +19,8 @@ class Basket(European):
                 Expected return of assets in a basket
         weight: tuple
                  Weights of assets in a basket
-        Corr: list
-                 Correlation Matrix of assets in a basket
+        corr: list, float
+                 Correlation matrix of assets in a basket, or a single correlation of all pairs of assets
         kwargs : dict
             Keyword arguments (``method``, ``nsteps``, ``npaths``, ``keep_hist``, ``rng_seed``, ...)
             are passed to the parent. See ``European.calc_px()`` for details.
@@ -49,22 +48,22 @@ class Basket(European):
         >>> o = Basket(ref=s, right='call', K=40, T=.5, rf_r=.1, desc='Hull p.612')
 
         >>> o.calc_px(method='MC',mu=(0.05,0.1,0.05),weight=(0.3,0.5,0.2),corr=[[1,0,0],[0,1,0],[0,0,1]],\
-        npaths=10,nsteps=10).px_spec # doctest: +ELLIPSIS, +NORMALIZE_WHITESPACE
-        PriceSpec...px: 14.394869309...
+        npaths=10000,nsteps=10,rng_seed=0).px_spec # doctest: +ELLIPSIS, +NORMALIZE_WHITESPACE
+        PriceSpec...px: 16.277462832...
 
         >>> s = Stock(S0=(50,85,65,80,75), vol=(.20,.10,.05,.20,.30))
         >>> o = Basket(ref=s, right='put', K=80, T=1, rf_r=.05, desc='Hull p.612')
 
         >>> o.pxMC(mu=(0.05,0,0.1,0,0),weight=(0.2,0.2,0.2,0.2,0.2),corr=[[1,0,0,0.9,0],\
         [0,1,0,0,0],[0,0,1,-0.1,0],[0.9,0,-0.1,1,0],[0,0,0,0,1]],\
-        npaths=10,nsteps=10)   # save interim results to self.px_spec. Equivalent to repr(o)
-        5.865304293
+        npaths=10000,nsteps=10,rng_seed=0)   # save interim results to self.px_spec. Equivalent to repr(o)
+        7.538984367
 
         >>> s = Stock(S0=(30,50), vol=(.20,.15))
         >>> o = Basket(ref=s, right='put', K=55, T=3, rf_r=.05, desc='Hull p.612')
 
-        >>> o.pxMC(mu=(0.06,0.05), weight=(0.4,0.6),corr=[[1,0.7],[0.7,1]], npaths=10, nsteps=10)
-        6.147189494
+        >>> o.pxMC(mu=(0.06,0.05), weight=(0.4,0.6),corr=[[1,0.7],[0.7,1]], npaths=10000, nsteps=10, rng_seed=0)
+        7.638947376
 
         >>> from pandas import Series
         >>> expiries = range(1,11)
@@ -75,13 +74,21 @@ class Basket(European):
         >>> import matplotlib.pyplot as plt
         >>> plt.show()
 
+        Large baskets are priced at once, or in chunks of ``chunk_size`` paths (or as many as fit in ``mem_budget``) to bound memory.
+        Here is an equally weighted basket of 20 stocks with pairwise correlation of 0.3:
+
+        >>> s = Stock(S0=(100,) * 20, vol=(.3,) * 20)
+        >>> o = Basket(ref=s, right='call', K=100, T=1, rf_r=.05, desc='20-name basket')
+        >>> o.pxMC(mu=(.05,) * 20, weight=(.05,) * 20, corr=.3, npaths=50000, nsteps=252, rng_seed=0, chunk_size=10000)
+        9.434699823
+
         :Authors:
           Hanting Li <hl45@rice.edu>
 
         """
 
         self.save2px_spec(mu=mu, weight=weight, corr=corr, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.  See ``calc_px()`` for complete documentation. """
@@ -97,53 +104,19 @@ class Basket(European):
         :Authors:
           Hanting Li <hl45@rice.edu>
         """
-        _ = self
-
-        # Define the parameters
-        S0, vol = _.ref.S0, _.ref.vol
-        mu, corr, n, m = _.px_spec.mu, _.px_spec.corr, _.px_spec.nsteps, _.px_spec.npaths
-
-        # Compute Deltat and number of assets
-        deltat = _.T/n
-        Nasset = len(vol)
-
-        # Compute the stock price at t
-        def calS(St,mu,sigma,param):
-            deltaS = mu*St*deltat + sigma*St*param*np.sqrt(deltat)
-            S_update = St+deltaS
-            return(S_update.item())
-
-        # Generate one path
-        def one_path(S0,mu,vol,param):
-            S0 = (S0,)
-            for i in range(n):
-                parami = param[i]
-                S0 = S0 + (calS(S0[len(S0)-1],mu,vol,parami),)
-            return(S0)
-
-        # Define n paths matrix
-        priceNpath = ()
-
-        # Compute covariance matrix from correlation matrix
-        covM = np.dot(np.dot(np.diag(vol),(corr)),np.diag(vol))
-
-        # Set seed
-        numpy.random.seed(10987)
-        # Generate random numbers
-        param = numpy.random.multivariate_normal(np.repeat(0,Nasset),covM,n)
-        param = tuple(zip(*param))
-
-        # Generate N paths
-        for i in range(m):
-            price = list(map(one_path,S0,mu,vol,param))
-            wprice = np.transpose(np.matrix(price))*np.transpose(np.matrix(_.px_spec.weight))
-            wprice = tuple(wprice.ravel().tolist()[0])
-            priceNpath = priceNpath + (wprice,)
-
-        # Terminal Payoff
-        payoff = max(0,_.signCP*(np.mean(tuple(zip(*priceNpath))[n])-_.K))
-
-        self.px_spec.add(px=float(payoff*np.exp(-_.rf_r*_.T)), sub_method='standard; Hull p.612')
+        _ = self;           T, K, rf_r, sCP = _.T, _.K, _.rf_r, _.signCP
+        _ = self.px_spec;   mu, weight, corr, m, rng_seed = _.mu, _.weight, _.corr, _.npaths, _.rng_seed
+
+        w = np.asarray(weight, dtype=float)
+        assert w.shape == np.shape(self.ref.S0), 'Ooops. Supply one weight per asset in a basket'
+
+        # Assets grow at expected returns mu (i.e. drift is mu, not net_r). Payoff depends on terminal prices only,
+        # which exact GBM simulates in a single time step. Correlated normals of all assets are drawn at once.
+        gen = self._path_generator(rf_r=np.asarray(mu, dtype=float), q=0, frf_r=0, cor=corr, nsteps=1, npaths=m, rng_seed=rng_seed)
+        df = np.exp(-rf_r * T)
+        px = self._mc_stream(gen, lambda S: df * np.maximum(sCP * (S[-1] @ w - K), 0)).px    # payoffs on weighted baskets
+
+        self.px_spec.add(px=float(px), sub_method='standard; Hull p.612')
 
         return self
 
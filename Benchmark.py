@@ -0,0 +1,370 @@
+""" Benchmarks of option pricing: run time, throughput, peak memory and accuracy of ``calc_px()``
+for every option class of qfrm and every pricing method (BS, LT, MC, FD) at several problem sizes.
+
+Results are plain JSON, so that runs of different commits (or environments) can be saved and compared.
+From the command line (in the source directory)::
+
+    python Benchmark.py --sizes small medium --out bench.json
+    python Benchmark.py --options European American --methods MC --repeat 5
+    python Benchmark.py --compare base.json bench.json --tol .2
+    python Benchmark.py --import_time
+
+Examples
+--------
+>>> r = run(options=['European'], methods=['BS', 'LT'], sizes=['small'], repeat=1)
+>>> [(x['option'], x['method'], x['size'], x['status']) for x in r['results']]
+[('European', 'BS', None, 'ok'), ('European', 'LT', 'small', 'ok')]
+>>> r['results'][1]['nsteps'], r['results'][1]['unit'], round(r['results'][1]['px'], 4), r['results'][1]['ref_px']
+(50, 'nodes', 4.7615, 4.759422393)
+>>> sorted(r['meta'])
+['commit', 'cpu_count', 'numpy', 'platform', 'python', 'time']
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+try: from qfrm.European import *  # production:  if qfrm package is installed
+except:   from European import *  # development: if not installed and running from source
+try: from qfrm.American import *  # production:  if qfrm package is installed
+except:   from American import *  # development: if not installed and running from source
+try: from qfrm.Asian import *  # production:  if qfrm package is installed
+except:   from Asian import *  # development: if not installed and running from source
+try: from qfrm.Barrier import *  # production:  if qfrm package is installed
+except:   from Barrier import *  # development: if not installed and running from source
+try: from qfrm.Basket import *  # production:  if qfrm package is installed
+except:   from Basket import *  # development: if not installed and running from source
+try: from qfrm.Bermudan import *  # production:  if qfrm package is installed
+except:   from Bermudan import *  # development: if not installed and running from source
+try: from qfrm.Binary import *  # production:  if qfrm package is installed
+except:   from Binary import *  # development: if not installed and running from source
+try: from qfrm.Boston import *  # production:  if qfrm package is installed
+except:   from Boston import *  # development: if not installed and running from source
+try: from qfrm.Chooser import *  # production:  if qfrm package is installed
+except:   from Chooser import *  # development: if not installed and running from source
+try: from qfrm.Compound import *  # production:  if qfrm package is installed
+except:   from Compound import *  # development: if not installed and running from source
+try: from qfrm.ContingentPremium import *  # production:  if qfrm package is installed
+except:   from ContingentPremium import *  # development: if not installed and running from source
+try: from qfrm.Exchange import *  # production:  if qfrm package is installed
+except:   from Exchange import *  # development: if not installed and running from source
+try: from qfrm.ForwardStart import *  # production:  if qfrm package is installed
+except:   from ForwardStart import *  # development: if not installed and running from source
+try: from qfrm.Gap import *  # production:  if qfrm package is installed
+except:   from Gap import *  # development: if not installed and running from source
+try: from qfrm.Lookback import *  # production:  if qfrm package is installed
+except:   from Lookback import *  # development: if not installed and running from source
+try: from qfrm.LowExercisePrice import *  # production:  if qfrm package is installed
+except:   from LowExercisePrice import *  # development: if not installed and running from source
+try: from qfrm.PerpetualAmerican import *  # production:  if qfrm package is installed
+except:   from PerpetualAmerican import *  # development: if not installed and running from source
+try: from qfrm.Quanto import *  # production:  if qfrm package is installed
+except:   from Quanto import *  # development: if not installed and running from source
+try: from qfrm.Shout import *  # production:  if qfrm package is installed
+except:   from Shout import *  # development: if not installed and running from source
+try: from qfrm.Spread import *  # production:  if qfrm package is installed
+except:   from Spread import *  # development: if not installed and running from source
+try: from qfrm.VarianceSwap import *  # production:  if qfrm package is installed
+except:   from VarianceSwap import *  # development: if not installed and running from source
+
+
+SIZES = {    # problem sizes of each pricing method; BS has none, so it runs once regardless of size
+    'small':  dict(LT=dict(nsteps=50),   MC=dict(nsteps=25, npaths=1000),    FD=dict(nsteps=50, npaths=50)),
+    'medium': dict(LT=dict(nsteps=200),  MC=dict(nsteps=50, npaths=10000),   FD=dict(nsteps=200, npaths=200)),
+    'large':  dict(LT=dict(nsteps=1000), MC=dict(nsteps=100, npaths=100000), FD=dict(nsteps=1000, npaths=1000)),
+}
+METHODS = ('BS', 'LT', 'MC', 'FD')
+
+
+def _case(factory, ref_px=None, **kwargs):
+    """ Benchmark case: ``factory()`` builds the option, ``kwargs`` are passed to ``calc_px()``
+    and ``ref_px`` is a published price (if ``None``, BS price of the same option is the reference).  """
+    return dict(factory=factory, ref_px=ref_px, kwargs=kwargs)
+
+
+CASES = {   # one representative option of every class, mostly from docstring examples
+    'European': _case(lambda: European(ref=Stock(S0=42, vol=.2), right='call', K=40, T=.5, rf_r=.1),
+                      ref_px=4.759422393),                                                      # Hull p.339
+    'American': _case(lambda: American(ref=Stock(S0=36, vol=.2), right='put', K=40, T=1, rf_r=.06),
+                      ref_px=4.478, deg=3),                                  # Longstaff and Schwartz (2001), FD value
+    'Asian': _case(lambda: Asian(ref=Stock(S0=30, vol=.3, q=.02), right='put', K=30., T=1., rf_r=.08)),
+    'Barrier': _case(lambda: Barrier(ref=Stock(S0=50, vol=.25), right='call', K=45, T=2, rf_r=.1),
+                     ref_px=14.47441215, H=35, knock='down', dir='out'),                       # DerivaGem
+    'Basket': _case(lambda: Basket(ref=Stock(S0=(30, 50), vol=(.2, .15)), right='put', K=55, T=3, rf_r=.05),
+                    mu=(.06, .05), weight=(.4, .6), corr=[[1, .7], [.7, 1]]),
+    'Bermudan': _case(lambda: Bermudan(ref=Stock(S0=50, vol=.6), right='put', K=52, T=2, rf_r=.1),
+                      tex=(3/12, 6/12, 9/12, 12/12, 15/12, 18/12, 21/12, 24/12)),
+    'Binary': _case(lambda: Binary(ref=Stock(S0=50, vol=.3), right='call', K=40, T=2, rf_r=.05),
+                    ref_px=641.2377341, payout_type='cash-or-nothing', Q=1000),               # DerivaGem
+    'Boston': _case(lambda: Boston(ref=Stock(S0=50, vol=.3), right='put', K=52, T=2, rf_r=.05)),
+    'Chooser': _case(lambda: Chooser(ref=Stock(S0=50, vol=.2, q=.05), right='put', K=50, T=1, rf_r=.1), tau=.5),
+    'Compound': _case(lambda: Compound(ref=American(ref=Stock(S0=90, vol=.12), right='put', K=80, T=1, rf_r=.05),
+                                       right='put', K=20, T=.5, rf_r=.05)),
+    'ContingentPremium': _case(lambda: ContingentPremium(ref=Stock(S0=1/97, vol=.2, q=.032), right='call', K=1/100,
+                                                         T=.25, rf_r=.059)),
+    'Exchange': _case(lambda: Exchange(ref=Stock(S0=(100, 100), vol=(.15, .2), q=(.04, .05)), right='call', K=40, T=1,
+                                       rf_r=.1), cor=.75),
+    'ForwardStart': _case(lambda: ForwardStart(ref=Stock(S0=60, vol=.3, q=.04), right='call', K=66, T=.75, rf_r=.08),
+                          T_s=.25),
+    'Gap': _case(lambda: Gap(ref=Stock(S0=500000, vol=.2), right='put', K=400000, T=1, rf_r=.05), K2=350000),
+    'Lookback': _case(lambda: Lookback(ref=Stock(S0=50, vol=.4), right='call', K=50, T=.25, rf_r=.1), Sfl=50.),
+    'LowExercisePrice': _case(lambda: LowExercisePrice(ref=Stock(S0=19.6, vol=.21), T=5, rf_r=.05)),
+    'PerpetualAmerican': _case(lambda: PerpetualAmerican(ref=Stock(S0=50, vol=.3, q=.01), right='call', K=50, rf_r=.08),
+                               ref_px=37.19),                                                   # CoggIt.com
+    'Quanto': _case(lambda: Quanto(ref=Stock(S0=1200, vol=.25, q=.015), right='call', K=1200, T=2, rf_r=.03, frf_r=.05),
+                    vol_ex=.12, corr=.2),
+    'Shout': _case(lambda: Shout(ref=Stock(S0=110, vol=.2, q=.04), right='call', K=100, T=.5, rf_r=.05)),
+    'Spread': _case(lambda: Spread(ref=Stock(S0=30, vol=.2), right='call', K=0, T=2, rf_r=.05),
+                    ref2=Stock(S0=31, vol=.3), rho=.4),
+    'VarianceSwap': _case(lambda: VarianceSwap(ref=Stock(S0=355, vol=(.2, .2, .2, .3, .3, .3, .3)), T=1, rf_r=.03,
+                                               K=(280, 300, 320, 340, 360, 380, 400))),
+}
+
+
+def _work(method, nsteps=None, npaths=None):
+    """ Amount of work of a pricing method and its unit: tree nodes (LT), path steps (MC) or grid nodes (FD).  """
+    if method == 'LT': return (nsteps + 1) * (nsteps + 2) / 2, 'nodes'
+    if method == 'MC': return nsteps * npaths, 'path steps'
+    if method == 'FD': return nsteps * (npaths + 1), 'grid nodes'
+    return 1, 'prices'
+
+
+def bench(option, method, size=None, repeat=3, rng_seed=0):
+    """ Benchmarks pricing of a single case.
+
+    Run time is the best of ``repeat`` runs. Peak memory (traced numpy and Python allocations) is measured
+    in a separate run, since tracing slows down Python code.
+
+    Parameters
+    ----------
+    option : str
+        name of a case in ``CASES``
+    method : {'BS', 'LT', 'MC', 'FD'}
+        pricing method
+    size : {'small', 'medium', 'large'}, None
+        problem size (see ``SIZES``); ignored for BS
+    repeat : int
+        number of timed runs
+    rng_seed : int
+        seed of MC simulation
+
+    Returns
+    -------
+    dict
+        ``option``, ``method``, ``size``, ``nsteps``, ``npaths``, ``seconds``, ``throughput`` (work ``unit`` per second),
+        ``peak_mb``, ``px``, ``ref_px``, ``abs_err`` and ``status``: ``'ok'``, ``'n/a'`` (method is not implemented,
+        no price) or an error message
+
+    Examples
+    --------
+    >>> r = bench('Barrier', 'MC', 'small', repeat=1)
+    >>> r['status'], r['npaths'], r['unit'], round(r['px'], 4), r['ref_px'], r['peak_mb'] < 10
+    ('ok', 1000, 'path steps', 14.1299, 14.47441215, True)
+    """
+    case = CASES[option]
+    sp = {} if method == 'BS' else dict(SIZES[size][method])
+    if method == 'MC': sp['rng_seed'] = rng_seed
+    rec = dict(option=option, method=method, size=None if method == 'BS' else size,
+               nsteps=sp.get('nsteps'), npaths=sp.get('npaths'), seconds=None, throughput=None, unit=None,
+               peak_mb=None, px=None, ref_px=case['ref_px'], abs_err=None, status='ok')
+
+    def price():
+        return case['factory']().calc_px(method=method, **case['kwargs'], **sp).px_spec.px
+
+    try:
+        seconds = []
+        for _ in range(max(int(repeat), 1)):
+            t = time.perf_counter();  px = price();  seconds.append(time.perf_counter() - t)
+        tracemalloc.start()
+        try:
+            price();  peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        rec['status'] = 'error: {}: {}'.format(type(e).__name__, e)
+        return rec
+
+    if px is None or not np.isfinite(float(px)):
+        rec['status'] = 'n/a'
+        return rec
+    work, unit = _work(method, **{k: sp.get(k) for k in ('nsteps', 'npaths')})
+    rec.update(seconds=min(seconds), throughput=work / max(min(seconds), 1e-9), unit=unit, peak_mb=peak / 2 ** 20,
+               px=float(px))
+    return rec
+
+
+def _meta():
+    """ Environment of a benchmark run: time, git commit, Python, numpy and platform.  """
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        commit = None
+    return dict(time=time.strftime('%Y-%m-%dT%H:%M:%S'), commit=commit, python=platform.python_version(),
+                numpy=np.__version__, platform=platform.platform(), cpu_count=os.cpu_count())
+
+
+def import_time(repeat=3, modules=('matplotlib', 'pandas', 'scipy', 'yaml')):
+    """ Time to import qfrm and price one option by BS formula, best of ``repeat`` fresh interpreters.
+
+    Parameters
+    ----------
+    repeat : int
+        number of interpreters started
+    modules : tuple of str
+        heavy packages, which are checked for having been loaded (they should be imported on first use only)
+
+    Returns
+    -------
+    dict
+        ``seconds`` (best time) and ``loaded`` (``{module: bool}``)
+
+    Examples
+    --------
+    >>> r = import_time(repeat=1)
+    >>> r['seconds'] > 0, r['loaded']
+    (True, {'matplotlib': False, 'pandas': False, 'scipy': False, 'yaml': False})
+    """
+    code = ('import sys, time; t = time.perf_counter(); from qfrm import *; '
+            'European(ref=Stock(S0=42, vol=.2), right="call", K=40, T=.5, rf_r=.1).pxBS(); '
+            'print(time.perf_counter() - t, *[m in sys.modules for m in {!r}])'.format(tuple(modules)))
+    runs = [subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)))
+            .decode().split() for _ in range(repeat)]
+    return dict(seconds=min(float(r[0]) for r in runs), loaded={m: x == 'True' for m, x in zip(modules, runs[0][1:])})
+
+
+def run(options=None, methods=None, sizes=None, repeat=3, rng_seed=0, verbose=False):
+    """ Benchmarks all (or selected) cases, pricing methods and sizes.
+
+    Cases without a published price are compared with the BS price of the same option (if available),
+    so accuracy of LT, MC and FD methods is measured against the analytical price.
+
+    Parameters
+    ----------
+    options : list of str, optional
+        names of cases (see ``CASES``). Default: all.
+    methods : list of str, optional
+        pricing methods. Default: ``METHODS``.
+    sizes : list of str, optional
+        problem sizes (see ``SIZES``). Default: all.
+    repeat : int
+        number of timed runs of each case
+    rng_seed : int
+        seed of MC simulation
+    verbose : bool
+        If ``True``, prints every result as it is completed.
+
+    Returns
+    -------
+    dict
+        ``meta`` (see ``_meta()``) and ``results`` (list of records, see ``bench()``)
+    """
+    options = list(CASES) if options is None else options
+    methods = METHODS if methods is None else methods
+    sizes = list(SIZES) if sizes is None else sizes
+    results = []
+    for o in options:
+        bs = None
+        for m in methods:
+            for s in ([None] if m == 'BS' else sizes):
+                r = bench(o, m, s, repeat=repeat, rng_seed=rng_seed)
+                if m == 'BS' and r['status'] == 'ok': bs = r['px']
+                if r['ref_px'] is None: r['ref_px'] = bs
+                if r['px'] is not None and r['ref_px'] is not None: r['abs_err'] = abs(r['px'] - r['ref_px'])
+                results.append(r)
+                if verbose: print(_format(r), file=sys.stderr)
+    return dict(meta=_meta(), results=results)
+
+
+def _format(r):
+    """ One line summary of a benchmark record.  """
+    head = '{option:18} {method:3} {size!s:7}'.format(**r)
+    if r['status'] != 'ok': return head + ' ' + r['status']
+    err = '' if r['abs_err'] is None else ' err {:.2e}'.format(r['abs_err'])
+    return head + ' {seconds:9.4f}s {throughput:10.3g} {unit}/s {peak_mb:8.2f}MB px {px:.6g}'.format(**r) + err
+
+
+def compare(base, new, tol=.1):
+    """ Regressions of a benchmark run against a baseline run: slower (by more than ``tol`` fraction of base time),
+    less accurate (larger error) or broken cases.
+
+    Parameters
+    ----------
+    base, new : dict
+        results of ``run()`` (or their JSON files, loaded with ``json.load``)
+    tol : float
+        relative tolerance of run time
+
+    Returns
+    -------
+    list of dict
+        ``option``, ``method``, ``size``, ``what`` (``'time'``, ``'accuracy'`` or ``'status'``), ``base`` and ``new`` values
+
+    Examples
+    --------
+    >>> rec = lambda sec, err, status='ok': dict(meta={}, results=[dict(option='European', method='MC', size='small',
+    ...                                          seconds=sec, abs_err=err, status=status)])
+    >>> compare(rec(1., .01), rec(1.05, .01))
+    []
+    >>> compare(rec(1., .01), rec(2., .02))     # doctest: +NORMALIZE_WHITESPACE
+    [{'option': 'European', 'method': 'MC', 'size': 'small', 'what': 'time', 'base': 1.0, 'new': 2.0},
+     {'option': 'European', 'method': 'MC', 'size': 'small', 'what': 'accuracy', 'base': 0.01, 'new': 0.02}]
+    >>> compare(rec(1., .01), rec(None, None, 'error: ValueError: ...'))[0]['what']
+    'status'
+    """
+    key = lambda r: (r['option'], r['method'], r['size'])
+    old = {key(r): r for r in base['results']}
+    out = []
+    for r in new['results']:
+        b = old.get(key(r))
+        if b is None: continue
+        diff = lambda what, x, y: out.append(dict(zip(('option', 'method', 'size'), key(r)), what=what, base=x, new=y))
+        if b['status'] != r['status']: diff('status', b['status'], r['status']);  continue
+        if r['status'] != 'ok': continue
+        if r['seconds'] > b['seconds'] * (1 + tol): diff('time', b['seconds'], r['seconds'])
+        if b['abs_err'] is not None and r['abs_err'] is not None and r['abs_err'] > b['abs_err'] * (1 + 1e-9) + 1e-12:
+            diff('accuracy', b['abs_err'], r['abs_err'])
+    return out
+
+
+def main(argv=None):
+    """ Command line interface. See module docstring.  """
+    import argparse
+    p = argparse.ArgumentParser(description='Benchmark of qfrm option pricing methods')
+    p.add_argument('--options', nargs='+', choices=sorted(CASES), help='option classes (default: all)')
+    p.add_argument('--methods', nargs='+', choices=METHODS, help='pricing methods (default: all)')
+    p.add_argument('--sizes', nargs='+', choices=list(SIZES), help='problem sizes (default: all)')
+    p.add_argument('--repeat', type=int, default=3, help='timed runs per case (best is reported)')
+    p.add_argument('--rng_seed', type=int, default=0, help='seed of MC simulation')
+    p.add_argument('--out', help='JSON file for results')
+    p.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='compare two JSON result files')
+    p.add_argument('--tol', type=float, default=.1, help='relative tolerance of run time in comparison')
+    p.add_argument('--import_time', action='store_true', help='time import of qfrm (and a BS price) only')
+    a = p.parse_args(argv)
+
+    if a.import_time:
+        json.dump(import_time(repeat=a.repeat), sys.stdout, indent=1)
+        return 0
+
+    if a.compare:
+        with open(a.compare[0]) as f0, open(a.compare[1]) as f1:
+            regressions = compare(json.load(f0), json.load(f1), tol=a.tol)
+        for d in regressions: print('{option:18} {method:3} {size!s:7} {what:8} {base} -> {new}'.format(**d))
+        return 1 if regressions else 0
+
+    r = run(a.options, a.methods, a.sizes, repeat=a.repeat, rng_seed=a.rng_seed, verbose=True)
+    if a.out:
+        with open(a.out, 'w') as f: json.dump(r, f, indent=1)
+    else:
+        json.dump(r, sys.stdout, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,3 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 try:  from qfrm.European import *  # production:  if qfrm package is installed
@@ -28,8 +27,8 @@ class Bermudan(European):
             appended to tex.
             If T > max(tex) then the largest value of tex will be replaced with T.
         R : int
-            Number of basis functions. Used to generate weighted Laguerre polynomial values.
-            Used in MC method. Must be between 0 and 6.
+            Highest degree of weighted Laguerre polynomials (basis functions of LSM regression, see ``LSM``).
+            Used in MC method. Usually, between 0 and 6.
         kwargs : dict
             Keyword arguments (``method``, ``nsteps``, ``npaths``, ``keep_hist``, ``rng_seed``, ...)
             are passed to the parent. See ``European.calc_px()`` for details.
@@ -95,6 +94,7 @@ class Bermudan(European):
         >>> Karr = np.linspace(30,70,101)
         >>> px = tuple(map(lambda i:  Bermudan(ref=Stock(50, vol=.6), right='put', K=Karr[i], T=2, rf_r=0.1).
         ... pxLT(tex=times, nsteps=20), range(Karr.shape[0])))
+        >>> import matplotlib.pyplot as plt
         >>> fig = plt.figure()
         >>> ax = fig.add_subplot(111)
         >>> ax.plot(Karr,px,label='Bermudan put') # doctest: +ELLIPSIS
@@ -119,7 +119,7 @@ class Bermudan(European):
         >>> T = 1; tex = np.arange(0.1, T + 0.1, 0.1)
         >>> o = Bermudan(ref=s, right='call', K=1200, T=T, rf_r=.03, frf_r=0.05)
         >>> o.pxMC(R=2, npaths=5, tex=tex, rng_seed=4294967295)
-        31.682017621
+        59.246091099
 
         Example #2 (verifiable): See reference [1], section 5.1 and table 5.1 with arguments N=10^2, R=3
         Uncomment to run (number of paths required is too high for doctests)
@@ -151,7 +151,7 @@ class Bermudan(European):
         >>> T = 1; tex = np.arange(0.1, T + 0.1, 0.1)
         >>> o = Bermudan(ref=s, right='put', K=15, T=T, rf_r=.01)
         >>> o.pxMC(R=3, npaths=10, tex=tex, rng_seed=4294967295, keep_hist=True)
-        4.016206951
+        6.711302266
         >>> o.plot_MC()
 
         :Authors:
@@ -173,7 +173,7 @@ class Bermudan(European):
         self.px_spec.add(nsteps_user_input=self.px_spec.nsteps)
         self.px_spec.add(nsteps=knsteps * self.px_spec.nsteps)
 
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.        """
@@ -186,29 +186,16 @@ class Bermudan(European):
             Andy Liao <Andy.Liao@rice.edu>
         """
 
-        n, keep_hist = self.px_spec.nsteps, self.px_spec.keep_hist
         _ = self._LT_specs()
+        bl = self._lattice()
+        payout = lambda S: np.maximum(self.signCP * (S - self.K), 0)
 
-        #Re-do tree steps
+        # The Bermudan condition: exercise only at scheduled times.
+        # Option values at step i are compared with payouts, if (i + 1) * dt is an exercise time.
+        ex_steps = {i for i in range(self.px_spec.nsteps) if (i + 1) * _['dt'] in self.px_spec.tex}
 
-        S = self.ref.S0 * _['d'] ** np.arange(n, -1, -1) * _['u'] ** np.arange(0, n + 1)  # terminal stock prices
-        O = np.maximum(self.signCP * (S - self.K), 0)          # terminal option payouts
-
-        S_tree = (tuple([float(s) for s in S]),)  # use tuples of floats (instead of numpy.float)
-        O_tree = (tuple([float(o) for o in O]),)
-
-        for i in range(n, 0, -1):
-            O = _['df_dt'] * ((1 - _['p']) * O[:i] + ( _['p']) * O[1:])  #prior option prices
-            S = _['d'] * S[1:i+1]                   # prior stock prices (@time step=i-1)
-            Payout = np.maximum(self.signCP * (S - self.K), 0)   # payout at time step i-1 (moving backward in time)
-            if i*_['dt'] in self.px_spec.tex:   #The Bermudan condition: exercise only at scheduled times
-                O = np.maximum(O, Payout)
-
-            S_tree = (tuple([float(s) for s in S]),) + S_tree
-            O_tree = (tuple([float(o) for o in O]),) + O_tree
-
-        self.px_spec.add(px=float(Util.demote(O)), sub_method='binomial tree; Hull Ch.13',
-                        ref_tree = S_tree if keep_hist else None, opt_tree = O_tree if keep_hist else None)
+        px = bl.rollback(payout, exercise=payout, exercise_steps=ex_steps)
+        self.px_spec.add(px=px, sub_method='binomial tree; Hull Ch.13', ref_tree=bl.ref_tree, opt_tree=bl.opt_tree)
 
         return self
 
@@ -219,124 +206,22 @@ class Bermudan(European):
             Patrick Granahan
         """
 
-        # Get arguments from calc_px
-        npaths = getattr(self.px_spec, 'npaths')
-        R = getattr(self.px_spec, 'R')
-
-        def payout(stock_price):
-            """
-            Calculates the payout of a Bermudan option at a given stock_price.
-
-            Parameters
-            ----------
-            stock_price : numpy.matrix
-                A vector of stock prices
-
-            Returns
-            -------
-            payout : numpy.matrix
-                    The vector of payouts.
-            """
-            payout = np.maximum(self.signCP * (stock_price - self.K), 0)
-            return payout
-
-        def delta_T_array():
-            """ Creates an array of time differences.
-
-            Returns
-            -------
-            delta_Ts : numpy.array
-                The array of time differences.
-            """
-            # Create an array of time differences
-            delta_Ts = np.zeros((len(self.px_spec.tex)))
-
-            # Calculate the time difference between the next exercise date and the current exercise date
-            for tex_index in range(len(self.px_spec.tex)):
-                previous_tex = 0 if tex_index == 0 else self.px_spec.tex[tex_index - 1]
-                delta_Ts[tex_index] = self.px_spec.tex[tex_index] - previous_tex
-
-            return delta_Ts
-
-        def generate_stock_price_paths(delta_Ts):
-            """
-            Generates a matrix (dimensions npaths * (tex + 1)) of stock price stock_price_paths.
-            Each row represents a path, with each column representing a snapshot of each path at a given tex.
-            An extra column is included to accomodate the start date.
-
-            An item at matrix[x][y] gets the stock price on the xth path at exercise date y.
-
-            Notes
-            -----
-            See http://nakamuraseminars.org/nsblog/2014/06/21/monte-carlo-in-python-an-example/ for more discussion
-            on how this method can be further optimized.
-
-            Parameters
-            ----------
-            delta_Ts : numpy.array
-                    An array of time differences.
-
-            Returns
-            -------
-            stock_price_paths : numpy.matrix
-                    Matrix of stock_price_paths generated.
-            """
-            # Create the zero matrix of stock_price_paths
-            paths = np.zeros((npaths, len(self.px_spec.tex) + 1))
-
-            # Seed the first column with the start prices
-            paths[:, 0] = self.ref.S0
-
-            # Fill the matrix, looping over time only
-            for tex_index in range(len(self.px_spec.tex)):
-                # Generate an array of uniform random samples, npaths in length
-                np.random.seed(self.px_spec.rng_seed)
-
-                random_samples = np.random.normal(loc=0.0, scale=1.0, size=npaths)
-
-                # Calculate the stock prices, using the standard propagation equation
-                drift = self.rf_r - self.ref.q
-                discount = np.exp(((drift - 0.5 * (self.ref.vol ** 2)) * delta_Ts[tex_index]) + (
-                    self.ref.vol * random_samples * np.sqrt(delta_Ts[tex_index])))
-                paths[:, tex_index + 1] = paths[:, tex_index] * discount
-
-            return np.matrix(paths)
-
-        # Generate stock_price_paths
-        stock_price_paths = generate_stock_price_paths(delta_T_array())
-
-        # Generate the matrix of payouts using the matrix of stock prices
-        payouts = payout(stock_price_paths)
-
-        # Copy payouts
-        terminal_payouts = np.copy(payouts)
-
-        # Step backwards through the exercise dates, halting before we get to the current date
-        for tex_index in range(len(self.px_spec.tex) - 1, 1, -1):
-            # Fit a polynomial of degree R to the stock prices at the tex against the terminal payouts at the tex + 1.
-            # Used to generate a vector of coefficients that minimises the squared error.
-            MSE_coefficients = np.polyfit(stock_price_paths[:, tex_index].A1,  # A1 reshapes (npaths, 1) to (npaths,)
-                                          terminal_payouts[:, tex_index + 1], R)
-
-            # Calculate the continuation price by evaluating the stock prices at tex_index using the MSE_coefficients
-            continuation_price = np.polyval(MSE_coefficients, stock_price_paths[:, tex_index])
-
-            # Calculate the terminal payouts on each path by looking at whether the option is exercised
-            condition = payouts[:, tex_index] > continuation_price
-            x = payouts[:, tex_index]
-            y = terminal_payouts[:, tex_index + 1]
-            terminal_payouts[:, tex_index] = np.where(condition.A1, x.A1, y)
-
-        # Calculate the payoffs on each path for the current date
-        terminal_payouts[:, 0] = terminal_payouts[:, 1]
-
-        # Find the average price across all the stock_price_paths, then record it
-        price = np.mean(terminal_payouts[:, 0])
-        self.px_spec.add(px=price)
-
-        # Record history if requested
-        if getattr(self.px_spec, 'keep_hist'):
-            self.px_spec.add(terminal_payouts=terminal_payouts, payouts=payouts, stock_price_paths=stock_price_paths)
+        _ = self.px_spec;   npaths, R, tex, rng_seed, keep_hist = _.npaths, _.R, _.tex, _.rng_seed, _.keep_hist
+
+        # Paths are simulated at exercise dates only (unequally spaced), with a discount factor for each interval
+        g = self._path_generator(T=None, nsteps=None, npaths=npaths, rng_seed=rng_seed, times=tex)
+        S = g.paths()
+        payouts = np.maximum(self.signCP * (S - self.K), 0)
+
+        # Least-Squares Monte Carlo with R + 1 weighted Laguerre polynomials. No exercise at the current date.
+        lsm = LSM(deg=R, basis='laguerre')
+        lsm.rollback(payouts, S, df=np.exp(-self.rf_r * g.dts), exercise_steps=range(1, g.nsteps), keep_hist=keep_hist)
+        px = self._mc_estimate(lsm.pv).px
+        self.px_spec.add(px=float(px), sub_method='Least Squares Monte Carlo (LSM)')
+
+        # Record history if requested: (npaths, len(tex) + 1) arrays, each row is a path
+        if keep_hist:
+            self.px_spec.add(terminal_payouts=lsm.hist.T, payouts=payouts.T, stock_price_paths=S.T)
 
         return self
 
@@ -357,6 +242,7 @@ class Bermudan(European):
         stock_price_paths = self.px_spec.stock_price_paths
 
         # Three subplots sharing both x/y axes
+        plt = Util.pyplot()
         f, (ax1, ax2, ax3) = plt.subplots(3, sharex=True, sharey=False)
 
         # The x axis will always be self.tex, with the current date prepended
@@ -213,25 +213,30 @@ class Binary(European):
 
         >>> s = Stock(S0=42, vol=.20)
         >>> o = Binary(ref=s, right='put', K=40, T=.5, rf_r=.1)
-        >>> (o.pxFD(payout_type="asset-or-nothing", nsteps=10, npaths=10), o.pxBS())  # doctest: +ELLIPSIS
-        (8.35783977, 9.27648578)
+        >>> (o.pxFD(payout_type="asset-or-nothing", nsteps=100, npaths=100), o.pxBS())  # doctest: +ELLIPSIS
+        (9.039212696, 9.27648578)
+
+        A coarse grid (here, stock prices 8.4 apart) misplaces the discontinuity of the payout:
+
+        >>> o.pxFD(payout_type="asset-or-nothing", nsteps=10, npaths=10)
+        2.772639132
 
         Example #2
 
         >>> o.update(right='call').pxFD(payout_type="asset-or-nothing", nsteps=10, npaths=10)  # doctest: +ELLIPSIS
-        29.550733261
+        39.227360868
 
         Example #3
 
         >>> s = Stock(S0=50, vol=.3)
         >>> o = Binary(ref=s, right='call', K=40, T=2, rf_r=.05)
         >>> o.pxFD(payout_type="cash-or-nothing", Q=1000, nsteps=10, npaths=10)  # doctest: +ELLIPSIS
-        473.924342837
+        553.18544757
 
         Example #4
 
         >>> o.update(right='put').pxFD(payout_type="cash-or-nothing", Q=1000, nsteps=10, npaths=10)  #doctest: +ELLIPSIS
-        154.068135942
+        165.670257049
 
         Example #5 (plot): Example of option price development (FD method) with increasing maturities
 
@@ -250,7 +255,7 @@ class Binary(European):
 
         assert payout_type in ['asset-or-nothing', 'cash-or-nothing']
         self.save2px_spec(payout_type=payout_type, Q=Q, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.
@@ -301,6 +306,23 @@ class Binary(European):
 
         return self
 
+    def _greeks_BS(self, **kwargs):
+        """ Closed-form greeks of a binary option. See ``OptionValuation.calc_greeks()``.
+
+        Examples
+        --------
+        >>> o = Binary(ref=Stock(S0=42, vol=.2), right='call', K=40, T=.5, rf_r=.1)
+        >>> g = o.calc_greeks(payout_type='cash-or-nothing', Q=10).px_spec.greeks
+        >>> n = o._greeks_bump(method='BS', payout_type='cash-or-nothing', Q=10)
+        >>> all(abs(g[k] - n[k]) < 1e-4 * (1 + abs(n[k])) for k in g)
+        True
+        """
+        _ = self
+        aon, con = European._digital_greeks(_.ref.S0, _.K, _.T, _.ref.vol, _.rf_r, _.ref.q, _.signCP)
+        if _.px_spec.payout_type.lower() == 'asset-or-nothing':
+            return {k: float(aon[k]) for k in ('delta', 'gamma', 'vega', 'theta', 'rho')}
+        return {k: float(_.px_spec.Q * con[k]) for k in ('delta', 'gamma', 'vega', 'theta', 'rho')}
+
     def _calc_LT(self):
         """ Internal function for option valuation.        See ``calc_px()`` for complete documentation.
 
@@ -372,76 +394,22 @@ class Binary(European):
             Andrew Weatherly
         """
         _ = self;       signCP, T, rf_r, K = _.signCP, _.T, _.rf_r, _.K
-        _ = self.ref;   S0, vol, q = _.S0, _.vol, _.q
-        _ = self.px_spec;    n, m, payout_type = _.nsteps, _.npaths, _.payout_type
-        S_Max, S_Min = 2 * S0, 0
+        _ = self.ref;   S0, q = _.S0, _.q
+        _ = self.px_spec;    m, payout_type = _.npaths, _.payout_type
         if payout_type == 'cash-or-nothing':        Q = getattr(_, 'Q', 5)
 
-        C = np.zeros(shape=(n + 1, m + 1))  # value grid
-        S_vec = np.linspace(S_Min, S_Max, m + 1)
-        dt = T / (n + 0.0)
-        dS = S_Max / (m + 0.0)
-        n = int(T / dt)
-        m = int(S_Max / dS)
-        df = math.exp(-rf_r * dt)
-
-        # equations defined by hull on pg. 481
-        def a(x):     return df * (.5 * dt * ((vol ** 2) * (x ** 2) - (rf_r - q) * x))
-        def b(x):     return df * (1 - dt * ((vol ** 2) * (x ** 2)))
-        def c(x):     return df * (.5 * dt * ((vol ** 2) * (x ** 2) + (rf_r - q) * x))
+        g = self._fd_grid(np.linspace(0, 2 * S0, m + 1))    # stock prices from S_Min = 0 to S_Max = 2 * S0
+        tau = T - g.t                                       # time to expiry at each time node
+        itm = lambda S: (signCP * (S - K) > 0)              # t = T: is option in the money?
 
+        # t = T and Bottom (S = 0) and Top (S = S_Max) boundary conditions
         if payout_type == 'asset-or-nothing':
-            if signCP == 1:
-                # t = T boundary conditions
-                for k in range(m + 1):
-                    S = dS * k
-                    if S > K: C[n, k] = S
-                    else:     C[n, k] = 0
-                # Top and Bottom boundary conditions
-                for i in range(n + 1):
-                    t = i * dt
-                    C[t, m] = S_Max
-                    C[t, 0] = 0
-            else:
-                # t = T boundary conditions
-                for k in range(m + 1):
-                    S = dS * k
-                    if S < K: C[n, k] = S
-                    else: C[n, k] = 0
-                # Top and Bottom boundary conditions
-                for i in range(n + 1):
-                    t = i * dt
-                    C[t, m] = 0
-                    C[t, 0] = S_Min
+            payoff = lambda S: S * itm(S)
+            lower, upper = 0, (g.S[-1] * np.exp(-q * tau) if signCP == 1 else 0)
         else:
-            if signCP == 1:
-                # t = T boundary conditions
-                for k in range(m + 1):
-                    S = dS * k
-                    if S > K: C[n, k] = Q * math.exp(-rf_r * T)
-                    else: C[n, k] = 0
-                # Top and Bottom boundary conditions
-                for i in range(n + 1):
-                    t = i * dt
-                    C[t, m] = Q * math.exp(-rf_r * (T - t))
-                    C[t, 0] = 0
-
-            else:
-                # t = T boundary conditions
-                for k in range(m + 1):
-                    S = dS * k
-                    if S < K: C[n, k] = Q * math.exp(-rf_r * T)
-                    else: C[n, k] = 0
-                # Top and Bottom boundary conditions
-                for i in range(n + 1):
-                    t = i * dt
-                    C[t, m] = 0
-                    C[t, 0] = Q * math.exp(-rf_r * (T - t))
-
-        for i in range(n - 1, -1, -1):
-            for k in range(1, m):
-                j = m - k
-                C[i, k] = a(j) * C[i + 1, k + 1] + b(j) * C[i + 1, k] + c(j) * C[i + 1, k - 1]
-
-        self.px_spec.add(px=np.interp(S0, S_vec, C[0, :]), sub_method='Implicit FDM')
+            payoff = lambda S: Q * itm(S)
+            lower, upper = (0, Q * np.exp(-rf_r * tau)) if signCP == 1 else (Q * np.exp(-rf_r * tau), 0)
+
+        g.rollback(payoff, lower=lower, upper=upper)
+        self.px_spec.add(px=g.value(S0), sub_method=g.desc[g.scheme], _FD_grid=g.FD_grid())
         return self
@@ -47,7 +47,7 @@ class Boston(European):
         8.209653751
 
         >>> o.px_spec.ref_tree
-        ((50.000000000000014,), (37.0409110340859, 67.49294037880017), (27.440581804701324, 50.00000000000001, 91.10594001952546))
+        ((50.000000000000014,), (37.040911034085894, 67.49294037880017), (27.440581804701324, 50.0, 91.10594001952546))
 
         >>> o.calc_px(method='LT', nsteps=2, keep_hist=False)  # doctest: +ELLIPSIS
         Boston...px: 8.209653751...
@@ -71,7 +71,7 @@ class Boston(European):
         """
 
         self.save2px_spec(**kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
         # self.px_spec = PriceSpec(method=method, nsteps=nsteps, npaths=npaths, keep_hist=keep_hist)
         # return getattr(self, '_calc_' + method.upper())()
 
@@ -90,33 +90,20 @@ class Boston(European):
         assert self.ref.S0 >= 0, 'S must be >= 0'
         assert self.rf_r >= 0, 'r must be >= 0'
 
-        keep_hist = self.px_spec.keep_hist
-        n = self.px_spec.nsteps
         _ = self._LT_specs()
+        bl = self._lattice()
+        payout = lambda S: np.maximum(self.signCP * (S - self.K), 0)
+
+        O = bl.rollback(payout, exercise=payout)
+        O *= math.exp(self.rf_r * self.T)     # premium is paid at expiry
+        self.px_spec.add(px=float(O), method='LT', sub_method='Binomial Tree',
+                        LT_specs=_, ref_tree=bl.ref_tree, opt_tree=bl.opt_tree)
 
-        S = self.ref.S0 * _['d'] ** np.arange(n, -1, -1) * _['u'] ** np.arange(0, n + 1)  # terminal stock prices
-        O = np.maximum(self.signCP * (S - self.K), 0)          # terminal option payouts
-        # tree = ((S, O),)
-        S_tree = (tuple([float(s) for s in S]),)  # use tuples of floats (instead of numpy.float)
-        O_tree = (tuple([float(o) for o in O]),)
-        # tree = ([float(s) for s in S], [float(o) for o in O],)
-
-        for i in range(n, 0, -1):
-            O = _['df_dt'] * ((1 - _['p']) * O[:i] + ( _['p']) * O[1:])  #prior option prices (@time step=i-1)
-            S = _['d'] * S[1:i + 1]                   # prior stock prices (@time step=i-1)
-            Payout = np.maximum(self.signCP * (S - self.K), 0)   # payout at time step i-1 (moving backward in time)
-            O = np.maximum(O, Payout)
-            # tree = tree + ((S, O),)
-            S_tree = (tuple([float(s) for s in S]),) + S_tree
-            O_tree = (tuple([float(o) for o in O]),) + O_tree
-            # tree = tree + ([float(s) for s in S], [float(o) for o in O],)
-        O *= math.exp(self.rf_r * self.T)
-        #O_tree = Util.demote([i - O for i in O_tree])
-        self.px_spec.add(px=float(Util.demote(O)), method='LT', sub_method='Binomial Tree',
-                        LT_specs=_, ref_tree = S_tree if keep_hist else None, opt_tree = O_tree if keep_hist else None)
-
-        # self.px_spec = PriceSpec(px=float(Util.demote(O)), method='LT', sub_method='binomial tree; Hull Ch.13',
-        #                 LT_specs=_, ref_tree = S_tree if save_tree else None, opt_tree = O_tree if save_tree else None)
         return self
 
+    def _greeks_LT(self, **kwargs):
+        """ Tree greeks by repricing, see ``OptionValuation._greeks_bump()``.
 
+        Premium is compounded to expiry after backward induction, so tree nodes are not values of this option.
+        """
+        return self._greeks_bump(method='LT', **kwargs)
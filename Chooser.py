@@ -1,7 +1,6 @@
 import math
 
 import numpy as np
-import scipy.linalg as la
 
 try: from qfrm.European import *  # production:  if qfrm package is installed
 except:   from European import *  # development: if not installed and running from source
@@ -104,28 +103,28 @@ class Chooser(European):
         >>> s = Stock(S0=50, vol=0.2, q=0.05)
         >>> o = Chooser(ref=s, right='put', K=60, T=6/12, rf_r=.1, desc= 'Mathworks example')
         >>> o.pxFD(tau=3/12,nsteps=100,npaths=100) # doctest: +ELLIPSIS
-        8.94395152...
+        8.943951675...
 
         Second example: coarsen the grid to increase deviation from the BSM price
 
         >>> s = Stock(S0=50, vol=0.2, q=0.05)
         >>> o = Chooser(ref=s, right='put', K=60, T=6/12, rf_r=.1, desc= 'Mathworks example')
         >>> o.pxFD(tau=3/12,nsteps=10,npaths=10) # doctest: +ELLIPSIS
-        9.49812976...
+        9.500458146...
 
         Third example: Change the maturity
 
         >>> s = Stock(S0=50, vol=0.2, q=0.05)
         >>> o = Chooser(ref=s, right='put', K=60, T=12/12, rf_r=.1, desc= 'Mathworks example')
         >>> o.pxFD(tau=3/12,nsteps=100,npaths=100) # doctest: +ELLIPSIS
-        8.49747834...
+        8.498886403...
 
         Fourth example: make choice at t=0: price collapses to a European call.
 
         >>> s = Stock(S0=50, vol=0.2, q=0.05)
         >>> o = Chooser(ref=s, right='put', K=60, T=12/12, rf_r=.1, desc= 'Mathworks example')
         >>> o.pxFD(tau=0/12,nsteps=100,npaths=100) # doctest: +ELLIPSIS
-        8.27396786...
+        8.275375928...
 
         Vectorization example with plot: exploration of tau-space.
 
@@ -156,7 +155,7 @@ class Chooser(European):
         """
         self.save2px_spec(tau=tau, **kwargs)
 
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
         # self.tau = float(tau)
         # return super().calc_px(method=method, nsteps=nsteps, npaths=npaths, keep_hist=keep_hist)
@@ -238,76 +237,27 @@ class Chooser(European):
             Andy Liao <Andy.Liao@rice.edu>
         """
 
-        #List all the parameters used in calculation
-        _ = self
-
-        S0 = _.ref.S0
-        vol = _.ref.vol
-        q = _.ref.q
-        r = _.rf_r
-        K = _.K
-        tau = _.px_spec.tau
-        T = _.T
-        N = _.px_spec.nsteps
-        M = _.px_spec.npaths
-
-        #Grid parameters
-        Smax = 2*K
-        dt = T/float(N)
-        dS = Smax/float(M)
-        ival = np.arange(M)
-        jval = np.arange(N)
-
-        #Set up grid
-        grid = np.zeros(shape=(M+1,N+1))
-        bcs = np.linspace(0,Smax,M+1)
+        _ = self;           T, K, rf_r = _.T, _.K, _.rf_r
+        _ = self.ref;       S0, q = _.S0, _.q
+        _ = self.px_spec;   tau, m = _.tau, _.npaths
 
         #Calculation as given in Hull 9e. section 26.8, page 604.
-        #We use the Crank-Nicholson method to:
         #Compute the price of a European call with maturity T and strike K
-        #Set up BC's
-        grid[:,-1] = np.maximum(bcs-K,0)
-        grid[-1,:-1] = (Smax-K)*np.exp(-r*dt*(N-jval))
-        #Set up coefficients
-        alpha = .25*dt*(vol**2*ival**2-(r-q)*ival)
-        beta = -dt*.5*(vol**2*ival**2+r)
-        gamma = .25*dt*(vol**2*ival**2+(r-q)*ival)
-        M1 = -np.diag(alpha[2:M],-1)+np.diag(1-beta[1:M])-np.diag(gamma[1:M-1],1)
-        M2 = np.diag(alpha[2:M],-1)+np.diag(1+beta[1:M])+np.diag(gamma[1:M-1],1)
-        #Populate grid
-        P, L, U = la.lu(M1)
-        for j in reversed(range(N)):
-            x1 = la.solve(L, np.dot(M2,grid[1:M,j+1]))
-            x2 = la.solve(U, x1)
-            grid[1:M,j] = x2
-        cpx = np.interp(S0,bcs,grid[:,0])
-
-        #Compute the price of a European put with maturity tau and strike K*exp(-(r-q)*(T-tau))
-        grid = np.zeros(shape=(M+1,N+1))
-        Kau = K*np.exp(-r*(T-tau))
-        S1 = S0*np.exp(-q*(T-tau))
-        Smau = 2*Kau
-        dt = tau/float(N)
-        dS = Smau/float(M)
-        bcs = np.linspace(0,Smau,M+1)
-        grid[:,-1] = np.maximum(Kau-bcs,0)
-        grid[-1,:-1] = (Kau-Smau)*np.exp(-r*dt*(N-jval))
-        #Set up coefficients
-        alpha = .25*dt*(vol**2*ival**2-(r-q)*ival)
-        beta = -dt*.5*(vol**2*ival**2+r)
-        gamma = .25*dt*(vol**2*ival**2+(r-q)*ival)
-        M1 = -np.diag(alpha[2:M],-1)+np.diag(1-beta[1:M])-np.diag(gamma[1:M-1],1)
-        M2 = np.diag(alpha[2:M],-1)+np.diag(1+beta[1:M])+np.diag(gamma[1:M-1],1)
-        #Populate grid
-        P, L, U = la.lu(M1)
-        for j in reversed(range(N)):
-            x1 = la.solve(L, np.dot(M2,grid[1:M,j+1]))
-            x2 = la.solve(U, x1)
-            grid[1:M,j] = x2
-        ppx = np.interp(S1,bcs,grid[:,0])
+        S = np.linspace(0, 2 * K, m + 1)
+        g = self._fd_grid(S)
+        g.rollback(lambda S: np.maximum(S - K, 0), lower=0,
+                   upper=S[-1] * np.exp(-q * (T - g.t)) - K * np.exp(-rf_r * (T - g.t)))
+        cpx = g.value(S0)
+
+        #Compute the price of a European put with maturity tau and strike K*exp(-r*(T-tau))
+        #on the underlying with spot price S0*exp(-q*(T-tau))
+        Kau, S1 = K * np.exp(-rf_r * (T - tau)), S0 * np.exp(-q * (T - tau))
+        gp = self._fd_grid(np.linspace(0, 2 * Kau, m + 1), T=tau)
+        gp.rollback(lambda S: np.maximum(Kau - S, 0), lower=Kau * np.exp(-rf_r * (tau - gp.t)), upper=0)
+        ppx = gp.value(S1)
 
         #Sum of above call and put prices is the Chooser price.
-        _.px_spec.add(px=cpx+ppx)
+        self.px_spec.add(px=float(cpx + ppx), sub_method=g.desc[g.scheme])
 
         return self
 
@@ -1,5 +1,4 @@
 import numpy as np
-import copy
 
 try: from qfrm.European import *  # production:  if qfrm package is installed
 except:   from European import *  # development: if not installed and running from source
@@ -52,8 +51,8 @@ class Compound(European):
         --------
 
         **FD**
-        Method is approximate and extremely unstable.
-        The answers are thus only an approximate of the BSM Solution
+        Underlying option is rolled back on the same grid (with early exercise, if it is American)
+        from its expiry to expiry of the compound option. The answers are thus only approximate on coarse grids.
 
         *Put on Put*
 
@@ -61,12 +60,13 @@ class Compound(European):
         >>> o = American(ref=s, right='put', K=80, T=1, rf_r=.05, desc='POP')
         >>> c = Compound(ref=o, right='put', K=20, T=.5, rf_r=.05)
         >>> c.pxFD(npaths=10, nsteps=10)  # doctest: +ELLIPSIS
+        19.156013152...
 
         >>> s = Stock(S0=90, vol=.12, q=.04)
         >>> o = American(ref=s, right='put', K=80, T=1, rf_r=.05, desc='POP')
         >>> c = Compound(ref=o, right='put', K=20, T=.5, rf_r=.05)
         >>> c.calc_px(method='FD', npaths=10, nsteps=10)  # doctest: +ELLIPSIS
-        Compound...19.505177573...
+        Compound...18.474869363...
 
         *Call on Put*
 
@@ -74,7 +74,7 @@ class Compound(European):
         >>> o = American(ref=s, right='put', K=80, T=12./12, rf_r=.05, desc='COP')
         >>> c = Compound(ref=o, right='call', K = 20, T=6./12, rf_r=.05)
         >>> c.pxFD(npaths=10, nsteps=10)  # doctest: +ELLIPSIS
-        Compound...0.000112479...
+        0.009913304...
 
         *Put on Call*
 
@@ -82,7 +82,7 @@ class Compound(European):
         >>> o = American(ref=s, right='call', K=80, T=1, rf_r=.05, desc='POC')
         >>> c = Compound(ref=o, right='put', K = 20, T=.5, rf_r=.05)
         >>> c.pxFD(npaths=10, nsteps=10)  # doctest: +ELLIPSIS
-        10.465470970...
+        8.884519151...
 
         *Call on Call*
 
@@ -90,7 +90,7 @@ class Compound(European):
         >>> o = American(ref=s, right='call', K=80, T=1, rf_r=.05, desc='COC')
         >>> c = Compound(ref=o, right='call', K=20, T=.5, rf_r=.05)
         >>> c.pxFD(npaths=10, nsteps=10)  # doctest: +ELLIPSIS
-        0.190332192...
+        0.808320804...
 
         # >>> s = Stock(S0=90, vol=.12, q=.04)
         # >>> o = American(ref=s, right='call', K=80, T=1, rf_r=.05, desc='COC')
@@ -103,8 +103,8 @@ class Compound(European):
         :Authors:
             Scott Morgan
        """
-        self.save_specs(**kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        self.save2px_spec(**kwargs)
+        return self._dispatch_px()
 
     def _calc_LT(self):
         """ Internal function for option valuation.   See ``calc_px()`` for complete documentation.     """
@@ -125,51 +125,26 @@ class Compound(European):
             Scott Morgan
         """
 
-        # todo: computations are off after updating. verify.
-
-        o2 = copy.deepcopy(self.ref)  # safer way of messing with attributes of underlying option.
-        _ = self;   T1, K1, rf_r1, right1, ref1, sCP1 = _.T, _.K, _.rf_r, _.right, _.ref, _.signCP # option o1 on option o2
-        _ = o2;     T2, K2, rf_r2, right2, ref2 = _.T, _.K, _.rf_r, _.right, _.ref  # option o2 on stock ref
+        _ = self;           T1, K1, rf_r1, sCP1 = _.T, _.K, _.rf_r, _.signCP   # option o1 on option o2
+        _ = self.ref;       T2, K2, rf_r2, sCP2 = _.T, _.K, _.rf_r, _.signCP   # option o2 on stock ref
         _ = self.ref.ref;   S0, vol, q = _.S0, _.vol, _.q
         _ = self.px_spec;   n, m = _.nsteps, _.npaths
 
-        x = np.matrix(np.zeros(shape=(n+1, m+1)))  # Define grid
-
-        # Cache parameters
-        Smax = S0 * 2 if sCP1 else 3
-        dt = T1 / (n + 0.0)
-        dS = Smax / (m + 0.0)
-        n = int(T1 / dt)
-        m = int(Smax / dS)
-        df = np.exp(-rf_r1 * dt)
-
-        o2.T = T2 - T1   # time remaining between two expiry dates. Underlying option's expiry (T2) is longer.
-        o2.ref.S0 = Smax;        Smax_price = o2.pxLT(nsteps=30)
-        o2.ref.S0 = 0;           Smin_price = o2.pxLT(nsteps=30)
-
-        # FINAL CONDITIONS
-        for i in range(0, m + 1):
-            o2.ref.S0 = dS * i
-            x[n, i] = np.maximum(sCP1*(o2.pxLT(nsteps=30) - K1), 0)
-
-        # BOUNDARY CONDITIONS
-        def bc(S):
-            it = map(lambda i: (np.maximum(sCP1 * (S - K1), 0) * np.exp(-rf_r1 * (n - i) * dt)), range(0, n + 1))
-            return np.matrix(list(it)).transpose()
-        x[:,0], x[:,m] = bc(Smax_price), bc(Smin_price)
-
-        # EQUATIONS
-        def a(j): return df*(.5*dt*((vol**2)*(j**2)-(rf_r1-q)*j))
-        def b(j): return df*(1 - dt*((vol**2)*(j**2)))
-        def c(j): return df*(.5*dt*((vol**2)*(j**2)+(rf_r1-q)*j))
-
-        # CALCULATE THROUGH GRID
-        for i in np.arange(n-1, -1, -1):
-            for k in range(1, m):
-                j = m-k
-                x[i, k] = a(j) * x[i+1, k+1] + b(j) * x[i+1, k] + c(j) * x[i+1, k-1]
-
-        self.px_spec.add(px=float(x[0, m - S0 / dS]), sub_method='Explicit FDM')
+        S = np.linspace(0, S0 * 2, m + 1)     # Define grid of stock prices, up to Smax = 2 * S0
+        exercise = (lambda S: np.maximum(sCP2 * (S - K2), 0)) if self.ref.style == 'American' else None
+
+        # UNDERLYING OPTION: roll o2 back from its expiry (T2) to expiry of o1 (T1), on the same grid
+        g2 = self._fd_grid(S, T=T2 - T1, rf_r=rf_r2, vol=vol, q=q)
+        bc2 = K2 * np.exp(-rf_r2 * (T2 - T1 - g2.t)) if exercise is None else K2 * np.ones(n + 1)
+        lower, upper = (0, S[-1] * np.exp(-q * (T2 - T1 - g2.t)) - bc2) if sCP2 == 1 else (bc2, 0)
+        o2_px = g2.rollback(lambda S: np.maximum(sCP2 * (S - K2), 0), lower=lower, upper=upper, exercise=exercise)
+
+        # FINAL AND BOUNDARY CONDITIONS of o1: payout on o2 price at T1, discounted at boundaries
+        g = self._fd_grid(S, T=T1, rf_r=rf_r1, vol=vol, q=q)
+        bc = lambda px2: np.maximum(sCP1 * (px2 - K1), 0) * np.exp(-rf_r1 * (T1 - g.t))
+        g.rollback(lambda S: np.maximum(sCP1 * (o2_px - K1), 0), lower=bc(o2_px[0]), upper=bc(o2_px[-1]))
+
+        self.px_spec.add(px=g.value(S0), sub_method=g.desc[g.scheme], _FD_grid=g.FD_grid())
 
         return self
 
@@ -1,7 +1,6 @@
 import math
 
 import numpy as np
-import scipy.optimize
 
 try: from qfrm.European import *  # production:  if qfrm package is installed
 except:   from European import *  # development: if not installed and running from source
@@ -57,9 +56,9 @@ class ContingentPremium(European):
         >>> s = Stock(S0=1/97, vol=.2, q=.032)
         >>> o = ContingentPremium(ref=s, right='call', K=1/100, T=.25, rf_r=.059)
         >>> o.pxMC(nsteps=100, npaths=100, rng_seed=3)
-        0.000682276
+        0.00103081
         >>> o.calc_px(method='MC', nsteps=100, npaths=100, rng_seed=3)  # doctest: +ELLIPSIS
-        ContingentPremium...px: 0.000682276...
+        ContingentPremium...px: 0.00103081...
 
         >>> s = Stock(S0=45, vol=.3, q=.02)
         >>> o = ContingentPremium(ref=s, right='call', K=52, T=3, rf_r=.05)
@@ -72,13 +71,14 @@ class ContingentPremium(European):
         >>> s = Stock(S0=100, vol=.4)
         >>> o = ContingentPremium(ref=s, right='put', K=100, T=1, rf_r=.08)
         >>> o.pxMC(nsteps=100, npaths=100, rng_seed=3)
-        33.079676917
+        27.156011781
         >>> o.calc_px(method='MC', nsteps=100, npaths=100, rng_seed=3)  # doctest: +ELLIPSIS, +NORMALIZE_WHITESPACE
-        ContingentPremium...px: 33.079676917...
+        ContingentPremium...px: 27.156011781...
 
         >>> s = Stock(S0=50, vol=.2, q=.01)
         >>> strike = range(40, 61)
         >>> o = [ContingentPremium(ref=s, right='call', K=strike[i], T=1, rf_r=.05).pxLT(nsteps=100) for i in range(0, 21)]
+        >>> import matplotlib.pyplot as plt
         >>> plt.plot(strike, o, label='Changing Strike') # doctest: +ELLIPSIS
         [<matplotlib.lines.Line2D object at...
         >>> plt.xlabel('Strike Price') # doctest: +ELLIPSIS
@@ -95,7 +95,7 @@ class ContingentPremium(European):
             Andrew Weatherly
         """
         self.save2px_spec(**kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
         # self.px_spec = PriceSpec(method=method, nsteps=nsteps, npaths=npaths, keep_hist=keep_hist)
         # return getattr(self, '_calc_' + method.upper())()
 
@@ -150,7 +150,8 @@ class ContingentPremium(European):
             px = px_call if self.signCP == 1 else px_put if self.signCP == -1 else None
             return px - vanilla
 
-        option_price = scipy.optimize.root(binary, vanilla, method='hybr') #finds the binary price that we need
+        from scipy.optimize import root
+        option_price = root(binary, vanilla, method='hybr') #finds the binary price that we need
         option_price = option_price.x
         self.px_spec.add(px=float(Util.demote(option_price)), method='LT', sub_method='Binomial Tree',
                         LT_specs=_)
@@ -165,20 +166,15 @@ class ContingentPremium(European):
         :Authors:
             Andrew Weatherly
         """
-        np.random.seed(self.px_spec.rng_seed)
         n = self.px_spec.nsteps
         npaths = self.px_spec.npaths
 
         dt = self.T / n
         df = math.exp(-(self.rf_r - self.ref.q) * dt)
-        St = self.ref.S0 * np.exp(np.cumsum(np.random.normal((self.rf_r - self.ref.q - 0.5 * self.ref.vol ** 2) * dt,
-                                                             self.ref.vol * math.sqrt(dt), (n + 1, npaths)), axis=0))
-        St[0] = self.ref.S0
+        St = self._path_generator(nsteps=n, npaths=npaths, rng_seed=self.px_spec.rng_seed).paths()
         payout = np.maximum(self.signCP * (St - self.K), 0)
-        v = np.copy(payout)
-        for i in range(n - 1, -1, -1):
-            v[i] = v[i + 1] * df
-        vanilla = np.mean(v[0])
+        e = self._mc_estimate(df ** n * payout[-1])
+        vanilla = e.px
 
         def binary(Q):
             #  Calculate d1 and d2
@@ -193,9 +189,15 @@ class ContingentPremium(European):
             px = px_call if self.signCP == 1 else px_put if self.signCP == -1 else None
             return px - vanilla
 
-        option_price = scipy.optimize.root(binary, vanilla, method='hybr') #finds the binary price that we need
-        option_price = option_price.x
-        self.px_spec.add(px=float(Util.demote(option_price)), method='MC', sub_method='Monte Carlo Simulation')
+        from scipy.optimize import root
+        option_price = root(binary, vanilla, method='hybr') #finds the binary price that we need
+        option_price = float(Util.demote(option_price.x))
+
+        # premium is proportional to the simulated vanilla price, and so are its standard error and confidence interval
+        scale = option_price / vanilla if vanilla else float('nan')
+        if self.px_spec.stderr is not None:     # not estimated for Sobol paths, see _mc_save()
+            self.px_spec.add(stderr=e.stderr * scale, ci=tuple(x * scale for x in e.ci()))
+        self.px_spec.add(px=option_price, method='MC', sub_method='Monte Carlo Simulation')
         return self
 
     def _calc_FD(self):
@@ -3,6 +3,15 @@ import math
 try: from qfrm.OptionValuation import *  # production:  if qfrm package is installed
 except:   from OptionValuation import *  # development: if not installed and running from source
 
+try: from qfrm.Lattice import *  # production:  if qfrm package is installed
+except:   from Lattice import *  # development: if not installed and running from source
+
+try: from qfrm.MonteCarlo import *  # production:  if qfrm package is installed
+except:   from MonteCarlo import *  # development: if not installed and running from source
+
+try: from qfrm.FiniteDifference import *  # production:  if qfrm package is installed
+except:   from FiniteDifference import *  # development: if not installed and running from source
+
 
 class European(OptionValuation):
     """ Financial option derivative of `American <https://en.wikipedia.org/wiki/Option_style>`_ style."""
@@ -40,6 +49,40 @@ class European(OptionValuation):
             (non-negative) integer used to seed random number generator (RNG) for MC pricing.
 
             ``None`` -- no seeding; generates random sequence for MC
+        chunk_size : int, optional
+            MC pricers that support it simulate paths in chunks of at most ``chunk_size`` paths (bounds memory use).
+            Price does not depend on ``chunk_size`` (except for models fitted on the first chunk, ex. LSM policy,
+            which is fitted on all paths, unless ``chunk_size``, ``mem_budget`` or ``nworkers`` is given).
+        mem_budget : float, optional
+            memory budget (in MB) of MC simulation. Paths are streamed in chunks sized to fit the budget
+            (see ``PathGenerator.paths_per_chunk()``), and payoff statistics are accumulated online (see ``MCEstimate.add()``).
+            So, peak memory does not grow with ``npaths``. Ignored, if ``chunk_size`` is given.
+        nworkers : int, optional
+            MC pricers that stream paths run in parallel on ``nworkers`` processes (``-1`` uses all CPUs).
+            Paths are split into blocks, each drawn from its own random stream spawned from ``rng_seed``
+            (see ``PathGenerator.block_paths()``), in parallel and serial (``nworkers=None``) pricing alike.
+            So, the price depends on ``rng_seed``, but not on ``nworkers``.
+        sampler : {'pseudo', 'sobol'}, optional
+            source of random shocks of MC pricers (see ``PathGenerator``): pseudo-random numbers (default)
+            or scrambled Sobol sequence with Brownian bridge (quasi-MC), which needs far fewer paths for smooth payoffs.
+        antithetic : bool, optional
+            If ``True``, MC pricers simulate antithetic pairs of paths (``npaths`` must be even).
+        control_variate : str, list, bool, optional
+            MC pricers regress out built-in control variates with known expectations, ex. ``'underlying'``
+            (discounted terminal price of the underlying), ``'european'`` (vanilla option priced by BS formula)
+            or ``'geometric'`` (geometric average Asian). ``True`` uses all controls available for the option.
+            Variance reduction ratio (``vr_ratio``) and effective number of paths (``npaths_eff``) are saved in ``px_spec``,
+            along with standard error (``stderr``), 95% confidence interval (``ci``) and run time in seconds (``elapsed``)
+            of every MC price. With ``sampler='sobol'``, Sobol points are not independent, so the i.i.d. error estimates
+            do not apply: ``stderr``, ``ci``, ``vr_ratio`` and ``npaths_eff`` are left as ``None``.
+        target_stderr : float, optional
+            MC pricers keep adding batches of paths (with seeds ``rng_seed + 1``, ``rng_seed + 2``, ...) until standard error
+            of the pooled price is at most ``target_stderr``. Batch sizes are projected from the current standard error.
+            Not available with ``sampler='sobol'``.
+        max_npaths : int, optional
+            limit of the total number of paths in ``target_stderr`` mode. Default: ``100 * npaths``.
+        scheme : {'CN', 'implicit', 'explicit'}, optional
+            time stepping scheme of FD pricers, which run on ``FDGrid``. Default: Crank-Nicolson.
 
         Returns
         -------
@@ -100,6 +143,12 @@ class European(OptionValuation):
         >>> o.update(right='call').pxBS()
         4.759422393
 
+        *Verifiable example:* dividend yield ``q`` enters both ``d1`` and the spot discount (Black-Scholes-Merton).
+        See J.C.Hull's OFOD, Example 17.1: an option on a stock index yielding 3% is worth 51.83.
+
+        >>> European(ref=Stock(S0=930, vol=.2, q=.03), right='call', K=900, T=2/12, rf_r=.08).pxBS()
+        51.832956796
+
 
         **LT:**
 
@@ -130,7 +179,7 @@ class European(OptionValuation):
         Here are tree nodes of (recombining) binomial tree for the progression of prices of the European stock.
 
         >>> o.calc_px(method='LT', nsteps=2, keep_hist=True).px_spec.opt_tree
-        ((53.39471637496134,), (5.062315192620067, 100.66143225703827), (0, 10.0, 189.3362341097378))
+        ((53.39471637496134,), (5.062315192620067, 100.66143225703827), (0.0, 10.0, 189.3362341097378))
 
         A complete output of all calculated values leading to the option price.
 
@@ -143,7 +192,7 @@ class European(OptionValuation):
         >>> s = Stock(S0=810, vol=.2, q=.02)
         >>> o = European(ref=s, right='call', K=800, T=.5, rf_r=.05, desc='53.39, Hull p.291')
         >>> o.pxMC(nsteps=10, npaths=10, rng_seed=1)
-        74.747081425000005
+        14.508735441
 
         **Compare:**
 
@@ -154,7 +203,43 @@ class European(OptionValuation):
         >>> s = Stock(S0=42, vol=.20)
         >>> o = European(ref=s, right='put', K=40, T=.5, rf_r=.1, desc='call @0.81, put @4.76, Hull p.339')
         >>> (o.pxBS(), o.pxLT(nsteps=100), o.pxMC(nsteps=100, npaths=1000, rng_seed=0))
-        (0.808599373, 0.810995338, 0.73588733399999995)
+        (0.808599373, 0.810995338, 0.758294249)
+
+        Quasi-Monte Carlo (scrambled Sobol points) is much closer to BS price with the same number of paths:
+
+        >>> o.pxMC(nsteps=1, npaths=1024, rng_seed=0), o.pxMC(nsteps=1, npaths=1024, rng_seed=0, sampler='sobol')
+        (0.691866782, 0.808319185)
+
+        Sobol points are not independent, so no (i.i.d.) standard error is reported for them:
+
+        >>> o.px_spec.stderr is None, o.px_spec.ci is None
+        (True, True)
+
+        Variance reduction: antithetic paths and the terminal stock price as a control variate.
+
+        >>> o.pxMC(nsteps=1, npaths=1024, rng_seed=0, antithetic=True, control_variate='underlying')
+        0.788537656
+        >>> round(o.px_spec.stderr, 4), round(o.px_spec.vr_ratio, 1)
+        (0.0113, 23.0)
+
+        A memory budget (in MB) streams paths in chunks: peak memory of a million paths stays within the budget,
+        while the price is the same as from all paths at once.
+
+        >>> import tracemalloc;  tracemalloc.start()
+        >>> o.pxMC(nsteps=1, npaths=10**6, rng_seed=0, mem_budget=1)
+        0.806652249
+        >>> tracemalloc.get_traced_memory()[1] < 2 * 2 ** 20;  tracemalloc.stop()
+        True
+        >>> o.pxMC(nsteps=1, npaths=10**6, rng_seed=0)
+        0.806652249
+
+        Parallel simulation on a pool of processes: blocks of paths have their own random streams,
+        so the price is reproducible for any number of workers, and it is the same as the serial price above.
+
+        >>> [o.pxMC(nsteps=1, npaths=10**6, rng_seed=0, nworkers=w) for w in (1, 4)]
+        [0.806652249, 0.806652249]
+        >>> o.pxMC(nsteps=10, npaths=20000, rng_seed=0) == o.pxMC(nsteps=10, npaths=20000, rng_seed=0, nworkers=2)
+        True
 
         Next, we visually compare the convergence performance of 3 methods.
         Notice the scale on counters ``nsteps`` and ``npaths``.
@@ -172,7 +257,7 @@ class European(OptionValuation):
         """
 
         self.save2px_spec(**kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def save2px_spec(self, method='BS', nsteps=None, npaths=None, keep_hist=False, rng_seed=None, **kwargs):
 
@@ -208,8 +293,8 @@ class European(OptionValuation):
         # if calc of both prices is cheap, do both and include them into Price object.
         # Price.px should always point to the price of interest to the user
         # Save values as basic data types (int, floats, str), instead of np.array
-        px_call = float(_.ref.S0 * math.exp(-_.ref.q * _.T) * Nd1 - _.K * math.exp(-_.rf_r * _.T) * Nd2)
-        px_put = float(- _.ref.S0 * math.exp(-_.ref.q * _.T) * N_d1 + _.K * math.exp(-_.rf_r * _.T) * N_d2)
+        px_call = float(_._fwd_pv() * Nd1 - _.K * math.exp(-_.rf_r * _.T) * Nd2)
+        px_put = float(- _._fwd_pv() * N_d1 + _.K * math.exp(-_.rf_r * _.T) * N_d2)
         px = px_call if _.signCP == 1 else px_put if _.signCP == -1 else None
 
         self.px_spec.add(px=px, sub_method='standard; Hull p.335', px_call=px_call, px_put=px_put)
@@ -225,25 +310,12 @@ class European(OptionValuation):
         if not self.style == 'European': return self   # if (exotic) sub-class inherits this method, don't calculate
 
         _ = self._LT_specs()
-        n = self.px_spec.nsteps
-        incr_n, decr_n = Vec(Util.arange(0, n + 1)), Vec(Util.arange(n, -1)) #Vectorized tuple. See Util.py. 0..n; n..0.
-
-        S = Vec(_['d'])**decr_n * Vec(_['u'])**incr_n * self.ref.S0
-        O = ((S - self.K) * self.signCP ).max(0)
-        S_tree = O_tree = None
-
-        if getattr(self.px_spec, 'keep_hist', False):
-            S_tree, O_tree = (tuple(S),), (tuple(O),)
-
-            for i in range(n, 0, -1):
-                O = (O[:i] * (1 - _['p']) + O[1:] * (_['p'])) * _['df_dt']  # prior option prices (@time step=i-1)
-                S = S[1:i+1] * _['d']                   # prior stock prices (@time step=i-1)
-                S_tree, O_tree = (tuple(S),) + S_tree, (tuple(O),) + O_tree
-            out = O_tree[0][0]
-        else:
-            csl = (0.,) + Vec(Util.cumsum(Util.log(Util.arange(1, n + 1))))         # logs avoid overflow & truncation
-            tmp = Vec(csl[n]) - csl - tuple(reversed(csl)) + incr_n * math.log(_['p']) + decr_n * math.log(1 - _['p'])
-            out = (sum(tmp.exp * _['df_T'] * tuple(O)))
+        bl = self._lattice()
+        payoff = lambda S: np.maximum((S - self.K) * self.signCP, 0)
+
+        # path-independent payoff needs no backward induction, unless the trees are requested
+        out = bl.rollback(payoff) if self.px_spec.keep_hist else bl.expectation(payoff)
+        S_tree, O_tree = bl.ref_tree, bl.opt_tree
 
         self.px_spec.add(px=float(out), sub_method='binary tree; Hull p.135', LT_specs=_, ref_tree=S_tree, opt_tree=O_tree)
         return self
@@ -261,24 +333,165 @@ class European(OptionValuation):
         m = getattr(self.px_spec, 'npaths', 3)
         Seed = getattr(self.px_spec, 'rng_seed', None)
 
-        ltsp = self._LT_specs()
-        dt, df = ltsp['dt'], ltsp['df_dt']
-        S0, vol = self.ref.S0, self.ref.vol
-        K, r, signCP = self.K, self.rf_r, self._signCP
+        gen = self._path_generator(nsteps=n, npaths=m, rng_seed=Seed)
+        df = math.exp(-self.rf_r * self.T)
+        payout = lambda S: df * np.maximum(self._signCP * (S[-1] - self.K), 0)  # discounted terminal payouts
 
-        np.random.seed(Seed)
-        norm_mtx = np.random.normal((r - 0.5 * vol ** 2) * dt, vol * math.sqrt(dt), (n + 1, m))
-        S = S0 * np.exp(np.cumsum(norm_mtx, axis=0))
-        S[0] = S0
-        payout = np.maximum(signCP * (S - K), 0)
-        v = np.copy(payout)  # terminal payouts
+        v0 = self._mc_stream(gen, payout, controls=dict(underlying=(lambda S: df * S[-1], self._fwd_pv)))
+        self.px_spec.add(px=float(v0.px), sub_method='Monte Carlo simulation')
 
-        for i in range(n - 1, -1, -1):  v[i] = v[i + 1] * df  # discount to present, step by step (can also do at once)
+        return self
 
-        v0 = np.mean(v[0])
-        self.px_spec.add(px=v0, submethod='Least Squares Monte Carlo (LSM)')
+    def _fwd_pv(self):
+        """ Present value of the underlying delivered at expiry, ``S0 * exp(-q * T)``, a mean of control variate.  """
+        return self.ref.S0 * math.exp(-(self.ref.q + (self.frf_r or 0)) * self.T)
 
-        return self
+    def _mc_estimate(self, Y, controls=None):
+        """ Price estimate from discounted payoffs of simulated paths, with variance reduction requested in ``px_spec``.
+
+        Standard error, 95% confidence interval, variance reduction ratio and effective number of paths
+        are saved in ``px_spec``. See ``MCEstimate``.
+
+        Parameters
+        ----------
+        Y : numpy.ndarray
+            discounted payoffs, one per path
+        controls : dict, optional
+            built-in control variates of this option: name mapped to a function,
+            which returns discounted samples of the control and their known mean
+
+        Returns
+        -------
+        MCEstimate
+            price estimate, its standard error and variance reduction ratio
+        """
+        names = self._mc_controls(controls)
+        X, EX = zip(*(controls[c]() for c in names)) if names else (None, None)
+        e = MCEstimate(Y, X=None if X is None else np.column_stack(X), EX=EX, antithetic=self._mc_antithetic())
+        return self._mc_save(e)
+
+    def _mc_stream(self, gen, payoff, controls=None, pilot=False):
+        """ Price estimate from paths streamed in chunks, with variance reduction requested in ``px_spec``.
+
+        Only discounted payoffs (and controls) of the current chunk are kept in memory; their statistics
+        are accumulated online. Chunk size is taken from ``chunk_size`` or ``mem_budget`` of ``px_spec``.
+        Statistics are saved in ``px_spec``, as in ``_mc_estimate()``.
+
+        Parameters
+        ----------
+        gen : PathGenerator
+            path simulator
+        payoff : callable
+            maps a chunk of simulated prices (see ``PathGenerator.iter_paths()``) to discounted payoffs, one per path
+        controls : dict, optional
+            built-in control variates of this option: name mapped to a pair of functions.
+            The first maps a chunk of prices to discounted samples of the control, the second returns their known mean.
+        pilot : bool
+            whether ``payoff`` fits a model on the first chunk (ex. LSM exercise policy) and applies it to the others.
+            Unless streaming is requested (``chunk_size``, ``mem_budget`` or ``nworkers``), all paths are then priced
+            as a single chunk, so that the model is fitted on all of them.
+
+        Returns
+        -------
+        MCEstimate
+            price estimate, its standard error and variance reduction ratio
+        """
+        names = self._mc_controls(controls)
+        EX = [controls[c][1]() for c in names] if names else None
+
+        def estimate(S, e=None):
+            e = MCEstimate(EX=EX, antithetic=gen.antithetic) if e is None else e
+            return e.add(payoff(S), X=np.column_stack([controls[c][0](S) for c in names]) if names else None)
+
+        def block(k):   # estimate from block k of paths, streamed in chunks
+            e = None
+            for S in gen.iter_paths(self._mc_chunk_size(gen), blocks=(k,)): e = estimate(S, e)
+            return e
+
+        sp = self.px_spec
+        if pilot and all(getattr(sp, k, None) is None for k in ('chunk_size', 'mem_budget', 'nworkers')):
+            return self._mc_save(estimate(gen.paths()))
+
+        # Block 0 is priced first (payoff may fit a model on its first chunk, ex. LSM exercise policy),
+        # the rest serially or by workers. Block estimates are pooled in order of blocks,
+        # so the result does not depend on the number of workers (or on running serially).
+        nworkers = getattr(sp, 'nworkers', None)
+        e, rest = block(0), range(1, gen.nblocks)
+        for b in (map(block, rest) if nworkers is None else pmap(block, rest, nworkers)): e.merge(b)
+        return self._mc_save(e)
+
+    def _mc_controls(self, controls):
+        """ Names of control variates requested in ``px_spec``, validated against available ``controls``.  """
+        controls = controls or {}
+        cv = getattr(self.px_spec, 'control_variate', None)
+        names = [] if cv is None or cv is False else sorted(controls) if cv is True else [cv] if isinstance(cv, str) else list(cv)
+        for c in names: assert c in controls, 'Ooops. Control variate must be one of: ' + ', '.join(sorted(controls))
+        return names
+
+    def _mc_save(self, e):
+        """ Saves statistics of MC estimate ``e`` (except the price itself) in ``px_spec``. Returns ``e``.
+
+        Error statistics assume i.i.d. paths. They are saved as ``None`` for (quasi-random) Sobol paths.
+        """
+        qmc = getattr(self.px_spec, 'sampler', None) == 'sobol'
+        for k, v in e.summary().items():
+            if k != 'px': setattr(self.px_spec, k, None if qmc else v)     # PriceSpec.add() would skip None
+        return e
+
+    def _mc_chunk_size(self, gen):
+        """ Number of paths simulated at once: ``chunk_size`` of ``px_spec``, or as many as fit in its ``mem_budget`` (MB).  """
+        sp = getattr(self, 'px_spec', None)
+        chunk_size, mem_budget = getattr(sp, 'chunk_size', None), getattr(sp, 'mem_budget', None)
+        if chunk_size is None and mem_budget is not None: chunk_size = gen.paths_per_chunk(mem_budget * 2 ** 20)
+        return chunk_size
+
+    def _mc_antithetic(self):
+        """ Whether antithetic paths are requested in ``px_spec``.  """
+        return bool(getattr(getattr(self, 'px_spec', None), 'antithetic', False))
+
+    def _path_generator(self, **kwargs):
+        """ Builds a (risk-neutral) GBM path generator for the underlying of this option.
+
+        Parameters
+        ----------
+        kwargs : optional
+            ``nsteps``, ``npaths``, ``rng_seed`` and any other arguments of ``PathGenerator`` constructor,
+            which override those taken from the option (``S0``, ``vol``, ``T``, ``rf_r``, ``q``, ``frf_r``)
+            and its ``px_spec`` (``sampler``, ``antithetic``).
+
+        Returns
+        -------
+        PathGenerator
+            vectorized path simulator shared by Monte Carlo pricers of European, American and exotic options.
+        """
+        sp = dict(S0=self.ref.S0, vol=self.ref.vol, T=self.T, rf_r=self.rf_r, q=self.ref.q, frf_r=self.frf_r or 0,
+                  sampler=getattr(getattr(self, 'px_spec', None), 'sampler', None) or 'pseudo', antithetic=self._mc_antithetic())
+        sp.update(kwargs)
+        return PathGenerator(**sp)
+
+    def _fd_grid(self, S, **kwargs):
+        """ Builds a finite difference grid (Black-Scholes PDE) over prices ``S`` of the underlying of this option.
+
+        Parameters
+        ----------
+        S : array_like
+            equally spaced prices of the underlying, incl. boundaries of the grid
+        kwargs : optional
+            ``nsteps``, ``scheme``, ``keep_hist`` and any other arguments of ``FDGrid`` constructor,
+            which override those taken from the option and its ``px_spec``.
+
+        Returns
+        -------
+        FDGrid
+            banded finite difference solver shared by FD pricers of exotic options.
+        """
+        _ = self.px_spec
+        sp = dict(S=S, T=self.T, nsteps=_.nsteps, rf_r=self.rf_r,
+                  scheme=getattr(_, 'scheme', None) or 'CN', keep_hist=getattr(_, 'keep_hist', False))
+        if 'vol' not in kwargs: sp['vol'] = self.ref.vol
+        if 'q' not in kwargs:   sp['q'] = self.ref.q + (self.frf_r or 0)   # only for a single underlying
+        sp.update(kwargs)
+        return FDGrid(**sp)
 
     def _calc_FD(self):
         """ Internal function for option valuation. See ``calc_px()`` for complete documentation.
@@ -319,7 +532,7 @@ class European(OptionValuation):
          """
 
         _ = self
-        d1 = (math.log(_.ref.S0 / _.K) + (_.rf_r + _.ref.vol ** 2 / 2.) * _.T)/(_.ref.vol * math.sqrt(_.T))
+        d1 = (math.log(_.ref.S0 / _.K) + (_.net_r + _.ref.vol ** 2 / 2.) * _.T)/(_.ref.vol * math.sqrt(_.T))
         d2 = d1 - _.ref.vol * math.sqrt(_.T)
         N = Util.norm_cdf
 
@@ -328,6 +541,408 @@ class European(OptionValuation):
         self.px_spec.add(BS_specs=sp)
         return sp
 
+    def _greeks_BS(self, **kwargs):
+        """ Closed-form sensitivities of Black-Scholes-Merton price. See ``OptionValuation.calc_greeks()``.
+
+        Examples
+        --------
+        See J.C.Hull's OFOD, Example 19.1, p.402 (delta 0.522), Example 19.4, p.410 (gamma 0.066),
+        Example 19.6, p.414 (vega 12.1), Example 19.2, p.405 (theta -4.31), Example 19.7, p.416 (rho 8.91)
+
+        >>> o = European(ref=Stock(S0=49, vol=.2), right='call', K=50, T=.3846, rf_r=.05)
+        >>> g = o.calc_greeks(method='BS').px_spec.greeks
+        >>> [round(g[k], 3) for k in ('delta', 'gamma', 'vega', 'theta', 'rho')]
+        [0.522, 0.066, 12.105, -4.305, 8.907]
+
+        Greeks are sensitivities of ``pxBS()``, also on a dividend paying stock:
+
+        >>> o = European(ref=Stock(S0=50, vol=.3, q=.08), right='put', K=52, T=2, rf_r=.05)
+        >>> g, n = o.calc_greeks().px_spec.greeks, o._greeks_bump(method='BS')
+        >>> round(g['delta'], 5), all(abs(g[k] - n[k]) < 1e-5 * (1 + abs(n[k])) for k in g)
+        (-0.43346, True)
+        """
+        if not self.style == 'European': return super()._greeks_BS(**kwargs)  # exotic sub-class without closed form
+
+        _ = self
+        g = European._BS_greeks(_.ref.S0, _.K, _.T, _.ref.vol, _.rf_r, _.ref.q + (_.frf_r or 0), _.signCP)
+        return {k: float(g[k]) for k in ('delta', 'gamma', 'vega', 'theta', 'rho')}
+
+    @staticmethod
+    def _digital_greeks(S0, K, T, vol, rf_r, q, signCP):
+        """ Closed-form values and sensitivities of asset-or-nothing and unit cash-or-nothing digital options.
+
+        Many closed-form payoffs are linear combinations of these two digitals (ex. vanilla = asset - K * cash),
+        so are their sensitivities. All inputs can be ``numpy`` arrays (broadcast against each other).
+
+        Parameters
+        ----------
+        S0, K, T, vol, rf_r, q : float, array_like
+            spot, strike (trigger), time to expiry, volatility, risk free rate, dividend yield
+        signCP : int, array_like
+            +1 for payoff above ``K`` (call), -1 for payoff below ``K`` (put)
+
+        Returns
+        -------
+        tuple[dict, dict]
+            ``px``, ``delta``, ``gamma``, ``vega``, ``theta``, ``rho`` and ``phi`` (sensitivity to dividend yield)
+            of asset-or-nothing and of cash-or-nothing (paying 1) digitals.
+
+        Examples
+        --------
+        >>> aon, con = European._digital_greeks(42, 40, .5, .2, .1, 0, 1)
+        >>> round(float(aon['px'] - 40 * con['px']), 9)   # vanilla call, Hull p.339
+        4.759422393
+        """
+        s, n, N = np.asarray(signCP), Util.norm_pdf, Util.norm_cdf
+        sqrtT = np.sqrt(T)
+        vsT = vol * sqrtT
+        d1 = (np.log(S0 / K) + (rf_r - q + vol ** 2 / 2.) * T) / vsT
+        d2 = d1 - vsT
+        dfq, dfr = np.exp(-q * T), np.exp(-rf_r * T)
+        nd1, nd2 = n(d1), n(d2)
+        dd1_dT = (rf_r - q + vol ** 2 / 2.) / vsT - d1 / (2. * T)
+        dd2_dT = (rf_r - q - vol ** 2 / 2.) / vsT - d2 / (2. * T)
+
+        px = S0 * dfq * N(s * d1)
+        aon = {'px': px,
+               'delta': dfq * N(s * d1) + s * dfq * nd1 / vsT,
+               'gamma': -s * dfq * nd1 * d2 / (S0 * vol ** 2 * T),
+               'vega': -s * S0 * dfq * nd1 * d2 / vol,
+               'theta': q * px - s * S0 * dfq * nd1 * dd1_dT,
+               'rho': s * S0 * dfq * nd1 * sqrtT / vol,
+               'phi': -T * px - s * S0 * dfq * nd1 * sqrtT / vol}
+
+        px = dfr * N(s * d2)
+        con = {'px': px,
+               'delta': s * dfr * nd2 / (S0 * vsT),
+               'gamma': -s * dfr * nd2 * d1 / (S0 ** 2 * vol ** 2 * T),
+               'vega': -s * dfr * nd2 * d1 / vol,
+               'theta': rf_r * px - s * dfr * nd2 * dd2_dT,
+               'rho': -T * px + s * dfr * nd2 * sqrtT / vol,
+               'phi': -s * dfr * nd2 * sqrtT / vol}
+        return aon, con
+
+    @staticmethod
+    def _BS_greeks(S0, K, T, vol, rf_r, q, signCP, K2=None):
+        """ Closed-form price and sensitivities of a vanilla (or gap) option. Inputs can be ``numpy`` arrays.
+
+        Vanilla option is ``signCP * (asset-or-nothing - K * cash-or-nothing)``, both digitals struck at ``K``.
+        If trigger ``K2`` is given, digitals are struck at ``K2`` instead (i.e. gap option).
+
+        Returns
+        -------
+        dict
+            ``px``, ``delta``, ``gamma``, ``vega``, ``theta``, ``rho``, ``phi``
+        """
+        aon, con = European._digital_greeks(S0, K if K2 is None else K2, T, vol, rf_r, q, signCP)
+        return {k: signCP * (aon[k] - K * con[k]) for k in aon}
+
+    @staticmethod
+    def _batch_specs(specs=None, **kwargs):
+        """ Collects option specs for batch pricing into a dictionary of broadcast ``numpy`` arrays.
+
+        Parameters
+        ----------
+        specs : dict, pandas.DataFrame, numpy.ndarray (structured), list of OptionSpec, optional
+            any container with columns (fields) ``S0``, ``vol``, ``K``, ``T``, ``rf_r``
+            and, optionally, ``q``, ``frf_r``, ``right``.
+        kwargs : optional
+            same named specs; these override (or complement) the columns of ``specs``.
+
+        Returns
+        -------
+        dict
+            Float arrays ``S0``, ``vol``, ``K``, ``T``, ``rf_r``, ``q``, ``frf_r`` and integer array ``signCP``,
+            all of the same shape.
+
+        Examples
+        --------
+        >>> sp = European._batch_specs({'S0': [42, 50], 'K': 40}, vol=.2, T=.5, rf_r=.1, right=('call', 'put'))
+        >>> sp['K'], sp['signCP']
+        (array([40., 40.]), array([ 1, -1]))
+        """
+        names = ('S0', 'vol', 'K', 'T', 'rf_r', 'q', 'frf_r', 'right')
+        dflt = {'q': 0., 'frf_r': 0., 'right': 'call'}
+        if isinstance(specs, (list, tuple)) and specs and isinstance(specs[0], OptionSpec):
+            specs = OptionSpec.to_records(specs)
+        fields = getattr(getattr(specs, 'dtype', None), 'names', None) or ()  # structured numpy array
+
+        sp = {}
+        for k in names:
+            if k in kwargs and kwargs[k] is not None: v = kwargs[k]
+            elif specs is not None and (k in fields or (not fields and k in specs)): v = specs[k]
+            else: v = dflt.get(k)
+            assert v is not None, 'Ooops. Please supply `' + k + '` for batch pricing'
+            sp[k] = np.asarray(v)
+
+        right = sp.pop('right')
+        if right.dtype.kind in 'USO':   # strings 'call'/'put'; anything else has no sign (0), as in ``set_right()``
+            right = np.char.lower(right.astype(str))
+            sp['signCP'] = np.where(right == 'call', 1, np.where(right == 'put', -1, 0))
+        else:                           # numeric rights: +1 for calls, -1 for puts
+            sp['signCP'] = np.sign(right)
+
+        keys = names[:-1] + ('signCP',)
+        out = np.broadcast_arrays(*(sp[k] for k in keys))
+        return {k: (v.astype(int) if k == 'signCP' else v.astype(float)) for k, v in zip(keys, out)}
+
+    @staticmethod
+    def calc_px_batch(specs=None, method='BS', greeks=False, **kwargs):
+        """ Prices a whole book of European options in one vectorized pass.
+
+        Avoids construction of a ``European`` object (and a ``PriceSpec``) for every contract.
+        All specs are broadcast against each other, so scalars and arrays can be mixed freely.
+        Normal CDF is evaluated with a ufunc (``scipy.special.ndtr``) over all contracts at once.
+        Dividend yield ``q`` and foreign rate ``frf_r`` enter ``d1`` (Black-Scholes-Merton model, Hull p.372),
+        as in ``_BS_specs()``.
+
+        Parameters
+        ----------
+        specs : dict, pandas.DataFrame, numpy.ndarray (structured), list of OptionSpec, optional
+            columns (fields) ``S0``, ``vol``, ``K``, ``T``, ``rf_r`` and, optionally, ``q``, ``frf_r``, ``right``.
+        method : {'BS'}
+            Only Black-Scholes-Merton closed form is vectorized.
+        greeks : bool
+            If ``True``, closed-form ``greeks`` (dictionary of arrays) are also computed.
+            See ``OptionValuation.calc_greeks()`` for units.
+        kwargs : optional
+            array_like specs ``S0``, ``vol``, ``K``, ``T``, ``rf_r``, ``q``, ``frf_r``, ``right``.
+            ``right`` can be an array of ``'call'``/``'put'`` strings or of +1/-1 signs. Default is ``'call'``.
+
+        Returns
+        -------
+        PriceSpec
+            ``px`` (prices for the requested rights), ``px_call``, ``px_put`` arrays and ``BS_specs`` dictionary of arrays.
+
+        Examples
+        --------
+        See J.C.Hull's OFOD textbook, pp.338-339: call @4.76, put @0.81.
+
+        >>> ps = European.calc_px_batch(S0=42, vol=.2, K=40, T=.5, rf_r=.1, right=['call', 'put'])
+        >>> ps.px
+        array([4.75942239, 0.80859937])
+
+        >>> o = European(ref=Stock(S0=42, vol=.2), right='put', K=40, T=.5, rf_r=.1)
+        >>> bool(abs(ps.px_put - o.calc_px(method='BS').px_spec.px).max() < 1e-12)  # same as scalar pricing
+        True
+
+        On a dividend paying stock, too:
+
+        >>> o = European(ref=Stock(S0=50, vol=.3, q=.08), right='put', K=52, T=2, rf_r=.05)
+        >>> o.pxBS(), European.calc_px_batch([OptionSpec.from_option(o)]).px
+        (9.955084987, array([9.95508499]))
+
+        A book can be supplied as a ``pandas.DataFrame`` (or a structured array, or a dictionary):
+
+        >>> from pandas import DataFrame
+        >>> book = DataFrame({'S0': [42, 42, 50], 'K': [40, 45, 50], 'T': .5, 'vol': .2, 'rf_r': .1,
+        ...                   'right': ['call', 'put', 'call']})
+        >>> European.calc_px_batch(book).px
+        array([4.75942239, 2.81447145, 4.13890198])
+
+        Compact ``OptionSpec`` records are priced without creating option objects:
+
+        >>> European.calc_px_batch([OptionSpec(S0=42, vol=.2, K=40, T=.5, rf_r=.1, right=r) for r in ('call', 'put')]).px
+        array([4.75942239, 0.80859937])
+
+        >>> import numpy as np;  S0 = np.linspace(30, 60, 200000)
+        >>> European.calc_px_batch(S0=S0, vol=.2, K=40, T=.5, rf_r=.1).px.shape
+        (200000,)
+
+        >>> European.calc_px_batch(S0=[49, 49], vol=.2, K=50, T=.3846, rf_r=.05, right=['call', 'put'], greeks=True).greeks['delta']
+        array([ 0.52160163, -0.47839837])
+        """
+        assert method.upper() == 'BS', 'Ooops. Batch pricing is available for BS method only'
+        sp = European._batch_specs(specs, **kwargs)
+        S0, vol, K, T, rf_r, signCP = sp['S0'], sp['vol'], sp['K'], sp['T'], sp['rf_r'], sp['signCP']
+        yld = sp['q'] + sp['frf_r']   # dividend yield and foreign risk free rate
+
+        N = Util.norm_cdf
+        vol_sqrtT = vol * np.sqrt(T)
+        d1 = (np.log(S0 / K) + (rf_r - yld + vol ** 2 / 2.) * T) / vol_sqrtT
+        d2 = d1 - vol_sqrtT
+        Nd1, Nd2, N_d1, N_d2 = N(d1), N(d2), N(-d1), N(-d2)
+
+        S0_df, K_df = S0 * np.exp(-yld * T), K * np.exp(-rf_r * T)
+        px_call = S0_df * Nd1 - K_df * Nd2
+        px_put = K_df * N_d2 - S0_df * N_d1
+        px = np.where(signCP == 1, px_call, np.where(signCP == -1, px_put, np.nan))
+
+        BS_specs = {'d1': d1, 'd2': d2, 'Nd1': Nd1, 'Nd2': Nd2, 'N_d1': N_d1, 'N_d2': N_d2}
+        out = PriceSpec(px=px, px_call=px_call, px_put=px_put, BS_specs=BS_specs, method='BS',
+                        sub_method='vectorized; Hull p.372')
+        if greeks:
+            g = European._BS_greeks(S0, K, T, vol, rf_r, yld, signCP)
+            out.add(greeks={k: g[k] for k in ('delta', 'gamma', 'vega', 'theta', 'rho')})
+        return out
+
+    @staticmethod
+    def pxBS_batch(specs=None, **kwargs):
+        """ Calls ``calc_px_batch()`` and returns only the array of prices.
+
+        Examples
+        --------
+        >>> European.pxBS_batch({'S0': [50, 50], 'vol': .2, 'K': 50, 'T': .5, 'rf_r': .05, 'right': [1, -1]})
+        array([3.44436429, 2.20985989])
+        """
+        return European.calc_px_batch(specs, method='BS', **kwargs).px
+
+
+    @staticmethod
+    def implied_vol(px, specs=None, method='BS', tol=1e-10, maxiter=100, **kwargs):
+        """ Implied volatilities of a whole option chain, solved simultaneously for all quotes.
+
+        Vectorized Halley iteration uses analytic vega and volga (derivatives of BSM price in volatility).
+        It starts from the closed-form approximation of Corrado and Miller (1996).
+        Every quote keeps a bracket ``[lo, hi]``. Steps leaving the bracket are replaced with bisection,
+        so convergence is guaranteed for all prices within no-arbitrage bounds of the model.
+
+        Parameters
+        ----------
+        px : float, array_like
+            option prices (quotes); broadcast against specs
+        specs : dict, pandas.DataFrame, numpy.ndarray (structured), optional
+            option specs, see ``calc_px_batch()``. ``vol`` is not needed.
+        method : {'BS'}
+            pricing model. See ``American.implied_vol()`` for LT.
+        tol : float
+            tolerance of price error
+        maxiter : int
+            maximum number of iterations
+        kwargs : optional
+            array_like specs ``S0``, ``K``, ``T``, ``rf_r``, ``q``, ``frf_r``, ``right``. See ``calc_px_batch()``.
+
+        Returns
+        -------
+        PriceSpec
+            ``vol`` (implied volatilities; ``nan``, if not found), ``converged`` (bool), ``iterations`` (int)
+            and ``status`` arrays. Status is ``'converged'``, ``'maxiter'``, ``'bracket'`` (search bracket collapsed
+            before price error is within ``tol``) or ``'bounds'`` (quote is outside of no-arbitrage bounds).
+
+        Examples
+        --------
+        Recover volatility of J.C.Hull's OFOD textbook example, p.338: call @4.76, put @0.81.
+
+        >>> iv = European.implied_vol([4.759422393, 0.808599373], S0=42, K=40, T=.5, rf_r=.1, right=['call', 'put'])
+        >>> iv.vol
+        array([0.2, 0.2])
+        >>> iv.status, iv.iterations
+        (array(['converged', 'converged'], dtype='<U9'), array([2, 2]))
+
+        It inverts ``pxBS()``, also on a dividend paying stock:
+
+        >>> o = European(ref=Stock(S0=50, vol=.3, q=.08), right='put', K=52, T=2, rf_r=.05)
+        >>> round(float(European.implied_vol(o.pxBS(), S0=50, q=.08, K=52, T=2, rf_r=.05, right='put').vol), 9)
+        0.3
+
+        Prices below intrinsic value (and above spot) have no implied volatility.
+
+        >>> European.implied_vol([1., 43.], S0=42, K=40, T=.5, rf_r=.1).status
+        array(['bounds', 'bounds'], dtype='<U9')
+
+        Nor do quotes, whose search did not converge:
+
+        >>> iv = European.implied_vol([4.759422393, 0.808599373], S0=42, K=40, T=.5, rf_r=.1, right=['call', 'put'], maxiter=1)
+        >>> iv.vol, iv.status
+        (array([nan, nan]), array(['maxiter', 'maxiter'], dtype='<U9'))
+
+        A whole chain of 100,000 quotes:
+
+        >>> import numpy as np;  K = np.linspace(40, 60, 100000);  vol = np.linspace(.1, 1., 100000)
+        >>> px = European.calc_px_batch(S0=50, vol=vol, K=K, T=.5, rf_r=.05, q=.01, right='put').px
+        >>> iv = European.implied_vol(px, S0=50, K=K, T=.5, rf_r=.05, q=.01, right='put')
+        >>> bool(iv.converged.all()), bool(abs(iv.vol - vol).max() < 1e-6), int(iv.iterations.max()) < 10
+        (True, True, True)
+        """
+        assert method.upper() == 'BS', 'Ooops. Use American.implied_vol() for LT method'
+        sp = European._batch_specs(specs, **dict(kwargs, vol=np.nan))
+        S0, K, T, rf_r, signCP = sp['S0'], sp['K'], sp['T'], sp['rf_r'], sp['signCP']
+        yld = sp['q'] + sp['frf_r']
+        px, S0, K, T, rf_r, yld, signCP = np.broadcast_arrays(np.asarray(px, dtype=float), S0, K, T, rf_r, yld, signCP)
+        n = Util.norm_pdf
+
+        def f(vol):   # BSM price, vega, volga
+            ps = European.calc_px_batch(S0=S0, vol=vol, K=K, T=T, rf_r=rf_r, q=yld, right=signCP)
+            d1, d2 = ps.BS_specs['d1'], ps.BS_specs['d2']
+            vega = S0 * np.exp(-yld * T) * n(d1) * np.sqrt(T)
+            return ps.px, vega, vega * d1 * d2 / vol
+
+        vol0 = European._implied_vol_guess(px, S0, K, T, rf_r, yld, signCP)
+        out = European._solve_vol(f, px, vol0, lo=1e-6, hi=10., tol=tol, maxiter=maxiter)
+        return PriceSpec(method='BS', sub_method='Halley; Corrado-Miller initial guess', **out)
+
+    @staticmethod
+    def _implied_vol_guess(px, S0, K, T, rf_r, q, signCP):
+        """ Closed-form approximation of implied volatility, Corrado and Miller (1996).
+
+        Puts are converted to calls via put-call parity. Where the approximation fails, 30% is returned.
+
+        Returns
+        -------
+        numpy.ndarray
+            initial guesses of implied volatility
+        """
+        S, X = S0 * np.exp(-q * T), K * np.exp(-rf_r * T)
+        c = np.where(signCP == -1, px + S - X, px) - (S - X) / 2.
+        with np.errstate(invalid='ignore'):
+            vol = np.sqrt(2 * math.pi / T) / (S + X) * (c + np.sqrt(np.maximum(c ** 2 - (S - X) ** 2 / math.pi, 0)))
+        return np.where(np.isfinite(vol) & (vol > 0), vol, .3)
+
+    @staticmethod
+    def _solve_vol(f, px, vol, lo, hi, tol=1e-10, maxiter=100):
+        """ Safeguarded vectorized Newton (or Halley) root search of ``f(vol) = px``, where price increases in vol.
+
+        Parameters
+        ----------
+        f : callable
+            maps array of volatilities to a tuple of prices, vegas and volgas (``None``, if unavailable) arrays
+        px : numpy.ndarray
+            target prices
+        vol : numpy.ndarray
+            initial guesses
+        lo, hi : float, numpy.ndarray
+            initial bracket of volatilities
+        tol : float
+            tolerance of price error
+        maxiter : int
+            maximum number of iterations
+
+        Returns
+        -------
+        dict
+            ``vol``, ``converged``, ``iterations``, ``status`` arrays
+        """
+        lo, hi = np.broadcast_to(lo, px.shape).astype(float), np.broadcast_to(hi, px.shape).astype(float)
+        out_of_bounds = ~((f(lo)[0] - tol <= px) & (px <= f(hi)[0] + tol))   # also catches nan quotes
+        vol = np.clip(vol, lo, hi)
+        done, converged, stalled = out_of_bounds.copy(), np.zeros(px.shape, dtype=bool), np.zeros(px.shape, dtype=bool)
+        iterations = np.zeros(px.shape, dtype=int)
+
+        for _ in range(maxiter):
+            if done.all(): break
+            pxv, vega, volga = f(vol)
+            err = pxv - px
+            conv = ~done & (np.abs(err) <= tol)
+            stall = ~done & ~conv & (hi - lo <= tol * 1e-3)    # bracket collapsed, but price error is still large
+            converged |= conv
+            stalled |= stall
+            done |= conv | stall
+            act = ~done
+            iterations[act] += 1
+
+            hi, lo = np.where(act & (err > 0), vol, hi), np.where(act & (err < 0), vol, lo)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = err / vega
+                if volga is not None:   # Halley's correction, unless it is too large
+                    h = 1 - .5 * step * volga / vega
+                    step = np.where(h > .5, step / h, step)
+                new = vol - step
+            bisect = ~np.isfinite(new) | (new <= lo) | (new >= hi)
+            vol = np.where(act, np.where(bisect, .5 * (lo + hi), new), vol)
+
+        vol = np.where(converged, vol, np.nan)
+        status = np.where(converged, 'converged', np.where(out_of_bounds, 'bounds', np.where(stalled, 'bracket', 'maxiter')))
+        return {'vol': vol, 'converged': converged, 'iterations': iterations, 'status': status}
 
     def _LT_specs(self):
         """ Calculates a collection of specs/parameters needed for lattice tree pricing.
@@ -388,6 +1003,20 @@ class European(OptionValuation):
         self.px_spec.add(LT_specs=sp)  # save calculated parameters for later access and display
         return sp
 
+    def _lattice(self):
+        """ Builds a binomial lattice from ``LT_specs`` (see ``_LT_specs()``) and ``px_spec``.
+
+        Returns
+        -------
+        BinomialLattice
+            ``numpy``-backed tree shared by lattice pricers of European, American and exotic options.
+        """
+        _ = self.px_spec.LT_specs
+        bl = BinomialLattice(S0=self.ref.S0, u=_['u'], d=_['d'], p=_['p'], df_dt=_['df_dt'],
+                             nsteps=self.px_spec.nsteps, keep_hist=getattr(self.px_spec, 'keep_hist', False))
+        self.px_spec.add(_lattice=bl)   # nodes near the root are reused by tree greeks, see _greeks_LT()
+        return bl
+
 
     def pxBS(self, **kwargs):
         """ Calls exotic pricing method `calc_px()`
@@ -460,7 +1089,7 @@ class European(OptionValuation):
         >>> from qfrm import *
         >>> s = Stock(S0=50, vol=.2)
         >>> European(ref=s, rf_r=.05, K=50, T=0.5, right='call').pxMC(rng_seed=0, nsteps=10, npaths=10)
-        4.1467906460000004
+        4.056997206
         """
         return self.print_value(self.calc_px(method='MC', **kwargs).px_spec.px)
 
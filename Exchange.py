@@ -1,6 +1,5 @@
 import math
 import numpy as np
-import scipy
 
 try: from qfrm.European import *  # production:  if qfrm package is installed
 except:   from European import *  # development: if not installed and running from source
@@ -106,7 +105,7 @@ class Exchange(European):
 
         Use a finite difference method to price an exchange option
 
-        The following example will generate ``px = 4.558805242`` with ``nsteps = 10`` and ``npaths = 101``,
+        The following example will generate ``px = 4.577976672`` with ``nsteps = 10`` and ``npaths = 101``,
         which can be verified with
         `Exchange Options, p.4 <http://www.stat.nus.edu.sg/~stalimtw/MFE5010/PDF/L3exchange.pdf>`_
         However, for the purpose of fast runtime, I use ``nstep = 10`` and ``npaths = 9`` in all following examples,
@@ -117,24 +116,24 @@ class Exchange(European):
         >>> o = Exchange(ref=s, right='call', K=40, T=1, rf_r=.1, \
         desc='px @4.578 page 4 http://www.stat.nus.edu.sg/~stalimtw/MFE5010/PDF/L3exchange.pdf')
         >>> o.calc_px(method='FD',cor=0.75, nsteps=10, npaths=9).px_spec.px # doctest: +ELLIPSIS
-        3.993309432...
+        3.977260393...
 
         >>> o.calc_px(method='FD', cor=0.75, nsteps=10, npaths=9).px_spec # save interim results to self.px_spec.
         ... # doctest: +ELLIPSIS, +NORMALIZE_WHITESPACE
-        PriceSpec...px: 3.993309432...
+        PriceSpec...px: 3.977260393...
 
         >>> (o.px_spec.px, o.px_spec.method)  # alternative attribute access
-        (3.993309432456474, 'FD')
+        (3.9772603930099897, 'FD')
 
         >>> Exchange(clone=o).pxFD(cor=0.75, nsteps=10, npaths=9)
-        3.993309432
+        3.977260393
 
         Another example with different volatility and correlation
 
         >>> s = Stock(S0=(100,100), vol=(0.15,0.30), q=(0.04,0.05))
         >>> o = Exchange(ref=s, right='call', K=40, T=1, rf_r=.1)
         >>> o.calc_px(method='FD',cor=0.6, nsteps=10, npaths=9).px_spec.px # doctest: +ELLIPSIS
-        7.996470439...
+        8.10650034...
 
         Example of option price development (FD method) with increasing maturities
 
@@ -153,7 +152,7 @@ class Exchange(European):
         """
 
         self.save2px_spec(cor=cor, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.   See ``calc_px()`` for complete documentation.
@@ -190,6 +189,32 @@ class Exchange(European):
 
         return self
 
+    def _greeks_BS(self, **kwargs):
+        """ Closed-form greeks of an exchange option. See ``OptionValuation.calc_greeks()``.
+
+        Margrabe price is a vanilla call on asset 2 struck at asset 1, with asset 1 yield in place of risk free rate.
+        ``delta``, ``gamma`` and ``vega`` are pairs (one sensitivity per asset); ``rho`` is zero.
+
+        Examples
+        --------
+        >>> o = Exchange(ref=Stock(S0=(100, 100), vol=(.1, .15), q=(.02, .01)), right='call', K=40, T=1, rf_r=.1)
+        >>> g = o.calc_greeks(cor=.3).px_spec.greeks
+        >>> g['delta'], g['gamma']   # doctest: +ELLIPSIS
+        ((-0.4856..., 0.5508...), (0.0255..., 0.0255...))
+        >>> round(o.px_spec.px - sum(S * d for S, d in zip(o.ref.S0, g['delta'])), 12)   # price is homogeneous in spots
+        0.0
+        """
+        _ = self
+        (S1, S2), (v1, v2), (q1, q2), cor = _.ref.S0, _.ref.vol, _.ref.q, _.px_spec.cor
+        vol = np.sqrt(v1 ** 2 + v2 ** 2 - 2 * cor * v1 * v2)
+        g = European._BS_greeks(S2, S1, _.T, vol, q1, q2, 1)
+        delta1 = (g['px'] - S2 * g['delta']) / S1
+        return {'delta': (float(delta1), float(g['delta'])),
+                'gamma': (float(g['gamma'] * S2 ** 2 / S1 ** 2), float(g['gamma'])),
+                'vega': (float(g['vega'] * (v1 - cor * v2) / vol), float(g['vega'] * (v2 - cor * v1) / vol)),
+                'theta': float(g['theta']),
+                'rho': 0.}
+
     def _calc_LT(self):
         """ Internal function for option valuation.        See ``calc_px()`` for complete documentation.
         """
@@ -234,42 +259,10 @@ class Exchange(European):
         #compute exchange option specific parameters
         vol_a = np.sqrt((vol_1 ** 2) + (vol_2 ** 2) - 2 * cor * vol_1 * vol_2)
 
-        M = total_px_steps - 1 #number of rows of the f_matrix
-        N = total_time_steps-1 #number of columns of the f_matrix
-        S_max = S0_1 * 2                                # maximum stock price
-        S_min = 0.0                                   # minimum stock price
-        d_t = ttm / (total_time_steps - 1)                  # delta t
-        S = np.linspace(S_min,S_max,total_px_steps)   # all the possible spot price at t=0
-
-        f_matrix = np.zeros((total_px_steps,total_time_steps)) # Initialize the grid containing option values
-
-        # Payout at the maturity time
-        payout_T = np.maximum((K - S),0)
-
-        first_row = K  # f at zero spot price
-
-        last_row = 0  #f at S_max
-
-        j = np.arange(0,M + 1)
-        a = 0.5 * d_t * ((r - q_1) * j - (vol_a ** 2) * (j ** 2))
-        b = 1 + d_t * ((vol_a ** 2) * (j ** 2) + r)
-        c = 0.5 * d_t * (-(r - q_1) * j - (vol_a ** 2) * (j ** 2))
-
-        data = (a[2:M],b[1:M],c[1:M - 1])
-        B = scipy.sparse.diags(data,[-1,0,1]).tocsc() #construct the sparse matrix
-
-        f_matrix[:,N] = payout_T
-        f_matrix[0,:] = first_row
-        f_matrix[M,:] = last_row
-        POS = np.zeros(M - 1)
-        for idx in np.arange(N-1,-1,-1):
-            POS[0] = -a[1] * f_matrix[0,idx]
-            POS[-1] = -c[M-1] * f_matrix[M,idx]
-            f_matrix[1:M,idx] = scipy.sparse.linalg.spsolve(B,f_matrix[1:M,idx+1]+POS)
-            f_matrix[:,-1] = payout_T
-            f_matrix[0,:] = first_row
-            f_matrix[-1,:] = last_row
-        #look for the input spot price
-        ind=np.where(S == S0_1)[0][0]
-        self.px_spec.add(px=float(f_matrix[ind,0]), sub_method='Implicit Method')
+        # Grid of total_px_steps spot prices of asset 1 and (total_time_steps - 1) time steps.
+        # Option is valued as a put on asset 1 with volatility vol_a (of the ratio of two assets) and strike K.
+        S = np.linspace(0.0, S0_1 * 2, total_px_steps)
+        g = self._fd_grid(S, nsteps=total_time_steps - 1, vol=vol_a, q=q_1)
+        g.rollback(lambda S: np.maximum(K - S, 0), lower=K, upper=0)   # f at zero spot price and at S_max
+        self.px_spec.add(px=g.value(S0_1), sub_method=g.desc[g.scheme], _FD_grid=g.FD_grid())
         return self
@@ -0,0 +1,197 @@
+import numpy as np
+
+
+class FDGrid:
+    """ Finite difference solver of Black-Scholes PDE on a uniform grid of prices of the underlying.
+
+    PDE ``V_t + .5 * vol^2 * S^2 * V_SS + (rf_r - q) * S * V_S - rf_r * V = 0`` is discretized with central differences
+    in price and a theta-scheme in time: explicit (theta=0), implicit (theta=1) or Crank-Nicolson (theta=1/2).
+    Spatial operator is a time-independent tridiagonal matrix. So, an implicit system is LU-factorized once
+    (LAPACK ``dgttrf``) and every time step is an O(M) banded solve (``dgttrs``) plus a few vector operations.
+    Option values of a single time step are kept in a 1-D buffer, rather than in an (nsteps x npaths) matrix.
+
+    Examples
+    --------
+    European put, S0=50, K=50, T=5/12, rf_r=.1, vol=.4, priced at 4.076 by Black-Scholes formula
+    (J.C.Hull's OFOD, Example 21.1 values its American counterpart).
+
+    >>> S = np.linspace(0, 100, 201)
+    >>> g = FDGrid(S, T=5/12, nsteps=100, rf_r=.1, vol=.4)
+    >>> V = g.rollback(lambda S: np.maximum(50 - S, 0), lower=50 * np.exp(-.1 * (5/12 - g.t)), upper=0)
+    >>> round(g.value(50), 3)
+    4.075
+
+    Early exercise turns it into an American put (its precise value is 4.28).
+
+    >>> V = g.rollback(lambda S: np.maximum(50 - S, 0), lower=50, upper=0, exercise=lambda S: np.maximum(50 - S, 0))
+    >>> round(g.value(50), 2)
+    4.28
+
+    Implicit and explicit schemes are also available. The latter is only stable for ``dt * (vol * M)^2 < 1``.
+
+    >>> g = FDGrid(S, T=5/12, nsteps=100, rf_r=.1, vol=.4, scheme='implicit')
+    >>> V = g.rollback(lambda S: np.maximum(50 - S, 0), lower=50 * np.exp(-.1 * (5/12 - g.t)), upper=0)
+    >>> round(g.value(50), 3)
+    4.069
+    """
+    schemes = {'explicit': 0., 'implicit': 1., 'CN': .5}
+    desc = {'explicit': 'Explicit FDM', 'implicit': 'Implicit FDM', 'CN': 'Crank-Nicolson FDM'}
+
+    def __init__(self, S, T, nsteps, rf_r, vol, q=0., scheme='CN', keep_hist=False):
+        """ Constructor.
+
+        Parameters
+        ----------
+        S : array_like
+            ``M + 1`` equally spaced prices of the underlying (in increasing order), incl. both boundaries
+        T : float
+            time to expiry (in years)
+        nsteps : int
+            number of time steps
+        rf_r : float
+            risk free rate
+        vol : float
+            volatility of the underlying
+        q : float
+            continuous dividend yield (or any other rate, which reduces drift of the underlying)
+        scheme : {'CN', 'implicit', 'explicit'}
+            time stepping scheme: Crank-Nicolson, fully implicit or explicit
+        keep_hist : bool
+            If ``True``, all option values are saved in ``grid``, an ``(nsteps + 1, M + 1)`` array (row ``i`` is time step ``i``).
+        """
+        assert scheme in self.schemes, 'Ooops. FD scheme must be one of ' + ', '.join(self.schemes)
+        self.S = np.asarray(S, dtype=float)
+        assert self.S.ndim == 1 and self.S.size >= 3, 'Ooops. FD grid needs at least 3 prices of the underlying'
+        self.n, self.T, self.scheme = int(nsteps), T, scheme
+        self.dt = T / self.n
+        self.t = np.linspace(0, T, self.n + 1)      # time nodes
+        self.keep_hist = keep_hist
+        self.grid = self.head = None
+
+        # coefficients of tridiagonal operator L (rows of interior nodes) times dt: (L V)_j = l V_j-1 + d V_j + u V_j+1
+        x = self.S[1:-1] / (self.S[1] - self.S[0])      # S_j / dS
+        s2, mu = vol ** 2 * x ** 2, (rf_r - q) * x
+        self.l, self.d, self.u = (.5 * (s2 - mu) * self.dt, -(s2 + rf_r) * self.dt, .5 * (s2 + mu) * self.dt)
+
+    def _factorize(self, theta, zero_slope=(False, False)):
+        """ Solver of ``(I - theta * dt * L) x = b``. LU factors are computed once and reused at every time step.
+
+        Parameters
+        ----------
+        theta : float
+            weight of implicit part of time stepping scheme
+        zero_slope : tuple[bool, bool]
+            whether lower/upper boundary value is extrapolated from 2 neighbours with zero (2nd order) slope,
+            so that its coefficient folds into the tridiagonal system
+
+        Returns
+        -------
+        callable
+            maps right hand side ``b`` to solution ``x``
+        """
+        l, d, u = -theta * self.l, 1 - theta * self.d, -theta * self.u
+        if zero_slope[0]:   # V_0 = (4 V_1 - V_2) / 3
+            d[0] += 4 / 3 * l[0];   u[0] -= l[0] / 3
+        if zero_slope[-1]:  # V_M = (4 V_M-1 - V_M-2) / 3
+            d[-1] += 4 / 3 * u[-1]; l[-1] -= u[-1] / 3
+        if d.size < 3:      # LAPACK wrapper needs at least 3 equations. Tiny grids are solved directly.
+            A = np.diag(d) + np.diag(l[1:], -1) + np.diag(u[:-1], 1)
+            return lambda b: np.linalg.solve(A, b)
+
+        from scipy.linalg.lapack import dgttrf, dgttrs
+        LU = dgttrf(l[1:], d, u[:-1])
+        assert LU[-1] == 0, 'Ooops. FD system matrix is singular'
+        return lambda b: dgttrs(*LU[:-1], b)[0]
+
+    def rollback(self, payoff, lower=0., upper=0., exercise=None, step=None):
+        """ Backward induction from terminal payoffs to time 0.
+
+        Parameters
+        ----------
+        payoff : callable
+            maps array of prices of the underlying to terminal option values
+        lower, upper : float, array_like, None
+            option values at the lowest and highest prices of the underlying (Dirichlet boundary conditions):
+            a constant or ``nsteps + 1`` values at time nodes ``t``.
+            ``None`` indicates zero slope of option values at the boundary (Neumann boundary condition).
+        exercise : callable, optional
+            maps prices of the underlying to (early) exercise values, compared against continuation values.
+            ``None`` indicates no early exercise (European style).
+        step : callable, optional
+            ``step(i, S, V)`` is called at every time step ``i`` (incl. maturity) after option values are computed.
+            It can modify option values ``V`` in place.
+
+        Returns
+        -------
+        numpy.ndarray
+            option values at all prices ``S`` at time 0
+        """
+        n, S, theta = self.n, self.S, self.schemes[self.scheme]
+        l, d, u = self.l, self.d, self.u
+        zero_slope = (lower is None, upper is None)
+        lower, upper = (None if b is None else np.broadcast_to(np.asarray(b, dtype=float), (n + 1,)) for b in (lower, upper))
+        solve = self._factorize(theta, zero_slope) if theta > 0 else None
+
+        def set_bounds(i):
+            V[0] = (4 * V[1] - V[2]) / 3 if lower is None else lower[i]
+            V[-1] = (4 * V[-2] - V[-3]) / 3 if upper is None else upper[i]
+
+        V = np.array(np.broadcast_to(payoff(S), S.shape), dtype=float)
+        set_bounds(n)
+        if step is not None: step(n, S, V)
+        hist = [V.copy()] if self.keep_hist else None
+        V1 = V.copy() if n == 1 else None
+        rhs = np.empty(S.size - 2)
+
+        for i in range(n - 1, -1, -1):
+            # explicit part: (I + (1 - theta) * dt * L) V
+            np.multiply(d, V[1:-1], out=rhs)
+            rhs += l * V[:-2];  rhs += u * V[2:]
+            rhs *= 1 - theta;   rhs += V[1:-1]
+
+            if solve is not None:   # implicit part: solve (I - theta * dt * L) V = rhs, with boundary values moved to rhs
+                set_bounds(i)
+                if lower is not None: rhs[0] += theta * l[0] * V[0]
+                if upper is not None: rhs[-1] += theta * u[-1] * V[-1]
+                V[1:-1] = solve(rhs)
+            else:
+                V[1:-1] = rhs
+            set_bounds(i)
+
+            if exercise is not None: np.maximum(V, exercise(S), out=V)
+            if step is not None: step(i, S, V)
+            if self.keep_hist: hist.insert(0, V.copy())
+            if i == 1: V1 = V.copy()
+
+        self.grid = np.array(hist) if self.keep_hist else None
+        self.head = (V.copy(), V1)
+        return V.copy()
+
+    def value(self, S0):
+        """ Option value at time 0, linearly interpolated at price ``S0`` of the underlying.
+
+        Parameters
+        ----------
+        S0 : float
+            price of the underlying
+
+        Returns
+        -------
+        float
+            interpolated option value
+        """
+        assert self.head is not None, 'Ooops. Roll back the FD grid first'
+        return float(np.interp(S0, self.S, self.head[0]))
+
+    def FD_grid(self):
+        """ Prices of the underlying, option values at time steps 0 and 1, and time step.
+
+        These are stored in ``px_spec._FD_grid`` by FD pricers, so that delta, gamma and theta
+        are computed without repricing. See ``OptionValuation._greeks_FD()``.
+
+        Returns
+        -------
+        tuple
+            ``(S, V0, V1, dt)``
+        """
+        return (self.S, self.head[0], self.head[1], self.dt)
@@ -61,7 +61,7 @@ class ForwardStart(European):
         >>> s = Stock(S0=60, vol=.30,q=0.04)
         >>> o=ForwardStart(ref=s, K=66, right='put', T=0.75, rf_r=.08).calc_px(method='BS',T_s=0.25)
         >>> o.px_spec #doctest: +ELLIPSIS
-        PriceSpec...px: 5.057238874
+        PriceSpec...px: 5.057238874...
 
         >>> from pandas import Series
         >>> expiries = range(1,11)
@@ -89,16 +89,16 @@ class ForwardStart(European):
 
 
         >>> s = Stock(S0=50, vol=.15,q=0.05)
-        >>> ForwardStart(ref=s, K=100, right='call', T=0.5, rf_r=.1).pxMC(nsteps=10, npaths=10, T_s=0.5)
-        3.434189097
+        >>> ForwardStart(ref=s, K=100, right='call', T=0.5, rf_r=.1).pxMC(nsteps=10, npaths=10, T_s=0.5, rng_seed=1)
+        0.748407401
 
         The following example uses the same parameter as the example above, but uses ``pxMC()``.
         example from page 2 http://www.stat.nus.edu.sg/~stalimtw/MFE5010/PDF/L2forward.pdf
 
         >>> s = Stock(S0=50, vol=.15,q=0.05)
         >>> o = ForwardStart(ref=s, K=100, right='call', T=0.5, rf_r=.1)
-        >>> o.pxMC(nsteps=10,npaths=10,T_s=0.5)
-        3.434189097
+        >>> o.pxMC(nsteps=10, npaths=10, T_s=0.5, rng_seed=1)
+        0.748407401
 
 
         The following example will generate ``px = 1.438603501...`` with ``nsteps = 365`` and ``npaths = 10000``,
@@ -109,12 +109,12 @@ class ForwardStart(European):
         If you want to verify my code, please use ``nsteps = 365`` and ``npaths = 10000``
 
         >>> s = Stock(S0=50, vol=.15,q=0.05)
-        >>> o = ForwardStart(ref=s, K=100, right='call', T=0.5, rf_r=.1).calc_px(method='MC', nsteps=10, npaths=10, T_s=0.5)
-        >>> o.update(right='put').calc_px(method='MC', nsteps=10, npaths=10, T_s=0.5).px_spec.px # doctest: +ELLIPSIS
-        1.279658389...
+        >>> o = ForwardStart(ref=s, K=100, right='call', T=0.5, rf_r=.1).calc_px(method='MC', nsteps=10, npaths=10, T_s=0.5, rng_seed=1)
+        >>> o.update(right='put').calc_px(method='MC', nsteps=10, npaths=10, T_s=0.5, rng_seed=1).px_spec.px # doctest: +ELLIPSIS
+        1.3755616710236973
 
-        >>> o.update(right='put').calc_px(method='MC',  nsteps=10, npaths=10, T_s=0.5).px_spec # doctest: +ELLIPSIS
-        PriceSpec...px: 1.279658389...
+        >>> o.update(right='put').calc_px(method='MC', nsteps=10, npaths=10, T_s=0.5, rng_seed=1).px_spec # doctest: +ELLIPSIS
+        PriceSpec...px: 1.375561671...
 
         >>> from pandas import Series
         >>> expiries = range(1,11)
@@ -153,7 +153,7 @@ class ForwardStart(European):
         """
 
         self.save2px_spec(T_s=T_s, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
 
     def _calc_BS(self):
@@ -214,6 +214,31 @@ class ForwardStart(European):
         return self
 
 
+    def _greeks_BS(self, **kwargs):
+        """ Closed-form greeks of a forward start option. See ``OptionValuation.calc_greeks()``.
+
+        Price is ``S0 * exp(-q * T_s)`` units of an at-the-money vanilla option on a unit spot.
+        Hence, it is linear in spot (``gamma`` is zero) and ``theta`` is ``-dV/dT`` in option life ``T`` (after ``T_s``).
+
+        Examples
+        --------
+        >>> o = ForwardStart(ref=Stock(S0=50, vol=.15, q=.05), K=50, right='call', T=0.5, rf_r=.1)
+        >>> g = o.calc_greeks(T_s=0.25).px_spec.greeks
+        >>> n = o._greeks_bump(method='BS', T_s=0.25)
+        >>> all(abs(g[k] - n[k]) < 1e-4 * (1 + abs(n[k])) for k in ('delta', 'gamma', 'vega', 'theta', 'rho'))
+        True
+        >>> o = ForwardStart(ref=Stock(S0=60, vol=.3, q=.04), K=60, right='call', T=.75, rf_r=.08)
+        >>> g = o.calc_greeks(T_s=0.25).px_spec.greeks
+        >>> round(g['theta'], 4), abs(g['theta'] - o._greeks_bump(method='BS', T_s=0.25)['theta']) < 1e-4
+        (-4.7008, True)
+        """
+        _ = self
+        S0, q, T_s = _.ref.S0, _.ref.q, _.px_spec.T_s
+        a = S0 * np.exp(-q * T_s)
+        g = European._BS_greeks(1., 1., _.T, _.ref.vol, _.rf_r, q, _.signCP)
+        return {'delta': float(a * g['px'] / S0), 'gamma': 0., 'vega': float(a * g['vega']),
+                'theta': float(a * g['theta']), 'rho': float(a * g['rho'])}
+
     def _calc_LT(self):
         """ Internal function for option valuation.       See ``calc_px()`` for complete documentation.
         """
@@ -239,24 +264,14 @@ class ForwardStart(European):
         dt = _.T / n
         df = np.exp(-_.rf_r * dt)
 
-        np.random.seed(1) #set seed
-
-        #initialize the price array
-        S=np.zeros((n+1,m), 'd')
-        S[0,:] = S0 * np.exp((_.rf_r - q) * T_s) # set initial price
-
-        #generate stock price path
-        for t in range(1, n+1):
-            #generate random numbers
-            rand=np.random.standard_normal(m)
-
-            S[t,:]=S[t-1,:]*np.exp(((_.rf_r-q-((vol**2)/2))*dt)+(vol*rand*np.sqrt(dt)))
+        #generate stock price paths, starting from the expected price at T_s
+        gen = _._path_generator(S0=S0 * np.exp((_.rf_r - q) * T_s), nsteps=n, npaths=m, rng_seed=_.px_spec.rng_seed)
 
-        #find the payout at maturity
-        final=np.maximum(_.signCP*(S[-1]-_.K),0)
+        #find the payout at maturity, discounted to present
+        final = lambda S: np.exp(-_.rf_r*(_.T+T_s)) * np.maximum(_.signCP*(S[-1]-_.K),0)
 
-        #discount the expected payoff at maturity to present
-        v0 = (np.exp(-_.rf_r*(_.T+T_s))*sum(final))/m
+        #expected discounted payoff, accumulated over chunks of paths
+        v0 = self._mc_stream(gen, final).px
 
         self.px_spec.add(px=float(v0), sub_method=None)
 
@@ -1,6 +1,5 @@
 import math
 import numpy as np
-from scipy import sparse
 
 try: from qfrm.European import *  # production:  if qfrm package is installed
 except:   from European import *  # development: if not installed and running from source
@@ -101,12 +100,19 @@ class Gap(European):
         >>> s = Stock(S0=500000, vol=.2)
         >>> o = Gap(ref=s, right='put', K=400000, T=1, rf_r=.05, desc='Hull p.601 Example 26.1')
         >>> o.pxMC(K2=350000, nsteps=10, npaths=10, rng_seed=10)
-        7534.017075587
+        0.0
 
         >>> s = Stock(S0=500000, vol=.2)
         >>> o = Gap(ref=s, right='put', K=400000, T=1, rf_r=.05, desc='Hull p.601 Example 26.1')
         >>> o.pxMC(K2=350000, nsteps=1000, npaths=1000, rng_seed=0)  # better precision
-        1362.367515835
+        2438.231977583
+
+        A vanilla put with strike ``K2`` (priced by BS formula) is a good control variate for the Gap put:
+
+        >>> o.pxMC(K2=350000, nsteps=1, npaths=10000, rng_seed=0), round(o.px_spec.stderr, 1)
+        (2012.822223742, 123.6)
+        >>> o.pxMC(K2=350000, nsteps=1, npaths=10000, rng_seed=0, control_variate='european'), round(o.px_spec.stderr, 1)
+        (1906.598827966, 51.6)
 
         >>> from pandas import Series
         >>> Ts = range(1,101)
@@ -118,7 +124,7 @@ class Gap(European):
         >>> s = Stock(S0=50, vol=.2)
         >>> o = Gap(ref=s, right='call', K=57, T=1, rf_r=.09)
         >>> o.pxMC(K2=50, nsteps=1000, npaths=1000, rng_seed=2)
-        2.774272339
+        3.054371554
 
         The following example will generate px = 4.35362028... with nsteps = 100 and npaths = 250,
         which is similar to BS example above.
@@ -126,7 +132,7 @@ class Gap(European):
         >>> s = Stock(S0=50, vol=.2)
         >>> o = Gap(ref=s, right='put', K=57, T=1, rf_r=.09)
         >>> o.calc_px(K2=50, method='MC', nsteps=10, npaths=5, rng_seed=2).px_spec   # doctest: +ELLIPSIS
-        PriceSpec...px: 6.803865574...
+        PriceSpec...px: 2.865762297...
 
 
         **FD**
@@ -136,12 +142,12 @@ class Gap(European):
         >>> s = Stock(S0=500000, vol=.2)
         >>> o = Gap(ref=s, right='put', K=400000, T=1, rf_r=.05, desc='Hull p.601 Example 26.1')
         >>> o.pxFD(K2=350000,npaths=10, nsteps=10)
-        5745.438398555
+        5865.905822682
 
         >>> s = Stock(S0=50, vol=.2)
         >>> o = Gap(ref=s, right='call', K=50, T=1, rf_r=.09)
         >>> o.pxFD(K2=50, npaths=10, nsteps=10)
-        6.811132138
+        6.849423208
 
         >>> s = Stock(S0=500000, vol=.2)
         >>> o = Gap(ref=s, right='put', K=400000, T=1, rf_r=.05, desc='Hull p.601 Example 26.1')
@@ -159,7 +165,7 @@ class Gap(European):
             Runmin Zhang <z.runmin@gmail.com>
         """
         self.save2px_spec(on=on, K2=K2, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.        See ``calc_px()`` for complete documentation.
@@ -185,6 +191,23 @@ class Gap(European):
         self.px_spec.add(px=px, sub_method='standard; Hull p.335', K2_BS_specs=sp, px_call=px_call, px_put=px_put)
         return self
 
+    def _greeks_BS(self, **kwargs):
+        """ Closed-form greeks of a gap option. See ``OptionValuation.calc_greeks()``.
+
+        Gap option is a vanilla option with digitals struck at trigger ``K2``, but paying strike ``K``.
+
+        Examples
+        --------
+        >>> o = Gap(ref=Stock(S0=500000, vol=.2), right='put', K=400000, T=1, rf_r=.05)
+        >>> g = o.calc_greeks(K2=350000).px_spec.greeks
+        >>> n = o._greeks_bump(method='BS', K2=350000)
+        >>> all(abs(g[k] - n[k]) < 1e-4 * (1 + abs(n[k])) for k in g)
+        True
+        """
+        _ = self
+        g = European._BS_greeks(_.ref.S0, _.K, _.T, _.ref.vol, _.rf_r, _.ref.q, _.signCP, K2=_.px_spec.K2)
+        return {k: float(g[k]) for k in ('delta', 'gamma', 'vega', 'theta', 'rho')}
+
     def _calc_LT(self):
         """ Internal function for option valuation.
         A binomial tree pricer of Gap options that takes the average results for given step sizes in NSteps.
@@ -244,25 +267,20 @@ class Gap(European):
             Mengyan Xie <xiemengy@gmail.com>
         """
         _ = self.px_spec;   n, m, K2, rng_seed = _.nsteps, _.npaths, _.K2, _.rng_seed
-        _ = self.ref;       S0, vol, q = _.S0, _.vol, _.q
-        _ = self;           T, K, rf_r, net_r, sCP = _.T, _.K, _.rf_r, _.net_r, _.signCP
+        _ = self;           T, K, rf_r, sCP = _.T, _.K, _.rf_r, _.signCP
 
-        dt = T / n
-        df = np.exp(-rf_r * dt)
-        np.random.seed(rng_seed)
+        df = np.exp(-rf_r * T)
 
-        # Stock price paths
-        S = S0 * np.exp(np.cumsum(np.random.normal((rf_r - 0.5 * vol ** 2) * dt, vol * np.sqrt(dt), (n + 1, m)), axis=0))
-        S[0] = S0
-        s2 = S
+        # Terminal stock prices. Payout is signCP * (S - K1), if the stock price is beyond K2 (floored at 0)
+        gen = self._path_generator(nsteps=n, npaths=m, rng_seed=rng_seed)
+        h = lambda S: df * np.where(sCP * (S[-1] - K2) > 0, np.maximum(sCP * (S[-1] - K), 0), 0)
 
-        V = np.maximum(_.signCP * (S - K2), 0)  # When the stock price is greater than K2
-        payout = np.maximum(_.signCP * (s2 - K), 0)  # The payout is signCP * (S - K1)
-        h = np.where(V > 0.0, payout, V)  # payout if V > 0.0, payout else 0.0
+        # control variates: vanilla option with strike K2 (priced by BS formula) and the underlying itself
+        vanilla = (lambda S: df * np.maximum(sCP * (S[-1] - K2), 0),
+                   lambda: European(ref=self.ref, right=self.right, K=K2, T=T, rf_r=rf_r, frf_r=self.frf_r).pxBS())
+        px = self._mc_stream(gen, h, controls=dict(european=vanilla, underlying=(lambda S: df * S[-1], self._fwd_pv)))
 
-        for t in range(n-1, -1, -1): h[t,:] = h[t+1,:] * df   # Add the time value of each steps
-
-        self.px_spec.add(px=float(np.mean(h[0, :])), sub_method='Hull p.601')
+        self.px_spec.add(px=float(px.px), sub_method='Hull p.601')
         return self
 
     def _calc_FD(self):
@@ -273,60 +291,21 @@ class Gap(European):
         """
         # Get parameters
         _ = self.px_spec;   n, m, K2 = _.nsteps, _.npaths, _.K2
-        _ = self.ref;       S0, vol, q = _.S0, _.vol, _.q
-        _ = self;           T, K, rf_r, net_r, sCP = _.T, _.K, _.rf_r, _.net_r, _.signCP
-
-        S_max   = S0*2                                # Maximum stock price
-        S_min   = 0.0                                 # Minimum stock price
-        d_t     = T/(n-1)                  # Time step
-        S_vec   = np.linspace(S_min,S_max,m)   # Initialize the possible stock price vector
-        t_vec   = np.linspace(0,T,n)       # Initialize the time vector
-        f_px    = np.zeros((m,n))     # Initialize the matrix. Hull's P482
+        _ = self;           S0, T, K, rf_r = _.ref.S0, _.T, _.K, _.rf_r
 
-        M = m - 1
-        N = n-1
-
-        # Set boundary conditions.
-        f_px[:,-1]=S_vec
+        S_vec   = np.linspace(0.0, S0*2, m)     # Initialize the possible stock price vector, up to S_max = 2*S0
+        g       = self._fd_grid(S_vec, nsteps=n-1)
+        tau     = T - g.t                       # Time to expiry at each time node
 
+        # Set boundary conditions: payout at the maturity time and values at S_min and S_max.
         if self.right=='call':
-            # Payout at the maturity time
-            init_cond = np.maximum((S_vec-K),0)*(S_vec>=K2)
-            # Boundary condition
-            upper_bound = 0
-            # Calculate the current value
-            lower_bound = np.maximum((S_vec[-1]-K),0)*(S_vec[-1]>=K2)*np.exp(-rf_r*(T-t_vec))
+            init_cond = lambda S: np.maximum((S-K),0)*(S>=K2)
+            lower_bound, upper_bound = 0, np.maximum((S_vec[-1]-K),0)*(S_vec[-1]>=K2)*np.exp(-rf_r*tau)
         elif self.right=='put':
-            # Payout at the maturity time
-            init_cond = np.maximum((K-S_vec),0)*(S_vec<=K2)
-            # Boundary condition
-            upper_bound = np.maximum((K-S_vec[0]),0)*(S_vec[0]<=K2)*np.exp(-rf_r*(T-t_vec))
-            # Calculate the current value
-            lower_bound = 0
-
-
-        #Generate Matrix B in http://www.goddardconsulting.ca/option-pricing-finite-diff-implicit.html
-        j_list = np.arange(0,M+1)
-        a_list = 0.5*d_t*(net_r*j_list-vol**2*j_list**2)
-        b_list = 1+d_t*(vol**2*j_list**2 + rf_r)
-        c_list = 0.5*d_t*(-net_r*j_list-vol**2*j_list**2)
-
-        data = (a_list[2:M],b_list[1:M],c_list[1:M-1])
-        B=sparse.diags(data,[-1,0,1]).tocsc()
-
-        # Using Implicit method to solve B-S equation
-        f_px[:,N] = init_cond
-        f_px[0,:] = upper_bound
-        f_px[M,:]=lower_bound
-        Offset = np.zeros(M-1)
-        for idx in np.arange(N-1,-1,-1):
-            Offset[0] = -a_list[1]*f_px[0,idx]
-            Offset[-1] = -c_list[M-1]*f_px[M,idx]
-            f_px[1:M,idx]=sparse.linalg.spsolve(B,f_px[1:M,idx+1]+Offset)
-            f_px[:,-1] = init_cond
-            f_px[0,:] = upper_bound
-            f_px[-1,:]=lower_bound
-
-        self.px_spec.add(px=float(np.interp(S0,S_vec,f_px[:,0])), sub_method='Implicit Method')
+            init_cond = lambda S: np.maximum((K-S),0)*(S<=K2)
+            lower_bound, upper_bound = np.maximum((K-S_vec[0]),0)*(S_vec[0]<=K2)*np.exp(-rf_r*tau), 0
+
+        g.rollback(init_cond, lower=lower_bound, upper=upper_bound)
+        self.px_spec.add(px=g.value(S0), sub_method=g.desc[g.scheme], _FD_grid=g.FD_grid())
         return self
 
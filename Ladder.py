@@ -43,11 +43,12 @@ class Ladder(European):
         >>> s = Stock(S0=50, vol=0.20, q=0.03)
         >>> o = Ladder(ref=s, right='call', K=51, T=1, rf_r=0.05)
         >>> o.pxFD(rungs=(51, 52, 53, 54, 55), npaths = 25, nsteps=10, keep_hist=True)  # npaths > 10 so that the plot is pretty
-        3.649714702
+        3.643274959
 
         Example #2 (plot)
         Shows the finite difference grid that is produced in Example #1
 
+        >>> import matplotlib.pyplot as plt
         >>> plt.matshow(o.px_spec.grid);  # doctest: +ELLIPSIS
         <...>
 
@@ -67,7 +68,7 @@ class Ladder(European):
             Patrick Granahan
         """
         self.save2px_spec(rungs=rungs, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.        """
@@ -87,58 +88,29 @@ class Ladder(European):
         :Authors:
             Patrick Granahan
         """
-        _ = self.px_spec;   n, m, rungs, keep_hist = _.nsteps, _.npaths, _.rungs, _.keep_hist
-        _ = self.ref;       S0, vol, q = _.S0, _.vol, _.q
-        _ = self;           T, K, rf_r, net_r, sCP = _.T, _.K, _.rf_r, _.net_r, _.signCP
-
-        grid = np.zeros(shape=(n + 1, m + 1))   # Create the grid/matrix
+        _ = self.px_spec;   m, keep_hist = _.npaths, _.keep_hist
+        _ = self;           S0, T, rf_r = _.ref.S0, _.T, _.rf_r
 
         # Define stock price parameters
         S_max, d_S = Ladder._choose_S_max(m, S0)  # Maximum stock price, stock price change interval
-        S_min = 0.0  # Minimum stock price
-        S_vec = np.arange(S_min, S_max + d_S, d_S)  # Possible stock price vector. (+d_S to S_max so that S_max is included)
-
-        # Define time parameters
-        d_T = T / n  # Time step
-        d_T_vec = np.arange(0, T + d_T, d_T)  # Delta time vector. (+d_T to T so that T is included)
-        discount_vec = np.exp(-rf_r * (T - d_T_vec))  # Discount vector
-
-        # Fill the matrix boundary at maturity
-        grid[n, :] = [self.payoff((stock_price,)) for stock_price in S_vec]
-
-        # Fill the matrix boundary when the stock price is S_min
-        grid[:, 0] = discount_vec * self.payoff((S_min,))
-
-        # Fill the matrix boundary when the stock price is S_max
-        grid[:, m] = discount_vec * self.payoff((S_max,))
-
-        # Explicit finite difference equations
-        def a(j):
-            discount = (1 / (1 + (rf_r * d_T)))
-            return discount * (.5 * d_T * ((vol ** 2 * j ** 2) - (net_r * j)))
-
-        def b(j):
-            discount = (1 / (1 + (rf_r * d_T)))
-            return discount * (1 - (d_T * vol ** 2 * j ** 2))
-
-        def c(j):
-            discount = (1 / (1 + (rf_r * d_T)))
-            return discount * (.5 * d_T * ((vol ** 2 * j ** 2) + (net_r * j)))
-
-        # Fill out the finite difference grid, by stepping backwards through the y axis and solving 1 row at a time
-        for i in range(n - 1, -1, -1):
-            for k in range(1, m):
-                j = m - k
-                value = a(j) * grid[i + 1, k + 1] + b(j) * grid[i + 1, k] + c(j) * grid[i + 1, k - 1]
-                if value == float("inf") or value == float("-inf") or math.isnan(value):
-                    raise Exception(
-                        "(-)Infinity or NaN found while attempting to fill the finite difference grid. "
-                        "Maybe your inputs were too small.")
-                grid[i, k] = value
-
-        if keep_hist:    self.px_spec.add(grid=grid)  # Record the history if requested
-
-        self.px_spec.add(px=float(grid[0, m - (S0 / d_S)]), sub_method='Explicit FDM') # save price
+        S_vec = np.linspace(0.0, S_max, m + 1)  # Possible stock price vector, from S_min = 0 to S_max
+
+        g = self._fd_grid(S_vec)
+        discount_vec = np.exp(-rf_r * (T - g.t))  # Discount vector
+
+        # Fill the matrix boundary at maturity, and when the stock price is S_min or S_max. Then, step backwards in time.
+        # Grid columns k run over stock prices S_max - k * d_S (j = M - k in Hull's explicit FDM),
+        # while boundary values are filled in the order of S_vec, i.e. the payoff at S_min sits in column 0.
+        payoff = lambda S: np.array([self.payoff((stock_price,)) for stock_price in S_max - S], dtype=float)
+        V = g.rollback(payoff, lower=discount_vec * self.payoff((S_max,)), upper=discount_vec * self.payoff((0.0,)))
+        if not np.isfinite(V).all():
+            raise Exception(
+                "(-)Infinity or NaN found while attempting to fill the finite difference grid. "
+                "Maybe your inputs were too small.")
+
+        if keep_hist:    self.px_spec.add(grid=g.grid[:, ::-1])  # Record the history if requested (columns as above)
+
+        self.px_spec.add(px=g.value(S0), sub_method=g.desc[g.scheme], _FD_grid=g.FD_grid()) # save price
 
         return self
 
@@ -0,0 +1,212 @@
+import numpy as np
+
+
+class BinomialLattice:
+    """ Recombining binomial (CRR) tree backed by ``numpy`` buffers.
+
+    Backward induction runs over a single rolling 1-D buffer of option values (and one of underlying prices),
+    which are overwritten in place from maturity to the root. Hence, memory is O(n) rather than O(n^2),
+    and every time step is a handful of ufunc calls instead of Python-level arithmetic on ``Vec`` tuples.
+    Full trees are only materialized (as tuples of floats) if ``keep_hist=True``.
+
+    Tree parameters can also be arrays of equal length (one element per option).
+    Then all options are rolled back simultaneously in a 2-D buffer, i.e. a batch of lattices is priced at once.
+
+    Examples
+    --------
+    See J.C.Hull's OFOD, Fig.13.10, p.289: 2-step tree for American put yields 7.43.
+
+    >>> import math;  u = math.exp(.3 * math.sqrt(1.)); d = 1 / u; p = (math.exp(.05) - d) / (u - d)
+    >>> bl = BinomialLattice(S0=50, u=u, d=d, p=p, df_dt=math.exp(-.05), nsteps=2, keep_hist=True)
+    >>> bl.spot()
+    array([27.4405818 , 50.        , 91.10594002])
+
+    >>> put = lambda S: np.maximum(52 - S, 0)
+    >>> round(bl.rollback(put, exercise=put), 9)
+    7.428401903
+
+    >>> bl.opt_tree   # doctest: +ELLIPSIS
+    ((7.428401902...,), (14.959088965..., 0.932697829...), (24.559418195..., 2.0, 0.0))
+
+    Nodes of the first two time steps are always retained. So, delta, gamma and theta come at no extra cost.
+
+    >>> bl.greeks(dt=1.)   # doctest: +ELLIPSIS
+    {'delta': -0.4606..., 'gamma': 0.0298..., 'theta': -2.7142...}
+
+    A batch of two lattices (same stock, different volatilities) is rolled back at once:
+
+    >>> u = np.exp(np.array([.3, .4])); d = 1 / u; p = (math.exp(.05) - d) / (u - d)
+    >>> BinomialLattice(S0=50, u=u, d=d, p=p, df_dt=math.exp(-.05), nsteps=2).rollback(put, exercise=put)
+    array([7.4284019 , 9.87913002])
+    """
+    def __init__(self, S0, u, d, p, df_dt, nsteps, keep_hist=False):
+        """ Constructor.
+
+        Parameters
+        ----------
+        S0 : float, array_like
+            price of the underlying at the root node
+        u, d : float, array_like
+            up and down move factors per time step
+        p : float, array_like
+            risk-neutral probability of up move
+        df_dt : float, array_like
+            discount factor per time step
+        nsteps : int
+            number of time steps (tree has ``nsteps + 1`` terminal nodes)
+        keep_hist : bool
+            If ``True``, ``ref_tree`` and ``opt_tree`` (tuples of tuples of floats) are saved during backward induction.
+            Only available for a single (non-batch) lattice.
+        """
+        self.n = int(nsteps)
+        self.batch = any(np.ndim(x) > 0 for x in (S0, u, d, p, df_dt))
+        assert not (keep_hist and self.batch), 'Ooops. keep_hist is not available for a batch of lattices'
+
+        # trailing axis enumerates tree nodes, leading axis (if any) enumerates options in a batch
+        col = (lambda x: np.asarray(x, dtype=float)[..., None]) if self.batch else float
+        self.S0, self.u, self.d, self.p, self.df_dt = (col(x) for x in (S0, u, d, p, df_dt))
+        self.keep_hist = keep_hist
+        self.ref_tree = self.opt_tree = None
+        self.head = None    # (S, O) node values of time steps 0, 1, 2
+
+    def spot(self, i=None):
+        """ Prices of the underlying at time step ``i`` (default: maturity), in increasing order.
+
+        Parameters
+        ----------
+        i : int, optional
+            time step, ``0 <= i <= nsteps``
+
+        Returns
+        -------
+        numpy.ndarray
+            ``i + 1`` node prices ``S0 * d**(i-j) * u**j``, ``j = 0..i``
+        """
+        i = self.n if i is None else i
+        return self.d ** np.arange(i, -1, -1) * self.u ** np.arange(0, i + 1) * self.S0
+
+    def terminal_probs(self, nsteps=None):
+        """ Risk-neutral probabilities of reaching each terminal node.
+
+        Log-factorials are used to avoid overflow and truncation of binomial coefficients for large ``nsteps``.
+
+        Parameters
+        ----------
+        nsteps : int, optional
+            number of time steps to maturity. Default: all steps of the lattice.
+
+        Returns
+        -------
+        numpy.ndarray
+            binomial probabilities of ``nsteps + 1`` terminal nodes (in order of ``spot()``)
+
+        Examples
+        --------
+        >>> BinomialLattice(S0=1, u=2, d=.5, p=.5, df_dt=1, nsteps=2).terminal_probs()
+        array([0.25, 0.5 , 0.25])
+        """
+        n = self.n if nsteps is None else nsteps
+        incr_n = np.arange(0, n + 1)
+        csl = np.concatenate(((0.,), np.cumsum(np.log(np.arange(1, n + 1)))))
+        return np.exp(csl[n] - csl - csl[::-1] + incr_n * np.log(self.p) + incr_n[::-1] * np.log(1 - self.p))
+
+    def expectation(self, payoff):
+        """ Discounted expected terminal payoff, i.e. price of a path-independent European-style claim.
+
+        Backward induction is unnecessary here, so this is O(n) in time and memory.
+        Node values of the first two time steps (``head``) are also computed as expectations.
+
+        Parameters
+        ----------
+        payoff : callable
+            maps array of terminal prices of the underlying to terminal option values
+
+        Returns
+        -------
+        float, numpy.ndarray
+            present value (an array for a batch of lattices)
+        """
+        n, df_dt = self.n, self.df_dt
+        O = payoff(self.spot())
+        head = []
+        for i in range(min(n, 2) + 1):
+            pr = self.terminal_probs(n - i) * df_dt ** (n - i)
+            Oi = np.stack([np.sum(pr * O[..., j:j + n - i + 1], axis=-1) for j in range(i + 1)], axis=-1)
+            head.append((self.spot(i), Oi))
+        self.head = tuple(head)
+
+        out = head[0][1][..., 0]
+        return float(out) if not self.batch else out
+
+    def rollback(self, payoff, exercise=None, exercise_steps=None, step=None):
+        """ Backward induction from terminal payoffs to the root node.
+
+        Parameters
+        ----------
+        payoff : callable
+            maps array of terminal prices of the underlying to terminal option values
+        exercise : callable, optional
+            maps prices of the underlying to (early) exercise values, compared against continuation values.
+            ``None`` indicates no early exercise (European style).
+        exercise_steps : container of int, optional
+            time steps at which early exercise is allowed (Bermudan style). Default: all steps.
+        step : callable, optional
+            ``step(i, S, O)`` is called at every time step ``i`` (incl. maturity) after continuation and exercise values
+            are computed. It can modify option values ``O`` in place (ex. to apply barrier conditions).
+
+        Returns
+        -------
+        float, numpy.ndarray
+            option value at the root node (an array for a batch of lattices)
+        """
+        n, p, d, df_dt = self.n, self.p, self.d, self.df_dt
+        S = self.spot()
+        O = np.array(np.broadcast_to(payoff(S), S.shape), dtype=float)   # writable terminal values
+        if step is not None: step(n, S, O)
+        tmp = np.empty_like(O)
+
+        S_tree, O_tree = ((tuple(S.tolist()),), (tuple(O.tolist()),)) if self.keep_hist else (None, None)
+        head = [(S.copy(), O.copy())] if n <= 2 else []
+
+        for i in range(n - 1, -1, -1):
+            Si, Oi = S[..., :i + 1], O[..., :i + 1]
+            np.multiply(O[..., 1:i + 2], p, out=tmp[..., :i + 1])   # up-move values are taken before overwriting O
+            Oi *= (1 - p)
+            Oi += tmp[..., :i + 1]
+            Oi *= df_dt                                              # prior option prices (@time step=i)
+            np.multiply(S[..., 1:i + 2], d, out=Si)                  # prior stock prices (@time step=i)
+
+            if exercise is not None and (exercise_steps is None or i in exercise_steps):
+                np.maximum(Oi, exercise(Si), out=Oi)
+            if step is not None: step(i, Si, Oi)
+
+            if self.keep_hist: S_tree, O_tree = (tuple(Si.tolist()),) + S_tree, (tuple(Oi.tolist()),) + O_tree
+            if i <= 2: head.insert(0, (Si.copy(), Oi.copy()))
+
+        self.ref_tree, self.opt_tree, self.head = S_tree, O_tree, tuple(head)
+        return O[..., 0].copy() if self.batch else float(O[0])
+
+    def greeks(self, dt):
+        """ Delta, gamma and theta from node values of the first two time steps (``head``).
+
+        Requires a prior call to ``rollback()`` or ``expectation()`` on a lattice with at least 2 time steps.
+        See J.C.Hull's OFOD, 9ed, 2014, p.453.
+
+        Parameters
+        ----------
+        dt : float
+            length of a time step (in years)
+
+        Returns
+        -------
+        dict
+            ``delta``, ``gamma``, ``theta`` (floats, or arrays for a batch of lattices)
+        """
+        assert self.head is not None and self.n >= 2, 'Ooops. Roll back a lattice with at least 2 time steps first'
+        (_, f0), (S1, f1), (S2, f2) = self.head
+        delta = (f1[..., 1] - f1[..., 0]) / (S1[..., 1] - S1[..., 0])
+        gamma = ((f2[..., 2] - f2[..., 1]) / (S2[..., 2] - S2[..., 1]) - (f2[..., 1] - f2[..., 0]) / (S2[..., 1] - S2[..., 0])) \
+                / (.5 * (S2[..., 2] - S2[..., 0]))
+        theta = (f2[..., 1] - f0[..., 0]) / (2 * dt)
+        g = {'delta': delta, 'gamma': gamma, 'theta': theta}
+        return g if self.batch else {k: float(v) for k, v in g.items()}
@@ -98,23 +98,40 @@ class Lookback(European):
         <matplotlib.axes._subplots.AxesSubplot object at ...>
 
 
+        **MC**
+        Simulated extremum (at ``nsteps`` dates) is corrected towards the continuously monitored one.
+        Quasi-random (Sobol) paths reduce the simulation error.
+
+        >>> s = Stock(S0=50, vol=.4, q=.0)
+        >>> o = Lookback(ref=s, right='call', K=50, T=0.25, rf_r=.1, desc='Example from Hull Ch.26 Example 26.2 (p608)')
+        >>> o.pxMC(Sfl=50.0, nsteps=64, npaths=4096, rng_seed=0, sampler='sobol')     # BS price is 8.03712014
+        8.080426917
+
+        >>> o = Lookback(ref=s, right='put', K=50, T=0.25, rf_r=.1, desc='Hull p607')
+        >>> o.pxMC(Sfl=50.0, nsteps=64, npaths=4096, rng_seed=0, sampler='sobol')     # BS price is 7.79021926
+        7.820675517
+
+
         **FD**
-        Note: FD price is sensitive to nsteps. Since computation time is short for nsteps>10, an optimal nsteps=19
-        is given in examples.
+        Note: FD solves a PDE in ratio of the running extremum to the stock price (see ``_calc_FD()``).
+        ``npaths`` sets the number of intervals of this ratio. The price converges to BS price as the grid is refined.
 
         >>> s = Stock(S0=50, vol=.4, q=.0)
         >>> o = Lookback(ref=s, right='put', K=50, T=0.25, rf_r=.1, desc='Example from Hull Ch.26 Example 26.2 (p608)')
-        >>> o.pxFD(Sfl = 50.0, nsteps=3, npaths=19)
-        7.917890003
+        >>> o.pxFD(Sfl = 50.0, nsteps=10, npaths=40)
+        7.995762026
 
         >>> o = Lookback(ref=s, right='call', K=50, T=0.25, rf_r=.1, desc='Example from Hull Ch.26 Example 26.2 (p608)')
-        >>> o.pxFD(Sfl = 50.0, nsteps=3, npaths=19)
-        8.067753794
+        >>> o.pxFD(Sfl = 50.0, nsteps=10, npaths=40)
+        8.06428621
+
+        >>> o.pxFD(Sfl = 50.0, nsteps=200, npaths=400)     # BS price is 8.03712014
+        8.037364296
 
         >>> o = Lookback(ref=s, right='call', K=50, T=0.25, rf_r=.1)
         >>> from pandas import Series
         >>> expiries = range(1,11)
-        >>> O = Series([o.update(T=t).pxFD(Sfl = 50.0, nsteps=3, npaths=19) for t in expiries], expiries)
+        >>> O = Series([o.update(T=t).pxFD(Sfl = 50.0, nsteps=10, npaths=40) for t in expiries], expiries)
         >>> O.plot(grid=1, title='FD Price vs expiry (in years)') # doctest: +ELLIPSIS
         <matplotlib.axes._subplots.AxesSubplot object at ...>
 
@@ -125,7 +142,7 @@ class Lookback(European):
             Yen-fei Chen <yensfly@gmail.com>
        """
         self.save2px_spec(Sfl=Sfl, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
 
     def _calc_LT(self):
@@ -135,44 +152,31 @@ class Lookback(European):
             Hanting Li <hl45@rice.edu>
         """
 
-        keep_hist = getattr(self.px_spec, 'keep_hist', False)
         n = getattr(self.px_spec, 'nsteps', 3)
         _ = self._LT_specs()
+        bl = self._lattice()
 
-        # Get the Price based on Binomial Tree
-        S = (self.ref.S0,)
-        S_tree = S
-        K_tree = S
-
-        # Compute the Strike Tree
-        for i in range(0, n, 1):
-            if (self.signCP == -1):
-                K = tuple(_['u'] * np.array(S)) + (S[len(S)-1],)
-            else:
-                K = (S[0],) + tuple(_['d'] * np.array(S))
-            S = tuple(_['u'] * np.array(S)) + (_['d']*S[len(S)-1],)
-            # The Spot Tree
-            S_tree = (tuple([float(s) for s in S]),) + S_tree
-            # The Strike Tree
-            K_tree = (tuple([float(k) for k in K]),) + K_tree
-
-        # The terminal stock price
-        ST = self.ref.S0 * _['d'] ** np.arange(n, -1, -1) * _['u'] ** np.arange(0, n + 1)
-        K = K_tree[0]
-        # The payoff tree
-        O = np.maximum(self.signCP * (ST - K), 0)
-        O_tree = (tuple([float(o) for o in O]),)
+        # The Strike Tree: terminal strikes are taken from (descending) spot prices one step before expiry
+        S = bl.spot(max(n - 1, 0))[::-1]
+        if n == 0: K = S
+        elif self.signCP == -1: K = np.append(_['u'] * S, S[-1])
+        else: K = np.append(S[0], _['d'] * S)
 
         # Generate the Payoff tree
-        for i in range(n, 0, -1):
-            O = _['df_dt'] * ((1 - _['p']) * O[:i] + ( _['p']) * O[1:])  #prior option prices (@time step=i-1)
-            O_tree = (tuple([float(o) for o in O]),) + O_tree
+        px = bl.rollback(lambda ST: np.maximum(self.signCP * (ST - K), 0))
 
-        self.px_spec.add(px=float(Util.demote(O)), method='LT', sub_method='binomial tree; Hull Ch.13',\
-                        LT_specs=_, ref_tree = S_tree if keep_hist else None, opt_tree = O_tree if keep_hist else None)
+        self.px_spec.add(px=px, method='LT', sub_method='binomial tree; Hull Ch.13',\
+                        LT_specs=_, ref_tree=bl.ref_tree, opt_tree=bl.opt_tree)
 
         return self
 
+    def _greeks_LT(self, **kwargs):
+        """ Tree greeks by repricing, see ``OptionValuation._greeks_bump()``.
+
+        Tree nodes near the root do not hold values of this option, so they can't be used for greeks.
+        """
+        return self._greeks_bump(method='LT', **kwargs)
+
     def _calc_BS(self):
         """ Internal function for option valuation.        See ``calc_px()`` for complete documentation.
 
@@ -228,6 +232,23 @@ class Lookback(European):
     def _calc_MC(self):
         """ Internal function for option valuation.        See ``calc_px()`` for complete documentation.
         """
+        _ = self;           T, rf_r, sCP, vol = _.T, _.rf_r, _.signCP, _.ref.vol
+        _ = self.px_spec;   rng_seed, Sfl, n, m = _.rng_seed, _.Sfl, _.nsteps, _.npaths
+
+        # Extremum observed at n dates is shifted by 0.5826 * vol * sqrt(dt) (continuity correction of
+        # Broadie, Glasserman and Kou, 1997), to approximate continuously monitored extremum of BS price.
+        shift = math.exp(-sCP * 0.5826 * vol * math.sqrt(T / n))
+
+        df = math.exp(-rf_r * T)
+
+        def payoff(S):
+            ext = (S.min(axis=0) if sCP == 1 else S.max(axis=0)) * shift
+            ext = np.minimum(ext, Sfl) if sCP == 1 else np.maximum(ext, Sfl)    # extremum achieved to date
+            return df * sCP * (S[-1] - ext)
+
+        px = self._mc_stream(self._path_generator(nsteps=n, npaths=m, rng_seed=rng_seed), payoff).px
+        self.px_spec.add(px=float(px), sub_method='Monte Carlo; continuity correction of discrete extremum')
+
         return self
 
     def _calc_FD(self):
@@ -236,39 +257,22 @@ class Lookback(European):
         :Authors:
             Yen-fei Chen <yensfly@gmail.com>
         """
-        _ = self
-        M = getattr(self.px_spec, 'npaths', 5) # no. intervals of stock price
-        J = np.arange(1,M) # indices of stock prices
-        Smax = 2*_.ref.S0
-        S = np.linspace(0, Smax, M+1)
-
-        N = getattr(self.px_spec, 'nsteps', 5) # no. intervals of time
-        dt = _.T/N # time interval
-
-        a = (-0.5*(_.rf_r - _.ref.q)*J*dt+0.5*_.ref.vol**2*J**2*dt)/(1+_.rf_r*dt)
-        b = (1-_.ref.vol**2*J**2*dt)/(1+_.rf_r*dt)
-        c = (0.5*(_.rf_r - _.ref.q)*J*dt+0.5*_.ref.vol**2*J**2*dt)/(1+_.rf_r*dt)
-        A = np.diag(b) + np.diag(a[1:M-1], k=-1) + np.diag(c[0:M-2], k=+1)
-
-        # set up boundary condition
-        p = np.zeros((N+1, M+1)) # FD option price storage
-        p[-1,:] = np.array(np.maximum(_.signCP*(S-_.px_spec.Sfl), [0]*(M+1))) # option price when t=T
-        p[:,-1] = np.array( [np.maximum(_.signCP*(Smax-_.px_spec.Sfl), 0)]*(N+1) ) # option price when S=Smax
-        p[:,0] = np.array( [np.maximum(_.signCP*(0-_.px_spec.Sfl), 0)]*(N+1) ) # option price when S=0
-
-        for i in range(N,0,-1):
-            y = np.zeros(M-1)
-            y[0] = a[0]*p[i,0]
-            y[-1] = c[-1]*p[i,-1]
-            p[i-1,1:M] = np.dot(p[i,1:M],A)+y
-            p[i-1,:] = np.maximum(_.signCP*(S-_.px_spec.Sfl), p[i-1,:])
-
-
-        if _.signCP==1:
-            index = np.where(S>_.ref.S0)
-            self.px_spec.add(px=float(p[0, index[0][0]]), method='FD', sub_method='Implicit')
-        else:
-            index = np.where(S<=_.ref.S0)
-            self.px_spec.add(px=float(p[0,index[0][-1]-1]), method='FD', sub_method='Implicit')
+        _ = self.px_spec;   M, Sfl = _.npaths, _.Sfl     # no. intervals of grid, extremum of stock price so far
+        _ = self;           S0, sCP, T, r, q, vol = _.ref.S0, _.signCP, _.T, _.rf_r, _.ref.q, _.ref.vol
+
+        # Similarity reduction V(S, Sfl, t) = S * W(x, t), x = Sfl / S, yields a Black-Scholes PDE in x,
+        # with rates r and q swapped, and zero slope of W at x = 1 (where the extremum is being reset).
+        x0 = Sfl / S0
+        if sCP == 1:    # call: x = Smin / S lies in [0, 1]; W(0) is the forward of a unit of stock
+            x = np.linspace(0, 1, M + 1)
+            lower, upper = lambda t: math.exp(-q * (T - t)), None
+        else:           # put: x = Smax / S lies in [1, x_max]; for large x, extremum is unlikely to change
+            x = np.linspace(1, max(x0, 1) * math.exp(5 * vol * math.sqrt(T)), M + 1)
+            lower, upper = None, lambda t: x[-1] * math.exp(-r * (T - t)) - math.exp(-q * (T - t))
+
+        g = self._fd_grid(x, rf_r=q, q=r)
+        bound = lambda f: None if f is None else np.vectorize(f)(g.t)
+        g.rollback(lambda x: sCP * (1 - x), lower=bound(lower), upper=bound(upper))
+        self.px_spec.add(px=S0 * g.value(x0), method='FD', sub_method=g.desc[g.scheme])
 
         return self
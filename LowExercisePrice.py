@@ -4,7 +4,6 @@ try:    from qfrm.European import *  # production:  if qfrm package is installed
 except:    from European import *  # development: if not installed and running from source
 
 
-from scipy import sparse
 
 class LowExercisePrice(European):
     """ `Low Exercise Price (LEPO) <https://en.wikipedia.org/wiki/Low_Exercise_Price_Option>`_ exotic option class.
@@ -74,19 +73,19 @@ class LowExercisePrice(European):
         >>> s = Stock(S0=5, vol=.30)
         >>> o = LowExercisePrice(ref=s,T=4,rf_r=.10)
         >>> o.pxFD(nsteps=4,npaths=10)
-        4.407303373
+        4.516342743
 
         >>> s = Stock(S0=19.6, vol=.21)
         >>> o = LowExercisePrice(ref=s,T=5,rf_r=.05)
         >>> o.calc_px(method='FD',nsteps=4,npaths=10) # doctest: +ELLIPSIS
-        LowExercisePrice...px: 18.657861519...
+        LowExercisePrice...px: 18.940869395...
 
         From DerivaGem. S0=5, K=0.01, vol=0.30, T=2, rf_r=0.1, Steps=4, Binomial European Call
 
         >>> s = Stock(S0=5, vol=.30)
         >>> o = LowExercisePrice(ref=s,T=2,rf_r=.10)
         >>> print(o.calc_px(method='FD',nsteps=4,npaths = 10,keep_hist=False).px_spec.px) # doctest: +ELLIPSIS
-        4.841966227...
+        4.895110688...
 
         :Authors:
             Runmin Zheng
@@ -97,7 +96,7 @@ class LowExercisePrice(European):
         self.right='call'
 
         self.save2px_spec(**kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.  """
@@ -176,67 +175,19 @@ class LowExercisePrice(European):
         time_steps = getattr(self.px_spec, 'nsteps', 3)
         px_paths = getattr(self.px_spec, 'npaths', 3)
 
-        # Initial the matrix. Hull's P482
-        S_max = S0*2
-        S_min = 0.0
-        d_px = S_max/(px_paths-1)
-        d_t = ttm/(time_steps-1)
-        S_vec = np.linspace(S_min,S_max,px_paths)
-        t_vec = np.linspace(0,ttm,time_steps)
-
-        f_px = np.zeros((px_paths,time_steps))
-
-
-        M = px_paths - 1
-        N = time_steps-1
-
-        f_px[:,-1]=S_vec
-
-        # Set boundary conditions.
-
+        # Grid of px_paths stock prices from S_min = 0 to S_max = 2*S0 and (time_steps - 1) time steps. Hull's P482
+        S_vec = np.linspace(0.0, S0*2, px_paths)
+        g = self._fd_grid(S_vec, nsteps=time_steps-1)
+        disc = np.exp(-r*(ttm-g.t))
 
+        # Set boundary conditions: payout at the maturity time and values at S_min and S_max.
         if self.right=='call':
-            # Payout at the maturity time
-            init_cond = np.maximum((S_vec-K),0)*(S_vec>=K2)
-            # Boundary condition
-            upper_bound = 0
-            # Calculate the current value
-            lower_bound = np.maximum((S_vec[-1]-K),0)*(S_vec[-1]>=K2)*np.exp(-r*(ttm-t_vec))
+            init_cond = lambda S: np.maximum((S-K),0)*(S>=K2)
+            lower_bound, upper_bound = 0, np.maximum((S_vec[-1]-K),0)*(S_vec[-1]>=K2)*disc
         elif self.right=='put':
-            # Payout at the maturity time
-            init_cond = np.maximum((K-S_vec),0)*(S_vec<=K2)
-            # Boundary condition
-            upper_bound = np.maximum((K-S_vec[0]),0)*(S_vec[0]<=K2)*np.exp(-r*(ttm-t_vec))
-            # Calculate the current value
-            lower_bound = 0
-
-
-        #Generate Matrix B in http://www.goddardconsulting.ca/option-pricing-finite-diff-implicit.html
-        j_list = np.arange(0,M+1)
-        a_list = 0.5*d_t*((r-q)*j_list-vol**2*j_list**2)
-        b_list = 1+d_t*(vol**2*j_list**2 + r)
-        c_list = 0.5*d_t*(-(r-q)*j_list-vol**2*j_list**2)
-
-        data = (a_list[2:M],b_list[1:M],c_list[1:M-1])
-        B=sparse.diags(data,[-1,0,1]).tocsc()
-
-
-
-        #K = np.zeros(M-1)
-        f_px[:,N] = init_cond
-        f_px[0,:] = upper_bound
-        f_px[M,:]=lower_bound
-        Offset = np.zeros(M-1)
-        for idx in np.arange(N-1,-1,-1):
-            Offset[0] = -a_list[1]*f_px[0,idx]
-            Offset[-1] = -c_list[M-1]*f_px[M,idx]
-            #f_px[1:M,idx] = scipy.linalg.solve(B,f_px[1:M,idx+1]-K)
-            f_px[1:M,idx]=sparse.linalg.spsolve(B,f_px[1:M,idx+1]+Offset)
-            f_px[:,-1] = init_cond
-            f_px[0,:] = upper_bound
-            f_px[-1,:]=lower_bound
-
-        self.px_spec.add(px=float(np.interp(S0,S_vec,f_px[:,0])), sub_method='Implicit Method')
-        # if self.keep_hist == True:
-        #     self.px_spec.add(opt_tree=f_px)
+            init_cond = lambda S: np.maximum((K-S),0)*(S<=K2)
+            lower_bound, upper_bound = np.maximum((K-S_vec[0]),0)*(S_vec[0]<=K2)*disc, 0
+
+        g.rollback(init_cond, lower=lower_bound, upper=upper_bound)
+        self.px_spec.add(px=g.value(S0), sub_method=g.desc[g.scheme], _FD_grid=g.FD_grid())
         return self
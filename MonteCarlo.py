@@ -0,0 +1,866 @@
+import math
+import os
+import numpy as np
+
+
+class PathGenerator:
+    """ Vectorized simulator of geometric Brownian motion (GBM) paths of one or several correlated assets.
+
+    All paths are generated at once, as a ``(nsteps + 1, npaths)`` array (single asset)
+    or a ``(nsteps + 1, npaths, nassets)`` array (several assets), with spot prices in the first row.
+    Log-returns are accumulated in place, so no per-path or per-step Python loops are involved.
+
+    Paths are split into blocks (see ``block_paths()``), each drawn from its own random stream:
+    a ``numpy.random.Generator`` (PCG64) seeded by a child of ``SeedSequence(rng_seed)``.
+    So, simulation is reproducible and global random state is left untouched.
+    Alternatively (``sampler='sobol'``), shocks come from a scrambled Sobol sequence (quasi-Monte Carlo)
+    and paths are built with a Brownian bridge, so that the first (best distributed) Sobol coordinates
+    determine terminal prices and the coarse shape of paths. For smooth payoffs, pricing error then decays
+    nearly as ``1 / npaths``, rather than ``1 / sqrt(npaths)``.
+    With ``antithetic=True``, every other path is driven by negated shocks of its predecessor (antithetic pairs).
+
+    Block size depends only on ``npaths`` (see ``block_size()``), and Sobol blocks skip ahead in a single sequence.
+    Hence, blocks can be simulated in any order by any process (see ``pmap()``) or streamed in chunks
+    (see ``iter_paths()``) with the same paths as ``paths()``, which depend on ``rng_seed`` and ``npaths`` only.
+
+    Examples
+    --------
+    >>> g = PathGenerator(S0=50, vol=.3, T=1, rf_r=.05, nsteps=4, npaths=3, rng_seed=0)
+    >>> g.paths().shape
+    (5, 3)
+    >>> g.paths()[:, 0]
+    array([50.        , 62.16714524, 54.41744334, 60.84490605, 60.9747387 ])
+
+    Risk-neutral drift: mean terminal price is the forward price, 51.01 (with continuous dividend yield of 3%).
+
+    >>> S = PathGenerator(S0=50, vol=.3, T=1, rf_r=.05, q=.03, nsteps=1, npaths=200000, rng_seed=2).paths()
+    >>> round(float(S[-1].mean()), 1)
+    51.0
+
+    Two assets with correlation of 0.5:
+
+    >>> S = PathGenerator(S0=(50, 100), vol=(.3, .2), T=1, rf_r=.05, cor=.5, nsteps=2, npaths=100000, rng_seed=0).paths()
+    >>> S.shape
+    (3, 100000, 2)
+    >>> round(float(np.corrcoef(np.log(S[-1]).T)[0, 1]), 2)
+    0.5
+
+    Unequally spaced time nodes, ex. exercise dates of a Bermudan option:
+
+    >>> PathGenerator(S0=50, vol=.3, T=None, nsteps=None, npaths=3, times=(.25, .5, 1.)).dts
+    array([0.25, 0.25, 0.5 ])
+
+    Quasi-random (Sobol) paths: 4096 of them estimate the forward price far more precisely than pseudo-random ones.
+
+    >>> fwd = 50 * math.exp(.02)
+    >>> err = lambda sampler: abs(float(PathGenerator(S0=50, vol=.3, T=1, rf_r=.05, q=.03, nsteps=8, npaths=4096,
+    ...                                 rng_seed=0, sampler=sampler).paths()[-1].mean()) - fwd)
+    >>> err('sobol') < .01 < err('pseudo')
+    True
+    """
+    samplers = ('pseudo', 'sobol')
+
+    def __init__(self, S0, vol, T, nsteps, npaths, rf_r=0., q=0., frf_r=0., cor=None, rng_seed=None, times=None,
+                 sampler='pseudo', antithetic=False):
+        """ Constructor.
+
+        Parameters
+        ----------
+        S0 : float, array_like
+            spot price(s) of the underlying asset(s). A sequence indicates several assets.
+        vol : float, array_like
+            volatility (volatilities) of the asset(s)
+        T : float
+            time horizon (in years)
+        nsteps : int
+            number of time steps
+        npaths : int
+            number of simulated paths
+        rf_r : float
+            risk free rate
+        q : float, array_like
+            continuous dividend yield(s)
+        frf_r : float
+            foreign risk free rate (subtracted from drift, like dividend yield)
+        cor : float, array_like, optional
+            correlation of asset returns: a single number (the same for all pairs of assets)
+            or a full correlation matrix. Ignored for a single asset.
+        rng_seed : int, None, optional
+            seed of random number generator
+        times : array_like, optional
+            increasing (not necessarily equally spaced) time nodes after time 0, ex. exercise dates.
+            If given, they override ``T`` and ``nsteps`` (last node is the horizon).
+        sampler : {'pseudo', 'sobol'}
+            pseudo-random normals (``numpy.random.Generator``)
+            or scrambled Sobol points (``scipy.stats.qmc.Sobol``) with Brownian bridge construction
+        antithetic : bool
+            If ``True``, paths come in antithetic pairs: shocks ``Z`` and ``-Z`` (``npaths`` must be even).
+            Pairs are adjacent, so ``MCEstimate`` averages them before computing standard errors.
+        """
+        assert sampler in self.samplers, 'Ooops. Sampler must be one of ' + ', '.join(self.samplers)
+        self.S0 = np.asarray(S0, dtype=float)
+        self.nassets = self.S0.size if self.S0.ndim > 0 else None
+        shape = () if self.nassets is None else (self.nassets,)
+        self.vol, self.q = (np.broadcast_to(np.asarray(x, dtype=float), shape) for x in (vol, q))
+        if times is not None:
+            times = np.asarray(times, dtype=float)
+            assert times.ndim == 1 and times[0] > 0 and (np.diff(times) > 0).all(), \
+                'Ooops. Time nodes must be positive and increasing'
+            T, nsteps = float(times[-1]), times.size
+        self.T, self.nsteps, self.npaths = T, int(nsteps), int(npaths)
+        self.rf_r, self.frf_r, self.rng_seed = rf_r, frf_r, rng_seed
+        self.dt = T / self.nsteps
+        self.dts = np.full(self.nsteps, self.dt) if times is None else np.diff(times, prepend=0.)   # time steps
+        self.cor = None if self.nassets is None else self._cor_matrix(cor, self.nassets)
+        self.sampler, self.antithetic = sampler, antithetic
+        self.seed_seq = np.random.SeedSequence(rng_seed)    # root of random streams of blocks of paths
+        assert not antithetic or self.npaths % 2 == 0, 'Ooops. Antithetic sampling needs an even number of paths'
+
+    @staticmethod
+    def _cor_matrix(cor, nassets):
+        """ Full correlation matrix from a single correlation coefficient or a matrix.  """
+        if cor is None: cor = 0.
+        if np.ndim(cor) == 0:
+            return np.full((nassets, nassets), float(cor)) + np.eye(nassets) * (1 - float(cor))
+        cor = np.asarray(cor, dtype=float)
+        assert cor.shape == (nassets, nassets), 'Ooops. Correlation matrix must be of size nassets x nassets'
+        return cor
+
+    def _factor(self):
+        """ Factor ``L`` of correlation matrix, ``L @ L.T == cor``: Cholesky, or from eigen-decomposition,
+        if the matrix is only semi-definite (ex. perfectly correlated assets).  """
+        try:
+            return np.linalg.cholesky(self.cor)
+        except np.linalg.LinAlgError:
+            w, V = np.linalg.eigh(self.cor)
+            return V * np.sqrt(np.maximum(w, 0))
+
+    def _bridge(self):
+        """ Brownian bridge schedule: ``(j, l, r, wl, wr, sd)`` fills Brownian motion at time node ``j``
+        as ``wl * W[l] + wr * W[r] + sd * Z`` from already filled nodes ``l < j < r`` (``l = -1`` is time 0).
+        Terminal node comes first, then midpoints of ever smaller intervals.  """
+        t = np.cumsum(self.dts)
+        tt = lambda j: 0. if j < 0 else t[j]
+        n = self.nsteps
+        schedule, intervals = [(n - 1, -1, n - 1, 0., 0., math.sqrt(t[-1]))], [(-1, n - 1)]
+        while intervals:
+            l, r = intervals.pop(0)
+            if r - l < 2: continue
+            j = (l + r) // 2
+            a, b = tt(j) - tt(l), tt(r) - tt(j)
+            schedule.append((j, l, r, b / (a + b), a / (a + b), math.sqrt(a * b / (a + b))))
+            intervals += [(l, j), (j, r)]
+        return schedule
+
+    def _sobol_normals(self, npaths, rng):
+        """ Independent standard normal increments (per unit time step) from Sobol points via a Brownian bridge.  """
+        import warnings
+        from scipy.special import ndtri
+        with warnings.catch_warnings():     # balance properties of Sobol points are best for powers of 2 points
+            warnings.simplefilter('ignore')
+            U = rng.random(npaths)
+        Z = ndtri(np.clip(U, 1e-12, 1 - 1e-12)).reshape(npaths, self.nsteps, -1).transpose(1, 0, 2)
+
+        W = np.zeros((self.nsteps + 1,) + Z.shape[1:])      # Brownian motion at time 0 (last row) and time nodes
+        for k, (j, l, r, wl, wr, sd) in enumerate(self._bridge()):
+            W[j] = wl * W[l] + wr * W[r] + sd * Z[k]
+        W[-1] = 0.
+        dW = np.diff(np.concatenate((W[-1:], W[:-1])), axis=0)
+        return dW / np.sqrt(self.dts)[:, None, None]
+
+    def normals(self, npaths=None, rng=None):
+        """ Standard normal shocks of all paths and time steps (correlated across assets), in antithetic pairs, if requested.
+
+        Shocks are drawn path by path (path-major order). Hence, consecutive draws of fewer paths
+        from the same generator (see ``iter_paths()``) reproduce shocks of a single draw of all paths.
+        The same holds for consecutive Sobol points.
+
+        Parameters
+        ----------
+        npaths : int, optional
+            number of paths. Default: ``npaths`` of this generator.
+        rng : numpy.random.Generator, scipy.stats.qmc.Sobol, optional
+            random number generator. Default: shocks of the first ``npaths`` paths are drawn
+            from random streams of their blocks (see ``block_rng()``).
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(nsteps, npaths)`` or ``(nsteps, npaths, nassets)`` array
+        """
+        npaths = self.npaths if npaths is None else npaths
+        if rng is None:
+            size = self.block_size()
+            return np.concatenate([self.normals(npaths=min(size, npaths - i), rng=self.block_rng(i // size))
+                                   for i in range(0, npaths, size)], axis=1)
+        if self.antithetic:
+            Z0 = self._draw(npaths // 2, rng)
+            Z = np.empty((Z0.shape[0], 2 * Z0.shape[1]) + Z0.shape[2:])
+            Z[:, 0::2] = Z0;  np.negative(Z0, out=Z[:, 1::2])
+            return Z
+        return self._draw(npaths, rng)
+
+    def _draw(self, npaths, rng):
+        """ Independent shocks of ``npaths`` paths. See ``normals()``.  """
+        if self.sampler == 'sobol':
+            Z = self._sobol_normals(npaths, rng)
+            if self.nassets is None: return Z[:, :, 0]
+        elif self.nassets is None:
+            return rng.standard_normal((npaths, self.nsteps)).T
+        else:
+            Z = rng.standard_normal((npaths, self.nsteps, self.nassets)).transpose(1, 0, 2)
+        return Z @ self._factor().T
+
+    def iter_paths(self, chunk_size=None, blocks=None):
+        """ Simulated prices in consecutive chunks of paths, which bounds memory used by simulation.
+
+        Blocks (see ``block_paths()``) are streamed in order, each in chunks drawn from its own random stream.
+        A chunk never spans two blocks. Chunks concatenated along paths axis are the same as ``paths()``
+        (or as ``block_paths()`` of the requested ``blocks``), regardless of ``chunk_size``.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            maximum number of paths in a chunk. Default: a whole block at once.
+        blocks : iterable of int, optional
+            indices of blocks to simulate. Default: all blocks, ``range(nblocks)``.
+
+        Returns
+        -------
+        generator
+            ``(nsteps + 1, chunk_size)`` or ``(nsteps + 1, chunk_size, nassets)`` arrays of prices
+
+        Examples
+        --------
+        >>> g = PathGenerator(S0=50, vol=.3, T=1, rf_r=.05, nsteps=4, npaths=5, rng_seed=0)
+        >>> [S.shape for S in g.iter_paths(chunk_size=2)]
+        [(5, 2), (5, 2), (5, 1)]
+        >>> bool((np.concatenate(list(g.iter_paths(chunk_size=2)), axis=1) == g.paths()).all())
+        True
+        """
+        size = self.block_size()
+        chunk_size = size if chunk_size is None else min(int(chunk_size), size)
+        if self.antithetic: chunk_size += chunk_size % 2     # antithetic pairs are not split across chunks
+        for k in (range(self.nblocks) if blocks is None else blocks):
+            rng, n = self.block_rng(k), min(size, self.npaths - k * size)
+            for i in range(0, n, chunk_size):
+                yield self.paths(self.normals(npaths=min(chunk_size, n - i), rng=rng))
+
+    def block_size(self, block_size=None):
+        """ Number of paths in a block of ``block_paths()``: ``block_size`` (even, if paths are antithetic)
+        or, by default, enough to split ``npaths`` into at most 64 blocks of at least 4096 paths.
+        It depends only on ``npaths``, so that blocks (and prices) do not depend on the number of worker processes.  """
+        if block_size is None: block_size = max(-(-self.npaths // 64), 4096)
+        block_size = min(max(int(block_size), 1), self.npaths)
+        return block_size + block_size % 2 if self.antithetic else block_size
+
+    @property
+    def nblocks(self):
+        """ Number of blocks of default size (see ``block_size()``), which together hold ``npaths`` paths.  """
+        return -(-self.npaths // self.block_size())
+
+    def block_rng(self, k, block_size=None):
+        """ Random number generator of block ``k`` of ``block_size`` paths (see ``block_size()``).
+
+        Pseudo-random blocks draw from independent streams: ``numpy.random.Generator`` (PCG64) seeded with
+        the ``k``-th child of ``SeedSequence(rng_seed)``. Sobol blocks share a single scrambled sequence,
+        fast forwarded to the first point of the block.
+        """
+        if self.sampler == 'pseudo':
+            return np.random.default_rng(np.random.SeedSequence(self.seed_seq.entropy, spawn_key=(k,)))
+
+        from scipy.stats import qmc
+        rng = qmc.Sobol(d=self.nsteps * (self.nassets or 1), scramble=True, seed=np.random.default_rng(self.seed_seq))
+        skip = k * self.block_size(block_size) // (2 if self.antithetic else 1)
+        if skip: rng.fast_forward(skip)
+        return rng
+
+    def block_paths(self, k, block_size=None):
+        """ Simulated prices of block ``k`` of paths, drawn from its own random stream (see ``block_rng()``).
+
+        Blocks ``0, 1, ...`` together hold ``npaths`` paths. They are independent of each other,
+        so they can be simulated in parallel.
+
+        Parameters
+        ----------
+        k : int
+            block index, ``0 <= k < nblocks``, where ``nblocks = ceil(npaths / block_size)``
+        block_size : int, optional
+            number of paths in a block (the last block may be smaller). See ``block_size()``.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(nsteps + 1, n)`` or ``(nsteps + 1, n, nassets)`` array of prices of ``n <= block_size`` paths
+
+        Examples
+        --------
+        >>> g = PathGenerator(S0=50, vol=.3, T=1, rf_r=.05, nsteps=4, npaths=5, rng_seed=0)
+        >>> [g.block_paths(k, 2).shape for k in range(3)]
+        [(5, 2), (5, 2), (5, 1)]
+        >>> bool((g.block_paths(1, 2) == g.block_paths(1, 2)).all()), bool((g.block_paths(0, 2)[1:] == g.block_paths(1, 2)[1:]).any())
+        (True, False)
+        >>> g = PathGenerator(S0=50, vol=.3, T=1, rf_r=.05, nsteps=4, npaths=10000, rng_seed=0)
+        >>> bool((np.concatenate([g.block_paths(k) for k in range(g.nblocks)], axis=1) == g.paths()).all())
+        True
+        """
+        block_size = self.block_size(block_size)
+        n = min(block_size, self.npaths - k * block_size)
+        assert n > 0, 'Ooops. Block index is out of range'
+        return self.paths(self.normals(npaths=n, rng=self.block_rng(k, block_size)))
+
+    def paths_per_chunk(self, mem_budget):
+        """ Largest number of paths in a chunk of ``iter_paths()``, which keeps simulation within a memory budget.
+
+        A chunk holds shocks and prices of all its paths (with a few temporaries of the same size for the Brownian bridge
+        and payoff evaluation). So, peak memory of a chunked simulation depends on the chunk size, but not on ``npaths``.
+
+        Parameters
+        ----------
+        mem_budget : float
+            memory budget in bytes
+
+        Returns
+        -------
+        int
+            number of paths in a chunk: at least 1 (or 2 antithetic paths) and at most ``npaths``
+
+        Examples
+        --------
+        >>> g = PathGenerator(S0=50, vol=.3, T=1, nsteps=99, npaths=10**6)
+        >>> g.paths_per_chunk(2 ** 20), g.paths_per_chunk(2 ** 40)
+        (327, 1000000)
+        """
+        nbytes = 8 * (self.nsteps + 1) * (self.nassets or 1) * (6 if self.sampler == 'sobol' else 4)   # per path
+        m = max(int(mem_budget // nbytes), 2 if self.antithetic else 1)
+        return min(m - m % 2 if self.antithetic else m, self.npaths)
+
+    def paths(self, Z=None):
+        """ Simulated prices of the asset(s).
+
+        Parameters
+        ----------
+        Z : numpy.ndarray, optional
+            standard normal shocks of shape given by ``normals()``. Drawn from blocks of ``rng_seed``, if not supplied.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(nsteps + 1, npaths)`` or ``(nsteps + 1, npaths, nassets)`` array of prices; first row holds spot prices
+        """
+        Z = self.normals() if Z is None else Z
+        vol, dt = self.vol, self.dts.reshape((-1,) + (1,) * (Z.ndim - 1))
+
+        S = np.empty((self.nsteps + 1,) + Z.shape[1:])
+        S[0] = 0.
+        np.multiply(Z, vol * np.sqrt(dt), out=S[1:])
+        S[1:] += (self.rf_r - self.q - self.frf_r - vol ** 2 / 2.) * dt
+        np.cumsum(S, axis=0, out=S)     # log-returns since time 0
+        np.exp(S, out=S)
+        S *= self.S0
+        return S
+
+    def successors(self, S, k, rng=None):
+        """ Prices one time step ahead of prices ``S`` of a single asset: ``k`` independent draws per price.
+
+        Used for nested (inner) simulation, ex. in ``LSM.upper_bound()``.
+
+        Parameters
+        ----------
+        S : numpy.ndarray
+            current prices
+        k : int
+            number of successors of every price
+        rng : numpy.random.Generator, optional
+            random number generator. Default: a new one seeded with ``rng_seed``.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(k,) + S.shape`` array of prices
+        """
+        assert self.nassets is None, 'Ooops. Successors are only simulated for a single asset'
+        assert np.allclose(self.dts, self.dt), 'Ooops. Successors are only simulated on equally spaced time nodes'
+        rng = np.random.default_rng(self.rng_seed) if rng is None else rng
+        vol, dt = float(self.vol), self.dt
+        Z = rng.standard_normal((k,) + np.shape(S))
+        return S * np.exp((self.rf_r - float(self.q) - self.frf_r - vol ** 2 / 2.) * dt + vol * math.sqrt(dt) * Z)
+
+
+class LSM:
+    """ Least-squares Monte Carlo (Longstaff-Schwartz) engine for options with early exercise.
+
+    Stepping back from maturity, discounted realized cash flows of in-the-money (ITM) paths are regressed
+    on basis functions of (scaled) prices of the underlying. A path is exercised, where exercise value exceeds
+    fitted continuation value. Design matrix of a time step is built once (``numpy.polynomial`` Vandermonde)
+    and is used for both the least squares fit (``numpy.linalg.lstsq`` on ITM rows) and the fitted values.
+    Prices are scaled by their mean at each time step, so that the regression is well conditioned.
+
+    Fitted coefficients are kept, so that the exercise policy can be applied to independent paths
+    (``lower_bound()``, a low-biased estimate) and used in a dual (Andersen-Broadie) estimate
+    of a high-biased price (``upper_bound()``).
+
+    Examples
+    --------
+    American put, S0=36, K=40, T=1, rf_r=.06, vol=.2, with 50 exercise dates per year.
+    Longstaff and Schwartz (2001), Table 1, report 4.472 (finite difference value is 4.478).
+
+    >>> g = PathGenerator(S0=36, vol=.2, T=1, rf_r=.06, nsteps=50, npaths=20000, rng_seed=0)
+    >>> E = np.maximum(40 - g.paths(), 0)     # exercise values
+    >>> lsm = LSM(deg=3, basis='laguerre')
+    >>> round(lsm.rollback(E, g.paths(), df=math.exp(-.06 / 50)), 3)
+    4.514
+
+    Bounds: the fitted exercise policy is applied to independent paths (low-biased).
+    The dual estimate (high-biased) uses 200 inner paths from every node of 500 outer paths.
+
+    >>> put = lambda i, S: np.maximum(40 - S, 0)
+    >>> S = PathGenerator(S0=36, vol=.2, T=1, rf_r=.06, nsteps=50, npaths=20000, rng_seed=1).paths()
+    >>> lsm.lower_bound(put(None, S), S, df=math.exp(-.06 / 50))     # doctest: +ELLIPSIS
+    (4.4773..., 0.0206...)
+    >>> g = PathGenerator(S0=36, vol=.2, T=1, rf_r=.06, nsteps=50, npaths=500, rng_seed=2)
+    >>> lsm.upper_bound(put, g.paths(), df=math.exp(-.06 / 50), successors=g.successors, ninner=200, rng_seed=3)   # doctest: +ELLIPSIS
+    (4.6646..., 0.0139...)
+    """
+    bases = {'laguerre', 'hermite', 'monomial'}
+
+    def __init__(self, deg=3, basis='laguerre', itm_only=True):
+        """ Constructor.
+
+        Parameters
+        ----------
+        deg : int
+            highest degree of basis polynomials (``deg + 1`` regressors, incl. a constant)
+        basis : {'laguerre', 'hermite', 'monomial'}
+            weighted Laguerre polynomials ``exp(-x/2) L_k(x)`` (as in Longstaff-Schwartz), probabilists' Hermite
+            polynomials (of standardized prices) or powers of scaled prices
+        itm_only : bool
+            If ``True``, only in-the-money paths (positive exercise value) enter the regression.
+        """
+        assert basis in self.bases, 'Ooops. LSM basis must be one of ' + ', '.join(sorted(self.bases))
+        assert int(deg) >= 0, 'Ooops. LSM degree must be a non-negative integer'
+        self.deg, self.basis, self.itm_only = int(deg), basis, itm_only
+        self.coef = None
+
+    def design(self, S, scale):
+        """ Design (Vandermonde-like) matrix of basis functions.
+
+        Parameters
+        ----------
+        S : numpy.ndarray
+            prices of the underlying at a time step, one per path
+        scale : tuple
+            ``(center, spread)`` of prices; prices are transformed to ``(S - center) / spread`` for Hermite basis
+            and to ``S / spread`` otherwise (spread is the mean price then)
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(npaths, deg + 1)`` matrix
+        """
+        P = np.polynomial
+        if self.basis == 'hermite': return P.hermite_e.hermevander((S - scale[0]) / scale[1], self.deg)
+        x = S / scale[1]
+        if self.basis == 'monomial': return P.polynomial.polyvander(x, self.deg)
+        return P.laguerre.lagvander(x, self.deg) * np.exp(-x / 2)[:, None]
+
+    def _scales(self, S):
+        """ Center and spread of prices at every time step, which scale regressors. See ``design()``.  """
+        m = np.mean(S, axis=1)
+        spread = np.std(S, axis=1) if self.basis == 'hermite' else m
+        return [(c, s if s > 0 else 1.) for c, s in zip(m, spread)]
+
+    @staticmethod
+    def _dfs(df, n):
+        """ Discount factors of each of ``n`` time steps (from step ``i + 1`` to step ``i``).  """
+        return np.broadcast_to(np.asarray(df, dtype=float), (n,))
+
+    def rollback(self, E, S, df, exercise_steps=None, keep_hist=False):
+        """ Backward induction with regressed continuation values. Fits (and keeps) the exercise policy.
+
+        Parameters
+        ----------
+        E : numpy.ndarray
+            ``(nsteps + 1, npaths)`` exercise values (cash flow, if exercised at a time step);
+            last row holds terminal payoffs
+        S : numpy.ndarray
+            ``(nsteps + 1, npaths)`` prices of the underlying (regressors)
+        df : float, array_like
+            discount factor of a time step (or ``nsteps`` factors, one per step)
+        exercise_steps : container of int, optional
+            time steps ``0..nsteps-1``, at which early exercise is allowed (Bermudan style). Default: all steps.
+            Exercise at time 0 is compared to continuation value (the mean of discounted cash flows).
+            Present values of cash flows (``pv``) and exercise steps (``tau``) of all paths are kept.
+        keep_hist : bool
+            If ``True``, cash flows of all paths, discounted to every time step, are saved in ``hist``,
+            an ``(nsteps + 1, npaths)`` array.
+
+        Returns
+        -------
+        float
+            option value at time 0
+        """
+        n = E.shape[0] - 1
+        dfs = self._dfs(df, n)
+        cf = np.array(E[n], dtype=float)        # cash flows, discounted to current time step
+        self.coef, self.coef_all, self.scales = [None] * (n + 1), [None] * (n + 1), self._scales(S)
+        self.hist = np.empty(E.shape) if keep_hist else None
+        if keep_hist: self.hist[n] = cf
+        self.tau = np.full(cf.shape, n)         # exercise (stopping) step of every path
+
+        for i in range(n - 1, 0, -1):
+            cf *= dfs[i]
+            X = self.design(S[i], self.scales[i])
+            self.coef_all[i] = np.linalg.lstsq(X, cf, rcond=None)[0]     # continuation value on all paths (for duals)
+            if exercise_steps is not None and i not in exercise_steps: continue
+            itm = E[i] > 0 if self.itm_only else np.ones(E.shape[1], dtype=bool)
+            if itm.sum() <= self.deg: continue      # too few paths to fit the regression
+            self.coef[i] = np.linalg.lstsq(X[itm], cf[itm], rcond=None)[0]
+            ex = itm & (E[i] > X @ self.coef[i])
+            cf[ex] = E[i][ex];  self.tau[ex] = i
+            if keep_hist: self.hist[i] = cf
+
+        cf *= dfs[0]
+        if keep_hist: self.hist[0] = cf
+        self.pv, self.stderr = cf, float(np.std(cf, ddof=1) / math.sqrt(cf.size))   # per-path present values
+        if exercise_steps is not None and 0 not in exercise_steps: return float(np.mean(cf))
+        return max(float(np.mean(E[0])), float(np.mean(cf)))
+
+    def _exercise(self, i, E, S):
+        """ Paths exercised at time step ``i`` according to fitted policy.  """
+        if self.coef[i] is None: return np.zeros(E.shape, dtype=bool)
+        return (E > 0) & (E > self.design(S, self.scales[i]) @ self.coef[i])
+
+    def lower_bound(self, E, S, df):
+        """ Low-biased price: fitted exercise policy applied to independent paths.
+
+        Parameters
+        ----------
+        E, S, df
+            exercise values, prices and discount factors of independent paths. See ``rollback()``.
+
+        Returns
+        -------
+        tuple
+            price estimate and its standard error
+        """
+        cf = self.apply(E, S, df)[0]
+        return float(np.mean(cf)), float(np.std(cf, ddof=1) / math.sqrt(cf.size))
+
+    def apply(self, E, S, df):
+        """ Fitted exercise policy applied to (independent) paths, ex. chunks of paths streamed after a pilot fit.
+
+        Parameters
+        ----------
+        E, S, df
+            exercise values, prices and discount factors of paths. See ``rollback()``.
+
+        Returns
+        -------
+        tuple
+            present values of cash flows and exercise (stopping) steps, one per path
+        """
+        assert self.coef is not None, 'Ooops. Fit exercise policy with rollback() first'
+        n = E.shape[0] - 1
+        dfs = self._dfs(df, n)
+        cf = np.array(E[n], dtype=float)
+        tau = np.full(cf.shape, n)
+        for i in range(n - 1, 0, -1):
+            cf *= dfs[i]
+            ex = self._exercise(i, E[i], S[i])
+            cf[ex] = E[i][ex];  tau[ex] = i
+        cf *= dfs[0]
+        return cf, tau
+
+    def upper_bound(self, exercise, S, df, successors, ninner=100, rng_seed=None, exercise_steps=None):
+        """ High-biased price from the dual formulation (Andersen and Broadie, 2004).
+
+        A martingale is built from value estimates ``max(exercise, fitted continuation)``, where continuation
+        is regressed on all (not only ITM) paths.
+        Its conditional expectations are estimated with ``ninner`` one-step inner paths from every node.
+
+        Parameters
+        ----------
+        exercise : callable
+            ``exercise(i, S)`` maps prices at time step ``i`` to exercise values (a Markov payoff)
+        S : numpy.ndarray
+            ``(nsteps + 1, npaths)`` prices of independent paths
+        df : float, array_like
+            discount factor(s) of a time step
+        successors : callable
+            ``successors(S, k, rng)`` draws ``k`` one-step-ahead prices of every price in ``S``,
+            ex. ``PathGenerator.successors``
+        ninner : int
+            number of inner paths per node
+        rng_seed : int, optional
+            seed of inner simulation
+        exercise_steps : container of int, optional
+            time steps with early exercise. See ``rollback()``.
+
+        Returns
+        -------
+        tuple
+            price estimate and its standard error
+        """
+        assert self.coef is not None, 'Ooops. Fit exercise policy with rollback() first'
+        n = S.shape[0] - 1
+        dfs = self._dfs(df, n)
+        D = np.concatenate(([1.], np.cumprod(dfs)))        # discount factors to time 0
+        rng = np.random.default_rng(rng_seed)
+
+        can_exercise = lambda i: i == n or exercise_steps is None or i in exercise_steps
+
+        def value(i, S):     # estimated (undiscounted) option value at time step i
+            if i == n: return exercise(i, S)
+            C = self.design(S.ravel(), self.scales[i]).dot(self.coef_all[i]).reshape(S.shape)
+            return np.maximum(exercise(i, S), C) if can_exercise(i) else C
+
+        M = np.zeros(S.shape[1])                        # martingale, discounted to time 0
+        dual = D[0] * exercise(0, S[0]) - M if can_exercise(0) else np.full(S.shape[1], -np.inf)
+        for i in range(n):
+            inner = value(i + 1, successors(S[i], ninner, rng)).mean(axis=0)
+            M += D[i + 1] * (value(i + 1, S[i + 1]) - inner)
+            if can_exercise(i + 1): dual = np.maximum(dual, D[i + 1] * exercise(i + 1, S[i + 1]) - M)
+        return float(np.mean(dual)), float(np.std(dual, ddof=1) / math.sqrt(dual.size))
+
+
+class MCEstimate:
+    """ Monte Carlo estimate of an expected (discounted) payoff, its standard error and variance reduction.
+
+    Antithetic pairs of samples (adjacent, as generated by ``PathGenerator``) are averaged first,
+    since they are not independent. Control variates ``X`` with known means ``EX`` are then regressed out:
+    ``px = mean(Y - (X - EX) @ beta)``, where ``beta`` are least squares coefficients of ``Y`` on ``X``.
+    Variance reduction ratio compares the variance of a plain sample mean of ``Y`` with that of this estimate.
+    Effective number of paths is the number of plain (independent, uncontrolled) paths with the same standard error.
+
+    Examples
+    --------
+    Call with S0=K=100, T=1, rf_r=.05, vol=.2 is worth 10.4506 (Black-Scholes).
+    Discounted terminal price is a control variate with a known mean, S0.
+
+    >>> g = PathGenerator(S0=100, vol=.2, T=1, rf_r=.05, nsteps=1, npaths=10000, rng_seed=0, antithetic=True)
+    >>> ST = g.paths()[-1];  df = math.exp(-.05)
+    >>> e = MCEstimate(df * np.maximum(ST - 100, 0), X=df * ST, EX=100, antithetic=True)
+    >>> round(e.px, 4), round(e.stderr, 4), round(e.vr_ratio, 1)
+    (10.4388, 0.0281, 27.5)
+    >>> [round(x, 2) for x in e.ci()], e.npaths_eff
+    ([10.38, 10.49], 274970)
+    """
+    z95 = 1.959963984540054     # standard normal quantile of 97.5%
+
+    def __init__(self, Y=None, X=None, EX=None, antithetic=False):
+        """ Constructor.
+
+        Parameters
+        ----------
+        Y : array_like, optional
+            ``npaths`` samples of a (discounted) payoff. More samples can be streamed in with ``add()``.
+        X : array_like, optional
+            ``npaths`` samples of a control variate, or an ``(npaths, k)`` array of ``k`` controls
+        EX : float, array_like, optional
+            known expected values of control variates
+        antithetic : bool
+            whether consecutive samples are antithetic pairs
+        """
+        self.EX, self.antithetic = None if EX is None else np.ravel(np.asarray(EX, dtype=float)), antithetic
+        self.npaths, self._plain = 0, (0, 0., 0.)       # sample size, mean and sum of squared deviations of raw Y
+        self._n, self._mean, self._M2 = 0, None, None   # the same (means and co-moments) of (paired) Y and X
+        if Y is not None: self.add(Y, X)
+
+    @staticmethod
+    def _merge(a, b):
+        """ Pooled size, mean and co-moment of two samples (Chan, Golub and LeVeque's update of Welford's algorithm).  """
+        (na, ma, Ma), (nb, mb, Mb) = a, b
+        if nb == 0: return a
+        if na == 0: return b
+        n, d = na + nb, mb - ma
+        return n, ma + d * (nb / n), Ma + Mb + np.multiply.outer(d, d) * (na * nb / n)
+
+    def add(self, Y, X=None):
+        """ Streams in a batch of samples. Statistics are updated online, so batches need not be kept in memory.
+
+        Parameters
+        ----------
+        Y : array_like
+            samples of a (discounted) payoff; an even number of them, if samples are antithetic pairs
+        X : array_like, optional
+            samples of control variates, see ``__init__()``
+
+        Returns
+        -------
+        self : MCEstimate
+
+        Examples
+        --------
+        Batches give the same estimate as all samples at once:
+
+        >>> Y = np.random.RandomState(0).standard_normal(1000)
+        >>> e = MCEstimate();  _ = [e.add(y) for y in np.split(Y, 10)]
+        >>> bool(abs(e.px - Y.mean()) < 1e-12), bool(abs(e.stderr - MCEstimate(Y).stderr) < 1e-12), e.npaths
+        (True, True, 1000)
+        """
+        Y = np.asarray(Y, dtype=float).ravel()
+        if Y.size == 0: return self
+        my = Y.mean()
+        self._plain = self._merge(self._plain, (Y.size, my, float(((Y - my) ** 2).sum())))
+        self.npaths += Y.size
+
+        Z = Y[:, None] if X is None else np.column_stack((Y, np.asarray(X, dtype=float).reshape(Y.size, -1)))
+        if self.antithetic:
+            assert Y.size % 2 == 0, 'Ooops. Antithetic samples must come in pairs'
+            Z = Z.reshape(-1, 2, Z.shape[1]).mean(axis=1)
+        m = Z.mean(axis=0);  D = Z - m
+        self._n, self._mean, self._M2 = self._merge((self._n, self._mean, self._M2), (Z.shape[0], m, D.T @ D))
+        return self
+
+    @property
+    def beta(self):
+        """ Least squares coefficients of payoff on control variates (``None`` without controls).  """
+        if self._M2 is None or self._M2.shape[0] == 1: return None
+        return np.linalg.lstsq(self._M2[1:, 1:], self._M2[1:, 0], rcond=None)[0]
+
+    @property
+    def px(self):
+        """ Price estimate (mean of controlled samples).  """
+        beta = self.beta
+        return float(self._mean[0] if beta is None else self._mean[0] - (self._mean[1:] - self.EX) @ beta)
+
+    @property
+    def stderr(self):
+        """ Standard error of the price estimate.  """
+        n, k, beta = self._n, self._M2.shape[0] - 1, self.beta
+        if n <= 1 + k: return float('nan')
+        ss = self._M2[0, 0] if beta is None else self._M2[0, 0] - self._M2[0, 1:] @ beta     # residual sum of squares
+        return float(math.sqrt(max(ss, 0.) / (n - 1 - k) / n))
+
+    @property
+    def vr_ratio(self):
+        """ Variance of a plain sample mean over variance of this estimate.  """
+        n, _, M2 = self._plain
+        stderr = self.stderr
+        return M2 / (n - 1) / n / stderr ** 2 if stderr > 0 else float('inf')
+
+    @property
+    def npaths_eff(self):
+        """ Number of plain paths, which would yield the same standard error.  """
+        vr = self.vr_ratio
+        return int(self.npaths * vr) if np.isfinite(vr) else self.npaths
+
+    def ci(self, level=.95):
+        """ Confidence interval of the price (normal approximation).
+
+        Parameters
+        ----------
+        level : float
+            confidence level
+
+        Returns
+        -------
+        tuple
+            lower and upper bounds
+        """
+        z = self.z95 if level == .95 else -MCEstimate._ndtri((1 - level) / 2)
+        return (self.px - z * self.stderr, self.px + z * self.stderr)
+
+    @staticmethod
+    def _ndtri(p):
+        """ Standard normal quantile.  """
+        from scipy.special import ndtri
+        return float(ndtri(p))
+
+    def merge(self, other):
+        """ Pools samples of another estimate (of the same payoff and controls) into this one. Returns ``self``.
+
+        Examples
+        --------
+        >>> Y = np.random.RandomState(0).standard_normal(1000)
+        >>> e = MCEstimate(Y[:300]).merge(MCEstimate(Y[300:]))
+        >>> bool(abs(e.px - Y.mean()) < 1e-12), bool(abs(e.stderr - MCEstimate(Y).stderr) < 1e-12), e.npaths
+        (True, True, 1000)
+        """
+        self.npaths += other.npaths
+        self._plain = self._merge(self._plain, other._plain)
+        self._n, self._mean, self._M2 = self._merge((self._n, self._mean, self._M2), (other._n, other._mean, other._M2))
+        return self
+
+    @staticmethod
+    def combine(estimates):
+        """ Pooled price and standard error of independent batches of paths. See ``OptionValuation._run_MC()``.
+
+        Parameters
+        ----------
+        estimates : list of tuple
+            ``(npaths, px, stderr, npaths_eff)`` of every batch
+
+        Returns
+        -------
+        tuple
+            ``(npaths, px, stderr, npaths_eff)`` of all batches: prices are weighted by numbers of paths
+
+        Examples
+        --------
+        >>> n, px, stderr, n_eff = MCEstimate.combine([(100, 1., .2, 100), (300, 2., .1, 600)])
+        >>> n, px, round(stderr, 6), n_eff
+        (400, 1.75, 0.090139, 700)
+        """
+        n = sum(e[0] for e in estimates)
+        px = sum(e[0] * e[1] for e in estimates) / n
+        stderr = math.sqrt(sum((e[0] * e[2]) ** 2 for e in estimates)) / n
+        return n, px, stderr, sum(e[3] for e in estimates)
+
+    def summary(self):
+        """ Price, standard error, 95% confidence interval, variance reduction ratio and effective number of paths,
+        as keyword arguments of ``PriceSpec.add()``.  """
+        return dict(px=self.px, stderr=self.stderr, ci=self.ci(), vr_ratio=self.vr_ratio, npaths_eff=self.npaths_eff)
+
+
+_pmap_func = None       # function mapped by worker processes of pmap(), inherited by fork
+
+
+def _pmap_call(x):
+    return _pmap_func(x)
+
+
+def pmap(func, args, nworkers=None):
+    """ Maps a function over arguments on a pool of worker processes. Results are in the order of arguments.
+
+    Workers are forked, so ``func`` need not be picklable (ex. a closure over simulated prices or a fitted ``LSM``)
+    and sees the state of this process at the time of the call. Only arguments and results are sent between processes.
+    Without ``fork`` (ex. on Windows) or with a single worker, ``func`` is mapped serially in this process.
+
+    Parameters
+    ----------
+    func : callable
+        function of a single argument, ex. a block index (see ``PathGenerator.block_paths()``)
+    args : iterable
+        arguments
+    nworkers : int, optional
+        number of worker processes. ``None`` or ``-1`` uses all CPUs.
+
+    Returns
+    -------
+    list
+        ``[func(x) for x in args]``
+
+    Examples
+    --------
+    >>> g = PathGenerator(S0=50, vol=.3, T=1, rf_r=.05, nsteps=4, npaths=10000, rng_seed=0)
+    >>> mean = lambda k: MCEstimate(g.block_paths(k, 1000)[-1])
+    >>> from functools import reduce
+    >>> e1, e4 = (reduce(MCEstimate.merge, pmap(mean, range(10), nworkers=w)) for w in (1, 4))
+    >>> e1.px == e4.px, e1.stderr == e4.stderr, round(e1.px, 2)
+    (True, True, 52.55)
+    """
+    import multiprocessing
+    global _pmap_func
+    args = list(args)
+    nworkers = os.cpu_count() or 1 if nworkers is None or nworkers == -1 else int(nworkers)
+    nworkers = min(nworkers, len(args))
+    if nworkers <= 1 or 'fork' not in multiprocessing.get_all_start_methods(): return [func(x) for x in args]
+
+    _pmap_func = func
+    try:
+        with multiprocessing.get_context('fork').Pool(nworkers) as pool:
+            return pool.map(_pmap_call, args)
+    finally:
+        _pmap_func = None
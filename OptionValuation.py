@@ -2,19 +2,21 @@ import math
 import re
 import warnings
 import itertools
-import pandas as pd
-
-# TravisCI doesn't have an Xwindows backend, causing tests to fail on plot generation.
-# This forces matplotlib to not use any Xwindows backend.
-# See http://stackoverflow.com/questions/2801882/generating-a-png-with-matplotlib-when-display-is-undefined
-import matplotlib as mpl
-mpl.use('Agg')
-
-import matplotlib.pyplot as plt
+import copy
+import numbers
+import sys
+import time
+import tracemalloc
+import collections
+import collections.abc
+import numpy as np
 
 try: from qfrm.Util import *  # production:  if qfrm package is installed
 except:   from Util import *  # development: if not installed and running from source
 
+try: from qfrm.MonteCarlo import *  # production:  if qfrm package is installed
+except:   from MonteCarlo import *  # development: if not installed and running from source
+
 
 class PriceSpec(SpecPrinter):
     """ PriceSpec verifies and saves calculated price and intermediate calculations.
@@ -87,6 +89,20 @@ class PriceSpec(SpecPrinter):
         SpecPrinter.print_precision = print_precision
         self.add(**kwargs)
 
+    def _print_state(self):
+        """ Leaves out private (underscored) intermediate results (ex. lattice or grid objects) from print out.
+        Unlike ``__getstate__``, this keeps them in copies (ex. cached prices) and pickles (ex. worker processes).
+
+        Examples
+        --------
+        >>> ps = PriceSpec(px=1.5, _lattice='nodes');  ps
+        PriceSpec
+        px: 1.5
+        >>> copy.copy(ps)._lattice
+        'nodes'
+        """
+        return {k: v for k, v in vars(self).items() if not k.startswith('_')}
+
     def add_verify(self, dtype=None, min=None, max=None, dflt=None, **kwargs):
         """ Asserts the type and range of passed ``kwargs`` parameter *key*=*value*.
 
@@ -190,6 +206,247 @@ class PriceSpec(SpecPrinter):
         return self
 
 
+class PxCache:
+    """ Size-bounded cache of calculated prices, with least recently used (LRU) entries evicted first.
+
+    Caching is opt-in: assign a cache to ``OptionValuation.px_cache`` to share it among all options
+    (or to a single option object). Set it to ``None`` to switch caching off.
+
+    A cache key is built from the current specs of an option (class, ``ref``, ``K``, ``T``, rates, right, ...)
+    and from all pricing parameters saved in ``px_spec`` (method, ``nsteps``, ``npaths``, ``rng_seed``, ...).
+    So, any change of specs (ex. via ``update()``) is a different key and previously cached price is not reused.
+    Only deterministic calculations are cached: BS, LT, FD and MC with a fixed ``rng_seed``.
+    A cache hit restores a copy of the saved ``px_spec``, without repricing.
+
+    Examples
+    --------
+    >>> from qfrm import *
+    >>> OptionValuation.px_cache = PxCache(maxsize=2)
+    >>> o = European(ref=Stock(S0=42, vol=.2), right='call', K=40, T=.5, rf_r=.1)
+    >>> o.pxLT(nsteps=100), o.pxLT(nsteps=100)
+    (4.761818358, 4.761818358)
+    >>> OptionValuation.px_cache.info()
+    {'hits': 1, 'misses': 1, 'maxsize': 2, 'currsize': 1}
+
+    Keys do not depend on object identity, number types, or description.
+
+    >>> European(ref=Stock(S0=42., vol=.2), right='call', K=40., T=.5, rf_r=.1, desc='copy').pxLT(nsteps=100)
+    4.761818358
+    >>> OptionValuation.px_cache.hits
+    2
+
+    An updated spec is priced anew. Unseeded MC is never cached.
+
+    >>> o.update(K=41).pxLT(nsteps=100)
+    4.088280354
+    >>> px = o.pxMC(nsteps=10, npaths=100); OptionValuation.px_cache.info()
+    {'hits': 2, 'misses': 2, 'maxsize': 2, 'currsize': 2}
+
+    Least recently used price is evicted, when ``maxsize`` is reached.
+
+    >>> o.pxBS()
+    4.088589415
+    >>> o.update(K=40).pxLT(nsteps=100); OptionValuation.px_cache.info()
+    4.761818358
+    {'hits': 2, 'misses': 4, 'maxsize': 2, 'currsize': 2}
+    >>> OptionValuation.px_cache = None
+    """
+    def __init__(self, maxsize=1024):
+        """ Constructor.
+
+        Parameters
+        ----------
+        maxsize : int
+            maximum number of cached prices
+        """
+        assert maxsize is None or maxsize >= 1, 'Ooops. PxCache maxsize must be a positive integer or None (no limit)'
+        self.maxsize = maxsize
+        self.clear()
+
+    def clear(self):
+        """ Removes all cached prices and resets hit/miss counters.  """
+        self._data = collections.OrderedDict()
+        self.hits = self.misses = 0
+        return self
+
+    def info(self):
+        """ Cache statistics.
+
+        Returns
+        -------
+        dict
+            ``hits``, ``misses``, ``maxsize``, ``currsize``
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'maxsize': self.maxsize, 'currsize': len(self._data)}
+
+    @staticmethod
+    def freeze(x):
+        """ Canonical hashable representation of (nested) specs.
+
+        Parameters
+        ----------
+        x : object
+            number, str, tuple, list, dict, set, numpy array or object with specs (``Stock``,...)
+
+        Returns
+        -------
+        object
+            hashable value; equal specs map to equal values
+
+        Examples
+        --------
+        >>> PxCache.freeze({'K': 40, 'corr': [[1, 0], [0, 1]], 'ref': Stock(S0=42, vol=.2)})
+        (('K', 40), ('corr', ((1, 0), (0, 1))), ('ref', ('Stock', (('S0', 42), ('curr', None), ('q', 0), ('tkr', None), ('vol', 0.2)))))
+        """
+        if isinstance(x, (str, numbers.Number)) or x is None: return x
+        if isinstance(x, dict): return tuple((k, PxCache.freeze(v)) for k, v in sorted(x.items()) if k != 'desc')
+        if isinstance(x, (list, tuple)): return tuple(PxCache.freeze(v) for v in x)
+        if isinstance(x, (set, frozenset)): return frozenset(PxCache.freeze(v) for v in x)
+        if isinstance(x, np.ndarray): return ('ndarray', x.dtype.str, x.shape, x.tobytes())
+        if hasattr(x, '__dict__'): return (type(x).__name__, PxCache.freeze(vars(x)))
+        return x if isinstance(x, collections.abc.Hashable) else repr(x)
+
+    def key(self, opt):
+        """ Cache key of an option and its pricing parameters (saved in ``opt.px_spec``).
+
+        Parameters
+        ----------
+        opt : OptionValuation
+            option with ``px_spec`` holding pricing parameters
+
+        Returns
+        -------
+        tuple, None
+            hashable key; ``None`` if calculation is not deterministic (ex. MC without ``rng_seed``)
+        """
+        ps = vars(opt.px_spec)
+        if ps.get('method') == 'MC' and ps.get('rng_seed') is None: return None
+        specs = {k: v for k, v in vars(opt).items() if k not in ('px_spec', 'px_cache', 'px_profiler')}
+        return type(opt).__name__, self.freeze(specs), self.freeze(ps)
+
+    def get(self, key):
+        """ Cached ``px_spec`` (marked as most recently used), or ``None``.  """
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return copy.copy(self._data[key])
+        self.misses += 1
+        return None
+
+    def put(self, key, px_spec):
+        """ Saves a copy of ``px_spec`` and evicts least recently used entries beyond ``maxsize``.  """
+        self._data[key] = copy.copy(px_spec)
+        self._data.move_to_end(key)
+        while self.maxsize is not None and len(self._data) > self.maxsize: self._data.popitem(last=False)
+
+
+class PxProfiler:
+    """ Collector of run time statistics of ``calc_px()`` calls, with a report by option class and pricing method.
+
+    Profiling is opt-in: within a ``with PxProfiler() as p:`` block (or while ``OptionValuation.px_profiler`` is set),
+    every pricing call records its wall time, CPU time, ``nsteps``, ``npaths``, net change of allocated memory blocks
+    and (if ``tracemalloc`` traces memory) peak memory above the level at the start of the call.
+    A record is saved in ``px_spec.profile`` and passed to ``record()`` of the collector.
+    Any object with a ``record(rec)`` method can be plugged in as ``OptionValuation.px_profiler``.
+    With no collector set, pricing is not instrumented at all.
+
+    Calls nested in other calls (ex. an underlying option priced by a compound option) are recorded too,
+    with their nesting ``depth``. Their times are also included in the times of their callers.
+
+    Examples
+    --------
+    >>> from qfrm import *
+    >>> o = European(ref=Stock(S0=42, vol=.2), right='call', K=40, T=.5, rf_r=.1)
+    >>> with PxProfiler() as p:
+    ...     px = [o.pxBS(), o.pxLT(nsteps=100), o.pxLT(nsteps=200), o.pxMC(nsteps=10, npaths=1000, rng_seed=0)]
+    >>> sorted(o.px_spec.profile)
+    ['cached', 'cls', 'cpu', 'depth', 'method', 'nblocks', 'npaths', 'nsteps', 'peak_mb', 'wall']
+    >>> [(r['method'], r['nsteps'], r['npaths']) for r in p.records]
+    [('BS', None, None), ('LT', 100, None), ('LT', 200, None), ('MC', 10, 1000)]
+    >>> sorted((k, v['calls']) for k, v in p.summary().items())
+    [(('European', 'BS'), 1), (('European', 'LT'), 2), (('European', 'MC'), 1)]
+    >>> print(p.report())    # doctest: +ELLIPSIS
+    class     method  calls  wall, s  cpu, s  mean wall, s  max wall, s  peak, MB
+    European  ...
+
+    Outside of the block, pricing is not profiled.
+
+    >>> OptionValuation.px_profiler is None, hasattr(o.pxBS() and o.px_spec, 'profile')
+    (True, False)
+
+    Peak memory is recorded, if ``tracemalloc`` traces memory allocations (``memory=True`` starts it):
+
+    >>> with PxProfiler(memory=True) as p:  _ = o.pxMC(nsteps=100, npaths=4000, rng_seed=0)
+    >>> p.records[0]['peak_mb'] > 3.08   # at least 101 x 4000 simulated prices
+    True
+    """
+    def __init__(self, memory=False):
+        """ Constructor.
+
+        Parameters
+        ----------
+        memory : bool
+            If ``True``, ``tracemalloc`` traces memory allocations within ``with`` block (unless it already does),
+            so that peak memory of every call is recorded. Tracing slows down pricing.
+        """
+        self.memory = memory
+        self.records = []
+        self._prev = self._started = None
+
+    def __enter__(self):
+        self._prev, OptionValuation.px_profiler = OptionValuation.px_profiler, self
+        self._started = self.memory and not tracemalloc.is_tracing()
+        if self._started: tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        OptionValuation.px_profiler = self._prev
+        if self._started: tracemalloc.stop()
+        return False
+
+    def record(self, rec):
+        """ Saves a record of a pricing call. See ``OptionValuation._profile_px()`` for its fields.  """
+        self.records.append(rec)
+
+    def clear(self):
+        """ Removes all records.  """
+        self.records = []
+        return self
+
+    def summary(self):
+        """ Aggregate statistics of records by option class and pricing method.
+
+        Returns
+        -------
+        dict
+            ``(cls, method)`` mapped to ``calls``, ``cached`` (number of cache hits), ``wall`` and ``cpu``
+            (total seconds), ``max_wall`` and ``peak_mb`` (largest peak memory, if traced)
+        """
+        out = collections.OrderedDict()
+        for r in self.records:
+            a = out.setdefault((r['cls'], r['method']), dict(calls=0, cached=0, wall=0., cpu=0., max_wall=0., peak_mb=None))
+            a['calls'] += 1;  a['cached'] += r['cached'];  a['wall'] += r['wall'];  a['cpu'] += r['cpu']
+            a['max_wall'] = max(a['max_wall'], r['wall'])
+            if r['peak_mb'] is not None: a['peak_mb'] = max(a['peak_mb'] or 0., r['peak_mb'])
+        return out
+
+    def report(self):
+        """ Table of aggregate statistics (see ``summary()``), slowest class and method first.
+
+        Returns
+        -------
+        str
+            printable report
+        """
+        rows = [('class', 'method', 'calls', 'wall, s', 'cpu, s', 'mean wall, s', 'max wall, s', 'peak, MB')]
+        for (cls, method), a in sorted(self.summary().items(), key=lambda x: -x[1]['wall']):
+            rows.append((cls, method, str(a['calls']), '{:.4f}'.format(a['wall']), '{:.4f}'.format(a['cpu']),
+                         '{:.6f}'.format(a['wall'] / a['calls']), '{:.6f}'.format(a['max_wall']),
+                         '-' if a['peak_mb'] is None else '{:.2f}'.format(a['peak_mb'])))
+        widths = [max(len(r[i]) for r in rows) for i in range(len(rows[0]))]
+        return '\n'.join('  '.join(c.ljust(w) for c, w in zip(r, widths)).rstrip() for r in rows)
+
+
 class Stock(SpecPrinter):
     """ Object for storing parameters of an underlying (referenced) asset.
 
@@ -241,6 +498,101 @@ class Stock(SpecPrinter):
         SpecPrinter.print_precision = print_precision
 
 
+class OptionSpec:
+    """ Compact specs of a plain option on a stock: ``S0``, ``vol``, ``q``, ``right``, ``K``, ``T``, ``rf_r``, ``frf_r``.
+
+    Unlike ``OptionSeries`` (and its ``Stock`` and ``PriceSpec``), this record has ``__slots__`` and no ``__dict__``,
+    creates no nested objects and no YAML representation. It is meant for scenario runs with millions of options.
+    Many records are converted to a structured ``numpy`` array (``to_records()``), which batch pricers accept,
+    ex. ``European.calc_px_batch()``. A full option object (with ``SpecPrinter`` view) is built on demand.
+
+    Examples
+    --------
+    >>> r = OptionSpec(S0=42, vol=.2, K=40, T=.5, rf_r=.1, right='put')
+    >>> r
+    OptionSpec(S0=42, vol=0.2, q=0.0, right='put', K=40, T=0.5, rf_r=0.1, frf_r=0.0)
+    >>> hasattr(r, '__dict__'), r == OptionSpec(S0=42., vol=.2, K=40., T=.5, rf_r=.1, right='put')
+    (False, True)
+
+    >>> from qfrm import *
+    >>> o = r.to_option(European);  o.pxBS()
+    0.808599373
+    >>> OptionSpec.from_option(o) == r
+    True
+
+    >>> OptionSpec.to_records([r, OptionSpec(S0=42, vol=.2, K=40, T=.5, rf_r=.1)])['right']
+    array([-1,  1], dtype=int8)
+
+    Rights can also be numeric, as in records:
+
+    >>> OptionSpec(S0=42, vol=.2, K=40, T=.5, rf_r=.1, right=-1) == r
+    True
+    """
+    __slots__ = ('S0', 'vol', 'q', 'right', 'K', 'T', 'rf_r', 'frf_r')
+    dtype = np.dtype([('S0', 'f8'), ('vol', 'f8'), ('q', 'f8'), ('right', 'i1'),
+                      ('K', 'f8'), ('T', 'f8'), ('rf_r', 'f8'), ('frf_r', 'f8')])
+
+    def __init__(self, S0, vol, K, T, rf_r, right='call', q=0., frf_r=0.):
+        """ Constructor.
+
+        Parameters
+        ----------
+        S0, vol, q : float
+            spot price, volatility and dividend yield of the underlying. See ``Stock``.
+        K, T : float
+            strike price and time to expiry (in years). See ``OptionSeries``.
+        rf_r, frf_r : float
+            risk free and foreign risk free rates. See ``OptionValuation``.
+        right : {'call', 'put', 1, -1}
+            option's right. Numeric rights (+1 for calls, -1 for puts, as in ``to_records()``) are converted to strings.
+        """
+        if isinstance(right, (numbers.Number, np.number)):
+            assert right in (1, -1), 'Ooops. Numeric right must be +1 (call) or -1 (put)'
+            right = 'call' if right == 1 else 'put'
+        self.S0, self.vol, self.q, self.right = S0, vol, float(q or 0), right.lower()
+        self.K, self.T, self.rf_r, self.frf_r = K, T, rf_r, float(frf_r or 0)
+
+    def astuple(self):
+        """ Specs in order of ``__slots__``.  """
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.astuple() == other.astuple()
+
+    def __hash__(self):
+        return hash(self.astuple())
+
+    def __repr__(self):
+        return 'OptionSpec(' + ', '.join(k + '=' + repr(getattr(self, k)) for k in self.__slots__) + ')'
+
+    def to_option(self, cls):
+        """ Full option object of class ``cls`` (``European``, ``American``,...) with these specs.  """
+        return cls(ref=Stock(S0=self.S0, vol=self.vol, q=self.q), right=self.right, K=self.K, T=self.T,
+                   rf_r=self.rf_r, frf_r=self.frf_r)
+
+    @classmethod
+    def from_option(cls, o):
+        """ Compact specs of an option object ``o``.  """
+        return cls(S0=o.ref.S0, vol=o.ref.vol, q=o.ref.q, right=o.right, K=o.K, T=o.T, rf_r=o.rf_r, frf_r=o.frf_r)
+
+    @classmethod
+    def to_records(cls, specs):
+        """ Structured ``numpy`` array (of ``dtype``) from a sequence of ``OptionSpec``. Rights are +1 (call) or -1 (put).
+
+        Parameters
+        ----------
+        specs : sequence of OptionSpec
+
+        Returns
+        -------
+        numpy.ndarray
+            structured array, one element per option
+        """
+        sign = {'call': 1, 'put': -1}
+        return np.array([(r.S0, r.vol, r.q, sign.get(r.right, 0), r.K, r.T, r.rf_r, r.frf_r) for r in specs],
+                        dtype=cls.dtype)
+
+
 class OptionSeries(SpecPrinter):
     """ Object representing an option series.
 
@@ -598,6 +950,10 @@ class OptionValuation(OptionSeries):
 
     The class inherits from a simpler class that describes an option.
     """
+    px_cache = None     # optional PxCache of calculated prices, shared by all options. See PxCache.
+    px_profiler = None  # optional collector of run time statistics of pricing calls. See PxProfiler.
+    _px_peaks = []      # running peak memory of profiled calls in progress (outermost first)
+
     def __init__(self, rf_r=None, frf_r=0, *args, **kwargs):
         """ Constructor saves all identified arguments and passes others to the base (parent) class, OptionSeries.
 
@@ -674,6 +1030,7 @@ class OptionValuation(OptionSeries):
         :Authors:
             Oleg Melnikov <xisreal@gmail.com>
         """
+        plt = Util.pyplot()
         if ax is None: fig, ax = plt.subplots()
         if 'fig' in locals():  # assures tight layout even when plot is manually resized
             def onresize(event):
@@ -746,6 +1103,8 @@ class OptionValuation(OptionSeries):
         :Authors:
             Oleg Melnikov <xisreal@gmail.com>
         """
+        import pandas as pd
+        plt = Util.pyplot()
         if ax is None: fig, ax = plt.subplots()
         if 'fig' in locals():  # assures tight layout even when plot is manually resized
             def onresize(event):  plt.tight_layout()
@@ -783,6 +1142,7 @@ class OptionValuation(OptionSeries):
         :Authors:
             Oleg Melnikov <xisreal@gmail.com>
         """
+        plt = Util.pyplot()
         fig = plt.figure()
         ax1 = plt.subplot(221)
         ax2 = plt.subplot(222)
@@ -842,7 +1202,299 @@ class OptionValuation(OptionSeries):
 
         return rf_r - q - frf_r   # calculate RFR net of yield and foreign RFR
 
+    def _dispatch_px(self):
+        """ Runs pricing method named in ``px_spec.method`` (``_calc_BS()``,...), after ``calc_px()`` saved its parameters.
+
+        If ``px_cache`` is set, a cached ``px_spec`` of an identical calculation is reused. See ``PxCache``.
+        If ``px_profiler`` is set, the call is timed. See ``PxProfiler``.
+
+        Returns
+        -------
+        self : OptionValuation
+        """
+        if self.px_profiler is not None: return self._profile_px(self.px_profiler)
+        return self._calc_px_cached()
+
+    def _profile_px(self, profiler):
+        """ Prices the option (see ``_dispatch_px()``) and records run time statistics of the call
+        in ``px_spec.profile`` and in ``profiler``.
 
+        A record is a dictionary with option class (``cls``), ``method``, ``nsteps``, ``npaths``, wall time (``wall``)
+        and CPU time (``cpu``) in seconds, net change of allocated memory blocks (``nblocks``),
+        peak traced memory in MB above the level at the start of the call (``peak_mb``, ``None`` if ``tracemalloc``
+        is not tracing), whether the price came from ``px_cache`` (``cached``) and nesting ``depth`` of the call.
 
+        Returns
+        -------
+        self : OptionValuation
+        """
+        sp, peaks, tracing = self.px_spec, OptionValuation._px_peaks, tracemalloc.is_tracing()
+        if tracing:
+            mem0 = tracemalloc.get_traced_memory()
+            if peaks: peaks[-1] = max(peaks[-1], mem0[1])   # peak of the caller so far
+            tracemalloc.reset_peak()
+        peaks.append(0)
+        blocks0, cpu0, wall0 = sys.getallocatedblocks(), time.process_time(), time.perf_counter()
+        try:
+            out = self._calc_px_cached()
+        finally:
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            nblocks = sys.getallocatedblocks() - blocks0
+            peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1]) if tracing else None
+            if tracing and peaks: peaks[-1] = max(peaks[-1], peak)
+
+        rec = dict(cls=type(self).__name__, method=sp.method.upper(), nsteps=getattr(sp, 'nsteps', None),
+                   npaths=getattr(sp, 'npaths', None), wall=wall, cpu=cpu, nblocks=nblocks,
+                   peak_mb=None if peak is None else (peak - mem0[0]) / 2 ** 20,
+                   cached=self.px_spec is not sp, depth=len(peaks))
+        self.px_spec.add(profile=rec)
+        profiler.record(rec)
+        return out
+
+    def _calc_px_cached(self):
+        """ Runs pricing method, or reuses a cached price. See ``_dispatch_px()``.  """
+        calc = getattr(self, '_calc_' + self.px_spec.method.upper())
+        if self.px_spec.method.upper() == 'MC': calc = self._run_MC
+        cache = self.px_cache
+        if cache is None: return calc()
+
+        key = cache.key(self)
+        if key is None: return calc()
+        px_spec = cache.get(key)
+        if px_spec is not None:
+            self.px_spec = px_spec
+            return self
+
+        out = calc()
+        cache.put(key, self.px_spec)
+        return out
+
+    def _run_MC(self):
+        """ Runs ``_calc_MC()`` and saves its run time (``elapsed``, in seconds) in ``px_spec``.
+
+        If ``px_spec.target_stderr`` is set, independent batches of paths (seeds ``rng_seed + 1``, ``rng_seed + 2``,...)
+        are priced until standard error of the pooled price is within the target, or ``max_npaths`` paths are used
+        (default: 100 times ``npaths``). Each batch is sized to meet the target, judging by the standard error so far.
+        Pooled ``px``, ``stderr``, ``ci``, ``npaths`` and ``npaths_eff`` are saved, with the number of ``batches``.
+        Standard error of quasi-random (``sampler='sobol'``) paths is not estimated, so they cannot meet a ``target_stderr``.
 
+        Returns
+        -------
+        self : OptionValuation
 
+        Examples
+        --------
+        >>> from qfrm import *
+        >>> o = European(ref=Stock(S0=42, vol=.2), right='put', K=40, T=.5, rf_r=.1)   # BS price is 0.808599373
+        >>> o.pxMC(nsteps=1, npaths=1000, rng_seed=0, target_stderr=.005, max_npaths=10 ** 6)
+        0.809355362
+        >>> sp = o.px_spec;  sp.stderr <= .005, sp.npaths, sp.batches
+        (True, 131378, 3)
+
+        Variance reduction meets the same target with far fewer paths:
+
+        >>> o.pxMC(nsteps=1, npaths=1000, rng_seed=0, target_stderr=.005, antithetic=True, control_variate='underlying')
+        0.80742273
+        >>> o.px_spec.npaths
+        6290
+        >>> o.pxMC(nsteps=1, npaths=1024, rng_seed=0, target_stderr=.005, sampler='sobol')
+        Traceback (most recent call last):
+        ...
+        AssertionError: Ooops. target_stderr needs i.i.d. paths, not sampler='sobol'
+        """
+        t0, sp = time.perf_counter(), self.px_spec
+        target = getattr(sp, 'target_stderr', None)
+        assert target is None or getattr(sp, 'sampler', None) != 'sobol', \
+            "Ooops. target_stderr needs i.i.d. paths, not sampler='sobol'"
+        self._calc_MC()
+
+        if target is not None and getattr(sp, 'stderr', None) is not None:
+            m0, seed = sp.npaths, sp.rng_seed
+            max_npaths = getattr(sp, 'max_npaths', None) or 100 * m0
+            batches = [(m0, sp.px, sp.stderr, sp.npaths_eff)]
+            n, px, stderr, n_eff = MCEstimate.combine(batches)
+
+            while stderr > target and n < max_npaths:
+                m = min(max(int(n * ((stderr / target) ** 2 - 1)) + 1, m0), max_npaths - n)
+                m += m % 2 * bool(getattr(sp, 'antithetic', False))      # antithetic pairs need an even number
+                sp.add(npaths=m, rng_seed=None if seed is None else seed + len(batches))
+                self._calc_MC()
+                batches.append((m, sp.px, sp.stderr, sp.npaths_eff))
+                n, px, stderr, n_eff = MCEstimate.combine(batches)
+
+            z = MCEstimate.z95
+            sp.add(px=px, stderr=stderr, ci=(px - z * stderr, px + z * stderr), npaths=n, npaths_eff=n_eff,
+                   rng_seed=seed, batches=len(batches))
+
+        sp.add(elapsed=time.perf_counter() - t0)
+        return self
+
+    def calc_greeks(self, method='BS', **kwargs):
+        """ Computes option price and its sensitivities (greeks). Both are saved in ``px_spec``.
+
+        Parameters
+        ----------
+        method : {'BS', 'LT', 'MC', 'FD'}
+            pricing method. Closed-form greeks are computed with 'BS', wherever subclass implements them.
+        kwargs : optional
+            pricing parameters passed to ``calc_px()``, ex. ``nsteps``, ``npaths``, ``keep_hist``, ``rng_seed``
+
+        Returns
+        -------
+        self : OptionValuation
+            ``px_spec.greeks`` is a dictionary with
+
+            - ``delta``: dV/dS, per unit of spot price
+            - ``gamma``: d2V/dS2
+            - ``vega``: dV/d(vol), per unit (i.e. 100%) of volatility
+            - ``theta``: -dV/dT, per year (i.e. decay of value as time passes)
+            - ``rho``: dV/d(rf_r), per unit (i.e. 100%) of risk free rate
+
+        Examples
+        --------
+        >>> from qfrm import *
+        >>> o = European(ref=Stock(S0=42, vol=.2), right='put', K=40, T=.5, rf_r=.1)
+        >>> o.calc_greeks().px_spec.greeks['delta']   # doctest: +ELLIPSIS
+        -0.2208...
+        """
+        if method.upper() == 'MC' and kwargs.get('rng_seed') is None:   # common random numbers, see _greeks_MC()
+            kwargs['rng_seed'] = int(np.random.SeedSequence().generate_state(1)[0])     # fresh entropy, not global state
+        self.calc_px(method=method, **kwargs)
+        self.px_spec.add(greeks=getattr(self, '_greeks_' + method.upper())(**kwargs))
+        return self
+
+    def _greeks_BS(self, **kwargs):
+        """ Default greeks for subclasses without closed-form sensitivities: central differences of closed-form price.
+
+        Returns
+        -------
+        dict
+            See ``calc_greeks()``
+
+        Examples
+        --------
+        Lengthy analytical sensitivities of barrier and lookback formulas are avoided this way.
+
+        >>> from qfrm import *
+        >>> o = Barrier(ref=Stock(S0=50, vol=.25), right='call', K=45, T=2, rf_r=.1)
+        >>> o.calc_greeks(H=35, knock='down', dir='out').px_spec.greeks['delta']   # doctest: +ELLIPSIS
+        0.90065...
+        >>> o = Lookback(ref=Stock(S0=50, vol=.4), right='call', K=50, T=.25, rf_r=.1)
+        >>> o.calc_greeks(Sfl=50).px_spec.greeks['delta']   # doctest: +ELLIPSIS
+        0.16074...
+        """
+        return self._greeks_bump(method='BS', **kwargs)
+
+    def _greeks_LT(self, **kwargs):
+        """ Tree greeks: delta, gamma and theta are read off the nodes of the first two time steps of the lattice,
+        which was used for pricing. Only vega and rho require repricing (on bumped trees).
+
+        Returns
+        -------
+        dict
+            See ``calc_greeks()``
+
+        Examples
+        --------
+        See J.C.Hull's OFOD, 9ed, 2014, Example 21.1, p.453 (delta -0.41, gamma 0.034, theta -4.3 per year)
+
+        >>> from qfrm import *
+        >>> o = American(ref=Stock(S0=50, vol=.4), right='put', K=50, T=5/12, rf_r=.1)
+        >>> g = o.calc_greeks(method='LT', nsteps=5).px_spec.greeks
+        >>> [round(g[k], 3) for k in ('delta', 'gamma', 'theta')]
+        [-0.415, 0.034, -4.304]
+        """
+        bl = getattr(self.px_spec, '_lattice', None)
+        if bl is None or bl.head is None or bl.n < 2: return self._greeks_bump(method='LT', **kwargs)
+
+        g = bl.greeks(dt=self.px_spec.LT_specs['dt'])
+        g.update(self._greeks_bump(method='LT', greeks=('vega', 'rho'), **kwargs))
+        return g
+
+    def _greeks_MC(self, **kwargs):
+        """ Monte Carlo greeks by bump-and-revalue with common random numbers.
+
+        ``rng_seed`` is fixed for the base price and all bumped prices (``calc_greeks()`` draws one from fresh entropy,
+        if not supplied), so that each repricing reuses the same simulated normals. Sampling noise then largely cancels in differences.
+
+        Returns
+        -------
+        dict
+            See ``calc_greeks()``
+
+        Examples
+        --------
+        >>> from qfrm import *
+        >>> o = European(ref=Stock(S0=42, vol=.2), right='call', K=40, T=.5, rf_r=.1)
+        >>> g = o.calc_greeks(method='MC', nsteps=10, npaths=10000, rng_seed=1).px_spec.greeks
+        >>> bool(abs(g['delta'] - o.calc_greeks(method='BS').px_spec.greeks['delta']) < .02)
+        True
+
+        Without ``rng_seed``, a seed is drawn once and saved. It reproduces the base price:
+
+        >>> sp = o.calc_greeks(method='MC', nsteps=10, npaths=10000).px_spec
+        >>> o.pxMC(nsteps=10, npaths=10000, rng_seed=sp.rng_seed) == round(sp.px, 9)
+        True
+        """
+        return self._greeks_bump(method='MC', h=1e-2, **kwargs)
+
+    def _greeks_FD(self, **kwargs):
+        """ Finite difference greeks: delta, gamma and theta are read off grid nodes neighbouring spot price.
+
+        FD pricers expose their grid as ``px_spec._FD_grid = (S, V0, V1, dt)``: asset price grid, option values
+        at time 0 and at time ``dt``. Without a grid, all greeks are computed by repricing.
+
+        Returns
+        -------
+        dict
+            See ``calc_greeks()``
+        """
+        grid = getattr(self.px_spec, '_FD_grid', None)
+        if grid is None: return self._greeks_bump(method='FD', **kwargs)
+
+        S, V0, V1, dt = grid
+        S0 = self.ref.S0
+        k = int(np.clip(np.searchsorted(S, S0), 1, len(S) - 2))
+        c2, c1, _ = np.polyfit(S[k - 1:k + 2] - S0, V0[k - 1:k + 2], 2)   # quadratic through 3 neighbouring nodes
+        g = {'delta': float(c1), 'gamma': float(2 * c2),
+             'theta': float((np.interp(S0, S, V1) - np.interp(S0, S, V0)) / dt)}
+        g.update(self._greeks_bump(method='FD', greeks=('vega', 'rho'), **kwargs))
+        return g
+
+    def _greeks_bump(self, h=1e-3, greeks=('delta', 'gamma', 'vega', 'theta', 'rho'), **kwargs):
+        """ Greeks by central finite differences, i.e. repricing copies of this option with bumped specs.
+
+        Parameters
+        ----------
+        h : float
+            relative bump size of spot price, volatility and time to expiry. Rates are bumped by ``h / 10``.
+        greeks : tuple of str
+            greeks to compute. See ``calc_greeks()``
+        kwargs : optional
+            pricing parameters passed to ``calc_px()``
+
+        Returns
+        -------
+        dict
+            See ``calc_greeks()``
+        """
+        def px(dS=0., dvol=0., dT=0., dr=0.):
+            o = copy.copy(self)
+            o.ref = copy.copy(self.ref)
+            S0, vol = o.ref.S0, o.ref.vol
+            o.ref.S0 = tuple(x + dS * x for x in S0) if isinstance(S0, tuple) else S0 + dS * S0
+            o.ref.vol = tuple(x + dvol * x for x in vol) if isinstance(vol, tuple) else vol + dvol * vol
+            o.T, o.rf_r = self.T * (1 + dT), self.rf_r + dr
+            return o.calc_px(**kwargs).px_spec.px
+
+        S0 = self.ref.S0[0] if isinstance(self.ref.S0, tuple) else self.ref.S0   # multi-asset: bump all spots
+        vol = self.ref.vol[0] if isinstance(self.ref.vol, tuple) else self.ref.vol
+        g = {}
+        if 'delta' in greeks or 'gamma' in greeks:
+            px0, pxu, pxd = px(), px(dS=h), px(dS=-h)
+            g['delta'] = (pxu - pxd) / (2 * h * S0)
+            g['gamma'] = (pxu - 2 * px0 + pxd) / (h * S0) ** 2
+        if 'vega' in greeks: g['vega'] = (px(dvol=h) - px(dvol=-h)) / (2 * h * vol)
+        if 'theta' in greeks: g['theta'] = -(px(dT=h) - px(dT=-h)) / (2 * h * self.T)
+        if 'rho' in greeks: g['rho'] = (px(dr=h / 10) - px(dr=-h / 10)) / (2 * h / 10)
+        return {k: g[k] for k in greeks}
@@ -96,7 +96,7 @@ class PerpetualAmerican(European):
 
         self.T = float('inf')
         self.save2px_spec(**kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.        See ``calc_px()`` for complete documentation.
@@ -0,0 +1,190 @@
+import collections
+
+try: from qfrm.American import *  # production:  if qfrm package is installed
+except:   from American import *  # development: if not installed and running from source
+
+
+class Portfolio:
+    """ A book of positions in options of any class (``European``, ``American``, ``Barrier``, ...), valued together.
+
+    Like contracts, i.e. options of the same class priced by the same method with the same pricing parameters,
+    are grouped into batches. Batches with a vectorized pricer (see ``batch_pricers``) are priced in one pass
+    over compact specs (``OptionSpec``), without repricing option objects one by one.
+    Other positions are priced by their own ``calc_px()`` (or ``calc_greeks()``).
+    Present values (PV) and greeks are reported per position (scaled by quantity) and in total.
+    Batched positions are valued with the same formulas as standalone options: European BS prices
+    follow ``European.calc_px()`` and their greeks follow ``European.calc_greeks()``, also with dividends.
+
+    Examples
+    --------
+    A straddle (long call and put), a short American put and a down-and-out barrier call on the same stock:
+
+    >>> from qfrm import *
+    >>> s = Stock(S0=42, vol=.2)
+    >>> p = Portfolio()
+    >>> p.add(European(ref=s, right='call', K=40, T=.5, rf_r=.1), name='call')   # doctest: +ELLIPSIS
+    <Portfolio...>
+    >>> _ = p.add(European(ref=s, right='put', K=40, T=.5, rf_r=.1), name='put')
+    >>> _ = p.add(American(ref=s, right='put', K=40, T=.5, rf_r=.1), qty=-2, method='LT', nsteps=100)
+    >>> _ = p.add(Barrier(ref=s, right='call', K=40, T=.5, rf_r=.1), H=35, knock='down', dir='out')
+    >>> round(p.calc_px().px_spec.px, 6)
+    8.475974
+    >>> [(x['name'], x['qty'], round(x['px'], 6), round(x['pv'], 6), x['batched']) for x in p.px_spec.positions]
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [('call', 1.0, 4.759422, 4.759422, True), ('put', 1.0, 0.808599, 0.808599, True),
+     ('American put 2', -2.0, 0.912531, -1.825062, True), ('Barrier call 3', 1.0, 4.733014, 4.733014, False)]
+    >>> p.px_spec.batches
+    [('European', 'BS', 2), ('American', 'LT', 1), ('Barrier', 'BS', 1)]
+
+    Batched prices are those of option objects:
+
+    >>> European(ref=s, right='put', K=40, T=.5, rf_r=.1).pxBS(), American(ref=s, right='put', K=40, T=.5, rf_r=.1).pxLT(nsteps=100)
+    (0.808599373, 0.912530891)
+
+    On a dividend paying stock, too:
+
+    >>> o = European(ref=Stock(S0=50, vol=.3, q=.08), right='put', K=52, T=2, rf_r=.05)
+    >>> round(Portfolio([o]).calc_px().px_spec.px, 9), o.pxBS()
+    (9.955084987, 9.955084987)
+    >>> round(Portfolio([o]).calc_px(greeks=True).px_spec.greeks['delta'], 6), round(o.calc_greeks().px_spec.greeks['delta'], 6)
+    (-0.43346, -0.43346)
+
+    Total greeks add up position greeks (scaled by quantities). Straddle's delta and gamma:
+
+    >>> g = Portfolio([(European(ref=s, right=r, K=40, T=.5, rf_r=.1), 1) for r in ('call', 'put')]).calc_px(greeks=True).px_spec.greeks
+    >>> round(g['delta'], 6), round(g['gamma'], 6)
+    (0.558263, 0.099925)
+
+    A large book of like contracts is priced at once:
+
+    >>> K = np.linspace(30, 50, 10000)
+    >>> p = Portfolio([European(ref=s, right='call', K=k, T=.5, rf_r=.1) for k in K])
+    >>> round(p.calc_px().px_spec.px, 2), p.px_spec.batches
+    (55804.45, [('European', 'BS', 10000)])
+    """
+    batch_pricers = {   # (class name, method) mapped to a vectorized pricer: f(specs, greeks, **kwargs) -> PriceSpec
+        ('European', 'BS'): lambda specs, greeks, **kwargs: European.calc_px_batch(specs, greeks=greeks),
+        ('American', 'LT'): lambda specs, greeks, nsteps=None, **kwargs:
+            American.calc_px_batch(specs, nsteps=nsteps or 3, greeks=greeks),   # 3 steps by default, as calc_px()
+    }
+
+    def __init__(self, positions=None, desc=None):
+        """ Constructor.
+
+        Parameters
+        ----------
+        positions : iterable, optional
+            options (one contract each) or ``(option, qty)`` pairs
+        desc : str, optional
+            description of the portfolio
+        """
+        self.positions, self.desc, self.px_spec = [], desc, PriceSpec()
+        for x in positions or ():
+            if isinstance(x, tuple): self.add(*x)
+            else: self.add(x)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __repr__(self):
+        return '<Portfolio of {} positions{}>'.format(len(self), '' if self.desc is None else ': ' + self.desc)
+
+    def add(self, opt, qty=1., name=None, method=None, **kwargs):
+        """ Adds a position.
+
+        Parameters
+        ----------
+        opt : OptionValuation
+            option of any class
+        qty : float
+            number of contracts; negative for short positions
+        name : str, optional
+            label of the position. Default: option style, right and position number.
+        method : {'BS', 'LT', 'MC', 'FD'}, optional
+            pricing method of this position, which overrides the method of ``calc_px()``
+        kwargs : optional
+            pricing parameters of this position (ex. ``nsteps``, ``H``, ``knock``), which override those of ``calc_px()``
+
+        Returns
+        -------
+        self : Portfolio
+        """
+        assert isinstance(opt, OptionValuation), 'Ooops. Portfolio holds options (OptionValuation objects)'
+        name = name or '{} {} {}'.format(opt.style, opt.right, len(self.positions))
+        self.positions.append(dict(name=name, opt=opt, qty=float(qty), method=method, kwargs=kwargs))
+        return self
+
+    def groups(self, method='BS', **kwargs):
+        """ Positions grouped into batches of like contracts: the same class, pricing method and pricing parameters.
+
+        Parameters
+        ----------
+        method : {'BS', 'LT', 'MC', 'FD'}
+            default pricing method
+        kwargs : optional
+            default pricing parameters
+
+        Returns
+        -------
+        dict
+            ``(class name, method, frozen parameters)`` mapped to a list of ``(index, position, parameters)``,
+            in the order of first positions of groups
+        """
+        out = collections.OrderedDict()
+        for i, pos in enumerate(self.positions):
+            m = (pos['method'] or method).upper()
+            kw = dict(kwargs, **pos['kwargs'])
+            key = (type(pos['opt']).__name__, m, PxCache.freeze(kw))
+            out.setdefault(key, []).append((i, pos, kw))
+        return out
+
+    def calc_px(self, method='BS', greeks=False, **kwargs):
+        """ Values all positions. Results are saved in ``px_spec``.
+
+        Parameters
+        ----------
+        method : {'BS', 'LT', 'MC', 'FD'}
+            pricing method of positions which do not specify their own
+        greeks : bool
+            If ``True``, greeks of positions and their totals are computed. See ``OptionValuation.calc_greeks()``.
+        kwargs : optional
+            pricing parameters (ex. ``nsteps``, ``npaths``, ``rng_seed``) of positions which do not override them
+
+        Returns
+        -------
+        self : Portfolio
+            ``px_spec`` holds total PV (``px``), ``positions`` (list of dictionaries with ``name``, ``cls``, ``method``,
+            ``qty``, unit price ``px``, ``pv = qty * px``, ``greeks`` scaled by ``qty`` and ``batched`` flag),
+            total ``greeks`` and ``batches`` (class, method and number of positions of every group).
+            Total greeks add up sensitivities of positions to their own underlyings.
+        """
+        out = [None] * len(self.positions)
+        batches = []
+        for (cls, m, _), group in self.groups(method, **kwargs).items():
+            batches.append((cls, m, len(group)))
+            pricer = self.batch_pricers.get((cls, m))
+            if pricer is not None:
+                ps = pricer([OptionSpec.from_option(pos['opt']) for _, pos, _ in group], greeks, **group[0][2])
+                for j, (i, pos, kw) in enumerate(group):
+                    g = {k: float(v[j]) for k, v in ps.greeks.items()} if greeks else None
+                    out[i] = self._position(pos, m, float(ps.px[j]), g, batched=True)
+            else:
+                for i, pos, kw in group:
+                    o = pos['opt']
+                    ps = (o.calc_greeks(method=m, **kw) if greeks else o.calc_px(method=m, **kw)).px_spec
+                    out[i] = self._position(pos, m, ps.px, getattr(ps, 'greeks', None) if greeks else None, batched=False)
+
+        self.px_spec = PriceSpec(method=method, px=float(sum(x['pv'] for x in out)), positions=out, batches=batches)
+        if greeks:
+            total = collections.OrderedDict()
+            for x in out:
+                for k, v in (x['greeks'] or {}).items(): total[k] = total.get(k, 0.) + v
+            self.px_spec.add(greeks=dict(total))
+        return self
+
+    @staticmethod
+    def _position(pos, method, px, greeks, batched):
+        """ Valuation record of a position: unit price and greeks scaled by quantity.  """
+        qty = pos['qty']
+        return dict(name=pos['name'], cls=type(pos['opt']).__name__, method=method, qty=qty, px=px, pv=qty * px,
+                    greeks=None if greeks is None else {k: qty * v for k, v in greeks.items()}, batched=batched)
@@ -1,5 +1,3 @@
-import numpy.random as rnd
-
 try: from qfrm.European import *  # production:  if qfrm package is installed
 except:   from European import *  # development: if not installed and running from source
 
@@ -29,7 +27,7 @@ class Quanto(European):
         vol_ex : float
                 LT. Volatility of the exchange rate.
         deg: int
-                Degrees in LSM MC method.
+                Degrees in LSM MC method (weighted Laguerre polynomials, see ``LSM``).
         kwargs : dict
             Keyword arguments (``method``, ``nsteps``, ``npaths``, ``keep_hist``, ``rng_seed``, ...)
             are passed to the parent. See ``European.calc_px()`` for details.
@@ -62,7 +60,7 @@ class Quanto(European):
         Example #2: Show (recombining) binomial tree of progression of underlying stock prices.
 
         >>> o.px_spec.ref_tree  # doctest: +ELLIPSIS
-        ((1199.9999999999995,), ... 3670.601501648697))
+        ((1199.999999999999,), ... 3670.6015016486967))
 
         Example #3 (verifiable from Hull [1] ch.30, ex.30.5 (p.701-702)): Calculate the price of a Quanto option.
         Uncomment to run (number of paths required is too high for doctests)
@@ -94,7 +92,7 @@ class Quanto(European):
         >>> s = Stock(S0=1200, vol=.25, q=0.015)
         >>> o = Quanto(ref=s, right='call', K=1200, T=2, rf_r=.03, frf_r=0.05)
         >>> o.pxMC(nsteps=100, npaths=5000, vol_ex=0.12, corr=0.2, rng_seed=1)
-        179.885465636
+        177.461098457
 
         Next example (see OFOD J.C.Hull, Ch.30, Problem 30.9b, p.704) yields price close to GBP180
         Calculate the price of a Quanto option. This example comes from Hull ch.30, problem.30.9.b (p.704)
@@ -103,7 +101,7 @@ class Quanto(European):
         >>> s = Stock(S0=400, vol=.2, q=0.03)
         >>> o = Quanto(ref=s, right='call', K=400, T=2, rf_r=.06, frf_r=0.04)
         >>> o.pxMC(nsteps=100, npaths=4000, vol_ex=0.06, corr=0.4, rng_seed=1)
-        57.363490259
+        56.973109909
 
         Example of option price (MC method) with increasing time
         For an accurate result, use ``nsteps=100``, ``npaths=5000``
@@ -122,13 +120,62 @@ class Quanto(European):
             Runmin Zhang <z.runmin@gmail.com>
         """
         self.save2px_spec(vol_ex=vol_ex, corr=corr, deg=deg, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
-        """ Internal function for option valuation.        """
+        """ Internal function for option valuation. See ``calc_px()`` for full documentation.
+
+        Quanto is priced as a vanilla option in the settlement currency (discounted at ``frf_r``) on an asset
+        with yield adjusted by quanto drift. See OFOD, J.C.Hull, 9ed, 2014, pp.699-702.
+
+        Examples
+        --------
+        See J.C.Hull's OFOD, Example 30.5, p.702: quanto call is worth about 180.
 
+        >>> s = Stock(S0=1200, vol=.25, q=0.015)
+        >>> Quanto(ref=s, right='call', K=1200, T=2, rf_r=.03, frf_r=0.05).pxBS(vol_ex=0.12, corr=0.2)
+        179.99637081
+        """
+        _ = self
+        g_call, g_put = (European._BS_greeks(_.ref.S0, _.K, _.T, _.ref.vol, _.frf_r, self._quanto_q(), signCP)
+                         for signCP in (1, -1))
+        px_call, px_put = float(g_call['px']), float(g_put['px'])
+        self.px_spec.add(px=px_call if _.signCP == 1 else px_put, px_call=px_call, px_put=px_put,
+                         sub_method='Hull p.702')
         return self
 
+    def _quanto_q(self):
+        """ Dividend yield of the underlying in settlement currency (quanto adjusted).
+
+        Returns
+        -------
+        float
+            ``frf_r - (rf_r - q + corr * vol * vol_ex)``
+        """
+        _ = self.px_spec
+        return self.frf_r - (self.rf_r - self.ref.q + _.corr * self.ref.vol * _.vol_ex)
+
+    def _greeks_BS(self, **kwargs):
+        """ Closed-form greeks of a quanto option. See ``OptionValuation.calc_greeks()``.
+
+        Quanto adjusted yield depends on volatility and on ``rf_r``, so ``vega`` and ``rho`` include these terms.
+        ``rho_f`` is the sensitivity to the rate of settlement currency, ``frf_r``.
+
+        Examples
+        --------
+        >>> s = Stock(S0=1200, vol=.25, q=0.015)
+        >>> o = Quanto(ref=s, right='call', K=1200, T=2, rf_r=.03, frf_r=0.05)
+        >>> g = o.calc_greeks(vol_ex=0.12, corr=0.2).px_spec.greeks
+        >>> n = o._greeks_bump(method='BS', vol_ex=0.12, corr=0.2)
+        >>> all(abs(g[k] - n[k]) < 1e-4 * (1 + abs(n[k])) for k in n)
+        True
+        """
+        _ = self
+        g = European._BS_greeks(_.ref.S0, _.K, _.T, _.ref.vol, _.frf_r, self._quanto_q(), _.signCP)
+        return {'delta': float(g['delta']), 'gamma': float(g['gamma']),
+                'vega': float(g['vega'] - g['phi'] * _.px_spec.corr * _.px_spec.vol_ex),
+                'theta': float(g['theta']), 'rho': float(-g['phi']), 'rho_f': float(g['rho'] + g['phi'])}
+
     def _calc_LT(self):
         """ Internal function for option valuation. See ``calc_px()`` for full documentation.
 
@@ -183,21 +230,22 @@ class Quanto(European):
         # Once we have the foreign numeraire dividend yield calculated,
         # Follow the LT method. We can price the Quanto option using an American option with specific parameters.
 
-        dt = T / n
-        df = np.exp(-frf_r * dt)
-
-        rnd.seed(rng_seed)
-        S = S0 * np.exp(np.cumsum(rnd.normal(
-                (frf_r-foreign_numeraire_dividend_yield- 0.5 * vol ** 2) * dt, vol * np.sqrt(dt), (n + 1, m)), axis=0));
-        S[0] = S0
-        payout = np.maximum(sCP * (S - K), 0); v = np.copy(payout)  # terminal payouts
-
-        for i in range(n - 1, 0, -1):    # American Option Valuation by Backwards Induction
-            rg   = np.polyfit(S[i], v[i + 1] * df, deg)      # fit 5th degree polynomial to PV of current inner values
-            C    = np.polyval(rg, S[i])              # continuation values.
-            v[i] = np.where(payout[i] > C, payout[i], v[i + 1] * df)  # exercise decision
-        v[0] = v[1] * df
-        self.px_spec.add(px=float(np.mean(v[0])))
+        df = np.exp(-frf_r * T / n)
+
+        gen = self._path_generator(nsteps=n, npaths=m, rng_seed=rng_seed, rf_r=frf_r, frf_r=0,
+                                   q=foreign_numeraire_dividend_yield)
+        lsm = LSM(deg=deg)
+
+        # American option valuation by LSM backward induction. If paths are streamed in chunks (``chunk_size``,
+        # ``mem_budget``, ``nworkers``), exercise policy is fitted on the first chunk and applied to the others.
+        def pv(S):
+            payout = np.maximum(sCP * (S - K), 0)
+            if lsm.coef is not None: return lsm.apply(payout, S, df=df)[0]
+            lsm.rollback(payout, S, df=df)
+            return lsm.pv
+
+        px = max(max(sCP * (S0 - K), 0.), self._mc_stream(gen, pv, pilot=True).px)
+        self.px_spec.add(px=float(px))
         return self
 
     def _calc_FD(self):
@@ -43,17 +43,17 @@ class Rainbow(European):
         >>> s = Stock(S0=(100, 50), vol=(.25, .45))
         >>> o = Rainbow(ref=s, right='call', K=40, T=.25, rf_r=.05, desc="See p.23 of Marshall's paper")
         >>> o.pxMC(corr=0.65, nsteps=100, npaths=1000, rng_seed=0); o  # doctest: +ELLIPSIS
-        7.576492715...
+        7.328072843...
 
         >>> s = Stock(S0=(100, 50), vol=(.25, .45))
         >>> o = Rainbow(ref=s, right='put', K=55, T=0.25, rf_r=.05, desc='Hull p.612')
         >>> o.pxMC(corr=0.65, nsteps=100, npaths=1000, rng_seed=2); o   # doctest: +ELLIPSIS
-        6.180473873...
+        5.907260164...
 
         >>> s = Stock(S0=(100, 50), vol=(.25, .45))
         >>> o = Rainbow(ref=s, right='put', K=55, T=0.25, rf_r=.05, desc='Hull p.612')
         >>> o.pxMC(corr=0.65, nsteps=100, npaths=1000, rng_seed=2); o     # doctest: +ELLIPSIS
-        6.180473873...
+        5.907260164...
 
         Raise iterations for higher precision price.
 
@@ -69,7 +69,7 @@ class Rainbow(European):
         """
         assert Util.is_number(corr) and abs(corr) <= 1, 'Correlation is number between -1 and 1, inclusive.'
         self.save2px_spec(corr=corr, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.        """
@@ -85,39 +85,15 @@ class Rainbow(European):
         :Authors:
             Mengyan Xie <xiemengy@gmail.com>
         """
-        _ = self.px_spec;   n, m, corr, rng_seed = _.nsteps, _.npaths, _.corr, _.rng_seed
-        _ = self.ref;       S0, vol, q = _.S0, _.vol, _.q
-        _ = self;           T, K, rf_r, net_r, sCP = _.T, _.K, _.rf_r, _.net_r, _.signCP
+        _ = self.px_spec;   m, corr, rng_seed = _.npaths, _.corr, _.rng_seed
+        _ = self;           T, rf_r, sCP = _.T, _.rf_r, _.signCP
 
-        dt = T / n
+        # Payout depends on terminal prices only, which exact GBM simulates in a single step (regardless of nsteps).
+        # Correlated prices of both assets are simulated at once, in chunks of paths if ``chunk_size`` or ``mem_budget`` is given.
+        gen = self._path_generator(cor=corr, nsteps=1, npaths=m, rng_seed=rng_seed)
         df = math.exp(-rf_r * T)
-        np.random.seed(rng_seed)
-        h = list()
-
-        for path in range(0, m):
-            # Generate correlated Wiener Processes
-            # Compute random variables with correlation
-            z1 = np.random.normal(loc=0.0, scale=1.0, size=n)
-            z2 = np.random.normal(loc=0.0, scale=1.0, size=n)
-            r1 = z1 * math.sqrt(dt)
-            r2 = (corr * z1 + math.sqrt(1 - corr ** 2) * z2) * math.sqrt(dt)
-
-            # Simulate the paths
-            S1 = [S0[0]]
-            S2 = [S0[1]]
-            mu = net_r * dt
-
-            # Compute stock price
-            for t in range(0, len(z1)):
-                S1.append(S1[-1] * (mu + vol[0] * r1[t]) + S1[-1])
-                S2.append(S2[-1] * (mu + vol[1] * r2[t]) + S2[-1])
-
-            # Maximum payout of S1 and S2
-            payout = np.maximum(sCP * (S1[-1] - S1[0]), sCP * (S2[-1] - S2[0]))
-            v = np.maximum(payout, 0.0) * df
-            # The payout is maximum of V and 0
-            h.append(v)
-        self.px_spec.add(px=float(np.mean(h)), sub_method='J.C.Hull p.601')
+        h = self._mc_stream(gen, lambda S: df * np.maximum(sCP * (S[-1] - S[0]), 0).max(axis=-1)).px  # best of two, or 0
+        self.px_spec.add(px=float(h), sub_method='J.C.Hull p.601')
 
         return self
 
@@ -0,0 +1,271 @@
+import copy
+import itertools
+import collections
+import numpy as np
+
+try: from qfrm.Portfolio import *  # production:  if qfrm package is installed
+except:   from Portfolio import *  # development: if not installed and running from source
+
+
+class ScenarioGrid:
+    """ Values of an option (or a ``Portfolio``) over a grid of shifts of its market specs: a risk ladder.
+
+    Shifts are given per axis: spot price ``S0`` (relative, ex. ``.1`` is +10%), volatility ``vol`` (absolute,
+    ex. ``.1`` is +10 vol points), risk free rate ``rf_r`` (absolute) and time to expiry ``T`` (in years, added to
+    ``T``; ex. ``-1/52`` is a week later). Only axes with shifts become dimensions of ``values``, in this order.
+
+    All scenarios are valued in one pass, wherever possible:
+
+    - like contracts with a vectorized pricer (``Portfolio.batch_pricers``, ex. European BS, American LT) are priced
+      once over an array of shape ``(positions,) + shape`` of shifted specs (a batch of lattices, in LT case);
+    - FD pricers, which expose their grid (``px_spec._FD_grid``), are run once per scenario of ``vol``, ``rf_r``, ``T``,
+      and values at all shifted spots are interpolated from that grid (spots outside the grid are repriced);
+    - other positions are repriced on shifted copies of options, one scenario at a time.
+
+    Examples
+    --------
+    P&L ladder of a call over spot -20%..+20% and vol -10..+10 points:
+
+    >>> from qfrm import *
+    >>> o = European(ref=Stock(S0=42, vol=.2), right='call', K=40, T=.5, rf_r=.1)
+    >>> sg = ScenarioGrid(o, S0=np.linspace(-.2, .2, 5), vol=(-.1, 0, .1)).calc()
+    >>> sg
+    <ScenarioGrid S0(5) x vol(3), BS: base 4.759422>
+    >>> sg.pnl.round(4)
+    array([[-4.7194, -4.2328, -3.4551],
+           [-3.8098, -2.7438, -1.679 ],
+           [-0.7043,  0.    ,  0.9553],
+           [ 3.3941,  3.6219,  4.2573],
+           [ 7.5914,  7.6456,  7.9906]])
+    >>> o.update(ref=Stock(S0=42 * 1.1, vol=.3)).pxBS(), round(sg.sel(S0=.1, vol=.1), 9)   # the same as repricing
+    (9.016768855, 9.016768855)
+
+    Labeled ``pandas.DataFrame`` view (rows are scenarios of the first axis):
+
+    >>> sg.to_frame().round(2)    # doctest: +NORMALIZE_WHITESPACE
+    vol    -0.1    0.0    0.1
+    S0
+    -0.2   0.04   0.53   1.30
+    -0.1   0.95   2.02   3.08
+     0.0   4.06   4.76   5.71
+     0.1   8.15   8.38   9.02
+     0.2  12.35  12.41  12.75
+
+    A portfolio (long calls, short American puts) over spot, vol and time. American puts are priced on a batch of
+    lattices (one per scenario), rolled back at once:
+
+    >>> s = Stock(S0=50, vol=.3)
+    >>> p = Portfolio([(European(ref=s, right='call', K=50, T=1, rf_r=.05), 10)])
+    >>> _ = p.add(American(ref=s, right='put', K=45, T=1, rf_r=.05), qty=-10, method='LT', nsteps=50)
+    >>> sg = ScenarioGrid(p, S0=(-.1, 0, .1), vol=(-.05, .05), T=(0, -.25)).calc()
+    >>> sg.values.shape, sg.dims, sg.batches
+    ((3, 2, 2), ('S0', 'vol', 'T'), [('European', 'BS', 1), ('American', 'LT', 1)])
+    >>> sg.pnl[:, :, 1].round(2)    # 3 months later
+    array([[-48.95, -48.46],
+           [ -7.31,  -4.52],
+           [ 35.91,  40.11]])
+    >>> s = Stock(S0=55, vol=.35)     # repricing of spot +10%, vol +5 points, 3 months later
+    >>> c = European(ref=s, right='call', K=50, T=.75, rf_r=.05).pxBS()
+    >>> a = American(ref=s, right='put', K=45, T=.75, rf_r=.05).pxLT(nsteps=50)
+    >>> round(10 * c - 10 * a, 6), round(sg.sel(S0=.1, vol=.05, T=-.25), 6)
+    (83.427523, 83.427523)
+
+    A binary option priced by FD: all spot shifts are read off a single grid (per scenario of vol).
+    Values are close to closed-form prices of the same scenarios (a digital payoff is hard on FD grids):
+
+    >>> o = Binary(ref=Stock(S0=50, vol=.3), right='call', K=50, T=1, rf_r=.05)
+    >>> kw = dict(payout_type='cash-or-nothing', Q=100)
+    >>> sg = ScenarioGrid(o, S0=(-.1, 0, .1), vol=(0, .1))
+    >>> sg.calc(method='FD', nsteps=100, npaths=200, **kw).values.round(2)
+    array([[34.5 , 34.52],
+           [47.56, 44.27],
+           [59.42, 53.33]])
+    >>> sg.calc(method='BS', **kw).values.round(2)
+    array([[35.1 , 34.96],
+           [48.19, 44.72],
+           [60.02, 53.73]])
+
+    Options on options shift the stock at the end of the ``ref`` chain, and rate and expiry of every option in it.
+    A call on an American put, priced by FD, over spot and time (3 months later, both expiries are 3 months closer):
+
+    >>> a = American(ref=Stock(S0=50, vol=.25), right='put', K=50, T=1, rf_r=.05)
+    >>> sg = ScenarioGrid(Compound(ref=a, right='call', K=5, T=.5, rf_r=.05), S0=(-.1, 0, .1), T=(0, -.25))
+    >>> sg.calc(method='FD', nsteps=50, npaths=100).values.round(2)
+    array([[2.7 , 2.09],
+           [1.18, 0.63],
+           [0.46, 0.14]])
+    >>> a = American(ref=Stock(S0=45, vol=.25), right='put', K=50, T=.75, rf_r=.05)     # spot -10%, 3 months later
+    >>> Compound(ref=a, right='call', K=5, T=.25, rf_r=.05).pxFD(nsteps=50, npaths=100)
+    2.09295262
+    """
+    axes = ('S0', 'vol', 'rf_r', 'T')   # shiftable specs, in order of dimensions
+
+    def __init__(self, obj, S0=None, vol=None, rf_r=None, T=None, desc=None):
+        """ Constructor.
+
+        Parameters
+        ----------
+        obj : OptionValuation, Portfolio
+            an option of any class or a portfolio of positions
+        S0 : array_like, optional
+            relative shifts of spot prices
+        vol : array_like, optional
+            absolute shifts of volatilities
+        rf_r : array_like, optional
+            absolute shifts of risk free rates
+        T : array_like, optional
+            shifts of times to expiry (in years)
+        desc : str, optional
+            description of the scenario grid
+        """
+        assert isinstance(obj, (OptionValuation, Portfolio)), 'Ooops. Scenarios are run on an option or a Portfolio'
+        shifts = dict(S0=S0, vol=vol, rf_r=rf_r, T=T)
+        self.obj, self.desc = obj, desc
+        self.coords = collections.OrderedDict((k, np.atleast_1d(np.asarray(shifts[k], dtype=float)))
+                                              for k in self.axes if shifts[k] is not None)
+        assert self.coords, 'Ooops. Please supply shifts of at least one of ' + ', '.join(self.axes)
+        assert all(v.ndim == 1 for v in self.coords.values()), 'Ooops. Shifts of every spec must be a 1-D sequence'
+        self.values = self.base = self.method = self.batches = None
+
+    @property
+    def dims(self):
+        """ Names of dimensions of ``values``.  """
+        return tuple(self.coords)
+
+    @property
+    def shape(self):
+        """ Number of scenarios along each dimension.  """
+        return tuple(v.size for v in self.coords.values())
+
+    @property
+    def pnl(self):
+        """ Profit and loss in every scenario, i.e. ``values`` less the base (unshifted) value.  """
+        assert self.values is not None, 'Ooops. Please run calc() first'
+        return self.values - self.base
+
+    def __repr__(self):
+        grid = ' x '.join('{}({})'.format(k, v.size) for k, v in self.coords.items())
+        if self.values is None: return '<ScenarioGrid {}>'.format(grid)
+        return '<ScenarioGrid {}, {}: base {:.6f}>'.format(grid, self.method, self.base)
+
+    def calc(self, method='BS', **kwargs):
+        """ Values the option (or portfolio) in all scenarios.
+
+        Parameters
+        ----------
+        method : {'BS', 'LT', 'MC', 'FD'}
+            pricing method of positions which do not specify their own (see ``Portfolio.add()``)
+        kwargs : optional
+            pricing parameters (ex. ``nsteps``, ``npaths``, ``H``) of positions which do not override them
+
+        Returns
+        -------
+        self : ScenarioGrid
+            ``values`` (``numpy`` array of shape ``shape``, dimensions ``dims``), unshifted value ``base``
+            and ``batches`` (class, method and number of positions of every group of like contracts)
+        """
+        p = self.obj if isinstance(self.obj, Portfolio) else Portfolio([self.obj])
+        self.base = p.calc_px(method=method, **kwargs).px_spec.px
+        self.method, self.batches, self.values = method, p.px_spec.batches, np.zeros(self.shape)
+
+        for (cls, m, _), group in p.groups(method, **kwargs).items():
+            pricer = p.batch_pricers.get((cls, m))
+            if pricer is not None:
+                px = pricer(self._batch_specs([pos['opt'] for _, pos, _ in group]), False, **group[0][2]).px
+                for j, (_, pos, _) in enumerate(group): self.values += pos['qty'] * px[j]
+            else:
+                for _, pos, kw in group: self.values += pos['qty'] * self._reprice(pos['opt'], m, kw)
+        return self
+
+    def sel(self, **shifts):
+        """ Values at given shifts (one per named dimension). Dimensions, which are not named, are kept.
+
+        Returns
+        -------
+        float, numpy.ndarray
+        """
+        assert self.values is not None, 'Ooops. Please run calc() first'
+        idx = []
+        for k, v in self.coords.items():
+            if k not in shifts: idx.append(slice(None));  continue
+            i = np.flatnonzero(np.isclose(v, shifts[k]))
+            assert i.size, 'Ooops. No scenario with {} shift of {}'.format(k, shifts[k])
+            idx.append(int(i[0]))
+        out = self.values[tuple(idx)]
+        return float(out) if np.ndim(out) == 0 else out
+
+    def to_frame(self):
+        """ ``pandas.DataFrame`` of ``values``: scenarios of the first dimension in rows,
+        (combinations of) scenarios of the remaining dimensions in columns.  """
+        import pandas as pd
+        dims, coords = self.dims, list(self.coords.values())
+        rows = pd.Index(coords[0], name=dims[0])
+        if len(dims) == 1: return pd.DataFrame({'value': self.values}, index=rows)
+        if len(dims) == 2: cols = pd.Index(coords[1], name=dims[1])
+        else: cols = pd.MultiIndex.from_tuples(list(itertools.product(*coords[1:])), names=dims[1:])
+        return pd.DataFrame(self.values.reshape(self.shape[0], -1), index=rows, columns=cols)
+
+    def _shifts(self):
+        """ Shifts of all specs, broadcastable to ``shape`` (zero for specs without scenarios).  """
+        nd = len(self.coords)
+        sh = dict.fromkeys(self.axes, 0.)
+        for i, (k, v) in enumerate(self.coords.items()): sh[k] = v.reshape([-1 if j == i else 1 for j in range(nd)])
+        return sh
+
+    def _batch_specs(self, opts):
+        """ Shifted specs of like options for a vectorized pricer: a dictionary of arrays of shape ``(len(opts),) + shape``.  """
+        r = OptionSpec.to_records([OptionSpec.from_option(o) for o in opts])
+        col = lambda k: r[k].reshape((-1,) + (1,) * len(self.coords))
+        sh = self._shifts()
+        sp = dict(S0=col('S0') * (1 + sh['S0']), vol=col('vol') + sh['vol'], rf_r=col('rf_r') + sh['rf_r'],
+                  T=col('T') + sh['T'], K=col('K'), q=col('q'), frf_r=col('frf_r'), right=col('right'))
+        assert (sp['vol'] > 0).all() and (sp['T'] > 0).all(), 'Ooops. Shifted vol and T must be positive'
+        return sp
+
+    def _reprice(self, o, method, kwargs):
+        """ Values of a single option in all scenarios, priced on shifted copies.
+        An FD grid (if the pricer exposes one) serves all spot shifts of a scenario of the other specs.  """
+        dims, shape = self.dims, self.shape
+        price = lambda **d: _shifted(o, **d).calc_px(method=method, **kwargs).px_spec
+        out = np.empty(shape)
+        reuse = method == 'FD' and 'S0' in dims and np.ndim(_stock(o).S0) == 0
+        k = dims.index('S0') if reuse else None
+
+        for idx in np.ndindex(*[1 if i == k else n for i, n in enumerate(shape)]):
+            d = {name: self.coords[name][j] for name, j in zip(dims, idx)}
+            if not reuse:
+                out[idx] = price(**d).px;  continue
+
+            dS = self.coords['S0']
+            d['S0'] = 0.
+            grid, S = getattr(price(**d), '_FD_grid', None), _stock(o).S0 * (1 + dS)
+            if grid is None: row, inside = np.empty(dS.size), np.zeros(dS.size, dtype=bool)
+            else: row, inside = np.interp(S, grid[0], grid[1]), (S >= grid[0][0]) & (S <= grid[0][-1])
+            for j in np.flatnonzero(~inside): row[j] = price(**dict(d, S0=dS[j])).px
+            out[idx[:k] + (slice(None),) + idx[k + 1:]] = row
+        return out
+
+
+def _stock(o):
+    """ Underlying ``Stock`` of option ``o``, found down the chain of ``ref`` (ex. option on option).  """
+    while isinstance(o.ref, OptionValuation): o = o.ref
+    assert isinstance(o.ref, Stock), 'Ooops. Scenarios shift specs of a Stock underlying, at the end of the ref chain'
+    return o.ref
+
+
+def _shifted(o, S0=0., vol=0., rf_r=0., T=0.):
+    """ Copy of option ``o`` with shifted specs: spot price (relative), volatility, risk free rate and time to expiry.
+    Multi-asset options have all spots and volatilities shifted. Options on options (ex. ``Compound``) have
+    the rate and expiry of every option in the ``ref`` chain shifted, and the specs of the underlying stock.  """
+    _stock(o)
+    o = copy.copy(o)
+    o.rf_r, o.T = o.rf_r + rf_r, o.T + T
+    assert o.T > 0, 'Ooops. Shifted time to expiry must be positive'
+    if isinstance(o.ref, OptionValuation):
+        o.ref = _shifted(o.ref, S0=S0, vol=vol, rf_r=rf_r, T=T)
+        return o
+    o.ref = copy.copy(o.ref)
+    s, v = o.ref.S0, o.ref.vol
+    o.ref.S0 = tuple(x * (1 + S0) for x in s) if isinstance(s, tuple) else s * (1 + S0)
+    o.ref.vol = tuple(x + vol for x in v) if isinstance(v, tuple) else v + vol
+    return o
@@ -1,5 +1,4 @@
 import numpy as np
-import scipy.stats
 
 try: from qfrm.European import *  # production:  if qfrm package is installed
 except:   from European import *  # development: if not installed and running from source
@@ -20,7 +19,7 @@ class Shout(European):
         Parameters
         ----------
         deg : int
-            degree of polynomial fit in MC. Usually, around 5.
+            degree of polynomial fit in MC (LSM regression). Usually, around 5.
         kwargs : dict
             Keyword arguments (``method``, ``nsteps``, ``npaths``, ``keep_hist``, ``rng_seed``, ...)
             are passed to the parent. See ``European.calc_px()`` for details.
@@ -63,22 +62,28 @@ class Shout(European):
         >>> O.plot(grid=1, title='LT Price vs nsteps') # doctest: +ELLIPSIS
         <matplotlib.axes._subplots.AxesSubplot object at ...>
 
+        The option received on a shout is priced net of dividend yield ``q``:
+
+        >>> o = Shout(ref=Stock(S0=110, vol=.2, q=.04), right='call', K=100, T=0.5, rf_r=.05, desc='Example 1 of MC')
+        >>> o.pxLT(nsteps=100)
+        16.106444882
+
         **MC**
-        Note: When deg is too large, ``numpy.polyfit`` will give warnings: Polyfit may be poorly
-        conditioned warnings.warn(msg, RankWarning)
+        Shout decision is found with Least Squares Monte Carlo (see ``LSM``),
+        regressing discounted cash flows on ``deg + 1`` weighted Laguerre polynomials of the stock price.
 
         >>> s = Stock(S0=110, vol=.2, q=0.04)
         >>> o = Shout(ref=s, right='call', K=100, T=0.5, rf_r=.05, desc='See example in Notes [3]')
         >>> o.pxMC(nsteps=100, npaths=1000, keep_hist=True, rng_seed=314, deg=5)
-        14.885085333
+        16.21262738
 
         >>> s = Stock(S0=36, vol=.2)
         >>> o = Shout(ref=s, right='put', K=40, T=1, rf_r=.2, desc="L. Yudaken\'s paper")
         >>> o.pxMC(nsteps=100, npaths=1000, keep_hist=True, rng_seed=0)
-        4.1410886
+        3.81598948
 
         >>> o.calc_px(method='MC', nsteps=100, npaths=1000, keep_hist=True, rng_seed=0).px_spec  # doctest: +ELLIPSIS
-        PriceSpec...px: 4.1410886...
+        PriceSpec...px: 3.81598948...
 
         >>> from pandas import Series;  steps = [100 * i for i in range(1,21)]
         >>> O = Series([o.pxMC(nsteps=s, npaths=100, keep_hist=True, rng_seed=0, deg=0) for s in steps], steps)
@@ -91,7 +96,7 @@ class Shout(European):
             Yen-fei Chen <yensfly@gmail.com>
        """
         self.save2px_spec(deg=deg, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_BS(self):
         """ Internal function for option valuation.        """
@@ -119,7 +124,7 @@ class Shout(European):
         for i in range(n, 0, -1):
             left = n - i + 1      # Left number until duration
             tleft = left * dt     # Time left until duration
-            d1 = (0 + (rf_r + vol ** 2 / 2) * tleft) / (vol * np.sqrt(tleft))   # d1 and d2 from BS model
+            d1 = (0 + (rf_r - q + vol ** 2 / 2) * tleft) / (vol * np.sqrt(tleft))   # d1 and d2 from BS model
             d2 = d1 - vol * np.sqrt(tleft)
 
             # payoff of not shout
@@ -156,28 +161,21 @@ class Shout(European):
         _ = self;           T, K, rf_r, net_r, sCP = _.T, _.K, _.rf_r, _.net_r, _.signCP
         _ = self._LT_specs(); u, d, p, df, dt = _['u'], _['d'], _['p'], _['df_dt'], _['dt']
 
-        np.random.seed(rng_seed)
-
-        # option_px = np.zeros((n + 1, m) ,'d')
-        S = np.zeros((n + 1, m), 'd')  # stock price matrix
-        S[0, :] = S0  # initial value
-
-        # stock price paths
-        for t in range(1, n+1):
-            random = scipy.stats.norm.rvs(loc=0, scale=1, size=m)
-            S[t, :] = S[t-1, :] * np.exp((rf_r - vol**2 / 2) * dt + vol * random * np.sqrt(dt))
-
-        option_px = np.maximum(sCP*(S - K), 0)  # payoff when not shout
-        final_payoff = np.repeat(S[-1, :], n+1, axis=0).reshape(m, n + 1)
-        shout_px = np.maximum(sCP*(final_payoff.transpose() - K), sCP * (S - K))
-
-        for t in range (n - 1, -1, -1):  # valuation process is similar to American option
-            rg = np.polyfit(S[t, :], df * np.array(option_px[t + 1, :]), deg) # regression at time t
-            C = np.polyval(rg, S[t, :])  # continuation values
-            # exercise decision: shout or not shout
-            option_px[t, :] = np.where(shout_px[t, :] > C, shout_px[t, :], option_px[t+1,:] * df)
-
-        self.px_spec.add(px=float(np.mean(option_px[0, :])), sub_method='Hull p.609')
+        S = self._path_generator(nsteps=n, npaths=m, rng_seed=rng_seed).paths()  # stock price paths
+
+        # shout value at time step i: intrinsic value locked in (paid at expiry) and an at-the-money European option
+        tleft = T - dt * np.arange(n + 1)[:, None]      # time left until expiry
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d1 = (rf_r - q + vol ** 2 / 2) * tleft / (vol * np.sqrt(tleft));    d2 = d1 - vol * np.sqrt(tleft)
+            shout = sCP * S * np.exp(-q * tleft) * Util.norm_cdf(sCP * d1) - \
+                    sCP * S * np.exp(-rf_r * tleft) * Util.norm_cdf(sCP * d2) + sCP * (S - K) * np.exp(-rf_r * tleft)
+        E = np.maximum(shout, 0)
+        E[-1] = np.maximum(sCP * (S[-1] - K), 0)        # payoff at expiry, if holder never shouted
+
+        lsm = LSM(deg=deg)
+        lsm.rollback(E, S, df=df)           # optimal shout decision is found as in American option
+        px = max(float(np.mean(E[0])), self._mc_estimate(lsm.pv).px)
+        self.px_spec.add(px=float(px), sub_method='Least Squares Monte Carlo (LSM); Hull p.609')
         return self
 
     def _calc_FD(self):
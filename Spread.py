@@ -69,13 +69,13 @@ class Spread(European):
         >>> s2 = Stock(S0=31, q=0, vol=.3)
         >>> o = Spread(ref=s1, rf_r=.05, right='call', K=0, T=2)
         >>> o.pxMC(ref2=s2, rho=.4, nsteps=100, npaths=1000, rng_seed=0); o # doctest: +ELLIPSIS
-        5.996962262...
+        5.172716106...
 
         >>> s1 = Stock(S0=30, q=0, vol=.2)
         >>> s2 = Stock(S0=31, q=0, vol=.3)
         >>> o = Spread(ref = s1, rf_r = .05, right='put', K=2, T=2)
         >>> o.pxMC(ref2=s2, rho=.4, nsteps=100, npaths=1000, rng_seed=0); o # doctest: +ELLIPSIS
-        5.130287061...
+        5.128455288...
 
         >>> s1 = Stock(S0=30, q=0, vol=.2)
         >>> s2 = Stock(S0=30, q=0, vol=.2)
@@ -83,6 +83,12 @@ class Spread(European):
         >>> o.pxMC(ref2=s2, rho=1, nsteps=100, npaths=1000, rng_seed=2); o   # doctest: +ELLIPSIS
         0.904837418...
 
+        Paths can be simulated in chunks (to bound memory use for large ``npaths``), with the same price:
+
+        >>> o = Spread(ref=s1, rf_r=.05, right='put', K=2, T=2)
+        >>> o.pxMC(ref2=Stock(S0=31, q=0, vol=.3), rho=.4, nsteps=100, npaths=1000, rng_seed=0, chunk_size=300)
+        5.128455288
+
 
 
         >>> s1 = Stock(S0=30, q=0, vol=.2)
@@ -99,7 +105,7 @@ class Spread(European):
         assert type(ref2).__name__ == 'Stock', 'ref2 parameter must be another Stock() object'
         assert abs(rho) <= 1
         self.save2px_spec(rho=rho, ref2=ref2, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
     def _calc_LT(self):
         """ Internal function for option valuation.        """
@@ -133,35 +139,18 @@ class Spread(European):
         :Authors:
             Scott Morgan
         """
-        _ = self;               T, K, rf_r, net_r, sCP = _.T, _.K, _.rf_r, _.net_r, _.signCP
+        _ = self;               T, K, rf_r, sCP = _.T, _.K, _.rf_r, _.signCP
         _ = self.ref;           S, vol, q = _.S0, _.vol, _.q
-        _ = self.px_spec;       n, m, keep_hist, rng_seed, rho = _.nsteps, _.npaths, _.keep_hist, _.rng_seed, _.rho
+        _ = self.px_spec;       m, rng_seed, rho = _.npaths, _.rng_seed, _.rho
         _ = self.px_spec.ref2;  S2, vol2, q2 = _.S0, _.vol, _.q
-        _ = self._LT_specs();   u, d, p, df, dt = _['u'], _['d'], _['p'], _['df_dt'], _['dt']
-
-        px = list()
-        numpy.random.seed(rng_seed)
-
-        for path in range(0,m):
-
-            ## Generate correlated Wiener Processes
-            u = numpy.random.normal(size=n)
-            v = numpy.random.normal(size=n)
-            v = rho * u + math.sqrt(1 - rho**2) * v
-            u = u * math.sqrt(dt)
-            v = v * math.sqrt(dt)
-
-            ## Simulate the paths
-            s1, s2, mu1, mu2 = [S], [S2], (rf_r - q)*dt, (rf_r - q2)*dt
-
-            for t in range(0, len(u)):
-                s1.append(s1[-1] * (mu1 + vol * u[t]) + s1[-1])
-                s2.append(s2[-1] * (mu2 + vol2 * v[t]) + s2[-1])
 
-            val = np.maximum(sCP * (s2[-1] - s1[-1] - K), 0) * math.exp(-rf_r * T)  # Calculate the Payoff
-            px.append((val))
+        ## Simulate correlated terminal prices of both stocks at once (in chunks of paths, if ``chunk_size`` or ``mem_budget`` is given).
+        ## Payoff is path-independent and GBM is simulated exactly, so a single time step suffices for any nsteps.
+        gen = self._path_generator(S0=(S, S2), vol=(vol, vol2), q=(q, q2), cor=rho, nsteps=1, npaths=m, rng_seed=rng_seed)
+        df = math.exp(-rf_r * T)
+        px = self._mc_stream(gen, lambda s: df * np.maximum(sCP * (s[-1, :, 1] - s[-1, :, 0] - K), 0)).px  # Payoff
 
-        self.px_spec.add(px=float(np.mean(px)))
+        self.px_spec.add(px=float(px))
 
         return self
 
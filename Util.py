@@ -1,5 +1,5 @@
 import re
-import yaml
+import sys
 import numbers
 import math
 import numpy as np
@@ -327,7 +327,15 @@ class Util():
         >>> from scipy.stats import norm
         >>> sum( [abs(Util.norm_cdf(x) - norm.cdf(x)) for x in range(100)])
         3.3306690738754696e-16
+
+        Arrays are evaluated in a single pass with ``scipy.special.ndtr`` ufunc.
+
+        >>> Util.norm_cdf(np.array([-1., 0., 1.]))  # doctest: +NORMALIZE_WHITESPACE
+        array([0.15865525, 0.5       , 0.84134475])
         """
+        if not Util.is_number(x):
+            from scipy.special import ndtr
+            return ndtr((np.asarray(x, dtype=float) - mu) / sigma)
 
         y = 0.5 * (1 - math.erf(-(x - mu)/(sigma * math.sqrt(2.0))))
         if y > 1: y = 1
@@ -335,6 +343,15 @@ class Util():
 
     @staticmethod
     def norm_pdf(x, mu=0, sigma=1):
+        """ Standard normal density, which also works element-wise on arrays.
+
+        >>> Util.norm_pdf(np.array([0., 1.]))
+        array([0.39894228, 0.24197072])
+        """
+        if not Util.is_number(x):
+            u = (np.asarray(x, dtype=float) - mu) / abs(sigma)
+            return np.exp(-u * u / 2) / (math.sqrt(2 * math.pi) * abs(sigma))
+
         u = (x - mu)/abs(sigma)
         y = (1/(math.sqrt(2 * math.pi) * abs(sigma))) * math.exp(-u*u/2)
         return y
@@ -643,6 +660,39 @@ class Util():
         out = (i * j for i, j in zip(x, y))
         return tuple(out) if as_tuple else out
 
+    @staticmethod
+    def pyplot():
+        """ Imports ``matplotlib.pyplot`` on first use, so that pricing code does not pay for matplotlib import.
+
+        TravisCI doesn't have an Xwindows backend, causing tests to fail on plot generation.
+        This forces matplotlib to not use any Xwindows backend.
+        See http://stackoverflow.com/questions/2801882/generating-a-png-with-matplotlib-when-display-is-undefined
+
+        Returns
+        -------
+        module
+            ``matplotlib.pyplot``
+
+        Examples
+        --------
+        >>> Util.pyplot().get_backend().lower()
+        'agg'
+        """
+        import matplotlib as mpl
+        if 'matplotlib.pyplot' not in sys.modules: mpl.use('Agg')
+        import matplotlib.pyplot as plt
+        return plt
+
+
+_re_null = re.compile(r'\w+: null')
+_re_blank_lines = re.compile(u'(?imu)^\s*\n')
+_re_commas = re.compile(r'(,\s){2,}')
+_re_spaces = re.compile(r'(\s){2,}')
+_re_implicit = re.compile(r"""^(?:~|null|Null|NULL|y|Y|yes|Yes|YES|n|N|no|No|NO|true|True|TRUE|false|False|FALSE
+    |on|On|ON|off|Off|OFF|[-+]?[0-9][0-9_]*(?:\.[0-9_]*)?(?:[eE][-+]?[0-9]+)?|[-+]?\.[0-9_]+(?:[eE][-+]?[0-9]+)?
+    |[-+]?\.(?:inf|Inf|INF)|\.(?:nan|NaN|NAN)|0b[01_]+|0x[0-9a-fA-F_]+|[0-9]{4}-[0-9]{1,2}-[0-9]{1,2}.*|<<|=)$""", re.X)
+_yaml_indicators = set('#,[]{}&*!|>\'"%@`')
+
 
 class SpecPrinter:
     r""" Helper class for printing class's internal variables.
@@ -677,6 +727,7 @@ class SpecPrinter:
         Oleg Melnikov <xisreal@gmail.com>
     """
     print_precision = 9
+    print_max_items = 20    # longer sequences are printed with '...' in the middle; None prints all elements
 
     def __init__(self, print_precision=9):
         """ Constructor
@@ -692,19 +743,24 @@ class SpecPrinter:
         """
         SpecPrinter.print_precision = print_precision
 
-    def full_spec(self, print_as_line=True):
+    def _print_state(self):
+        """ Variables of this object, which are printed. Subclasses may leave out intermediate results.  """
+        return vars(self)
+
+    def full_spec(self, print_as_line=True, use_yaml=False):
         r""" Returns a formatted string containing all variables of this class (recursively)
 
+        By default, a YAML-like text is composed directly (see ``_dump()``), which is much faster than ``yaml.dump``.
+        Sequences longer than ``print_max_items`` (ex. ``ref_tree`` and ``opt_tree`` with ``keep_hist=True``)
+        are shortened with ``...`` in the middle.
+
         Parameters
         ----------
         print_as_line : bool
             If ``True``, print key:value pairs are separated by ``,``
             If ``False``, --- by ``\n``
-        print_precision : {None, int}, optional
-            Specifies desired floating number precision for screen-printed values (prices, etc).
-            Assists with doctesting due to rounding errors near digits in 10^-12 placements
-            If value is None, then precision is ignored and default machine precision is used.
-            See `round() <https://docs.python.org/3.5/library/functions.html#round>`_
+        use_yaml : bool
+            If ``True``, the object is serialized with PyYAML (complete, but slow) before formatting.
         Returns
         -------
         str
@@ -718,28 +774,19 @@ class SpecPrinter:
         - `Overloading examples <http://pyyaml.org/browser/pyyaml/trunk/lib/yaml/representer.py#L187>`_
         - `RegEx demo <https://regex101.com/r/dZ9iI8/1>`_
 
+        Examples
+        --------
+        >>> class B(SpecPrinter):
+        ...     def __init__(self):  self.x = tuple(range(1000)); self.s = 'a, b'; super().__init__()
+        >>> B().full_spec()
+        "B{s:'a, b', x: [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, ..., 990, 991, 992, 993, 994, 995, 996, 997, 998, 999]}"
+        >>> B().full_spec(use_yaml=True)[-20:]
+        '996, 997, 998, 999]}'
         """
+        s = self._yaml_dump(print_as_line) if use_yaml else self._dump(self, flow=print_as_line)
 
-        def float_representer(dumper, value):
-            text = str(value if SpecPrinter.print_precision is None else round(value, SpecPrinter.print_precision))
-            return dumper.represent_scalar(u'tag:yaml.org,2002:float', text)
-
-        def numpy_representer_str(dumper, data):
-            astr = ', '.join(['%s']*data.shape[0])%tuple(data)
-            return dumper.represent_scalar('!ndarray:', astr)
-
-        def numpy_representer_seq(dumper, data):
-            return dumper.represent_sequence('!ndarray:', data.tolist())
-
-        yaml.add_representer(float, float_representer)
-        yaml.add_representer(np.ndarray, numpy_representer_str)
-        yaml.add_representer(np.ndarray, numpy_representer_seq)
-
-        # '\n' is inserted after each "width" number of characters, and at the end. So, we set to large width.
-        s = yaml.dump(self, default_flow_style=print_as_line, width=1000)  # , explicit_end=True
-
-        s = re.sub(r'\w+: null', '', s)  # RegEx removes null keys. Demo: https://regex101.com/r/dZ9iI8/1
-        s = re.sub(u'(?imu)^\s*\n', u'', s)  # removes lines of spaces
+        s = _re_null.sub('', s)  # RegEx removes null keys. Demo: https://regex101.com/r/dZ9iI8/1
+        s = _re_blank_lines.sub(u'', s)  # removes lines of spaces
 
         s = s.replace('!!python/object:', '').replace('!!python/tuple', '')
         s = s.replace('__main__.', '').replace(type(self).__name__ + '.', '').replace('SpecPrinter.', '')
@@ -747,14 +794,140 @@ class SpecPrinter:
         s = s.replace('qfrm.', '').replace('Util.', '').replace('!ndarray: ', '')
 
         s = s.replace(' {', '{')
-        s = re.sub(re.compile(r'(,\s){2,}'), ', ', s)  # ", , , , , ... "   |->  ", "
+        s = _re_commas.sub(', ', s)  # ", , , , , ... "   |->  ", "
 
         if print_as_line:
             s = s.replace(',', ', ').replace(': ', ':')
-            s = re.sub(r'(\s){2,}', ' ', s)    # replace successive spaces with one instance
+            s = _re_spaces.sub(' ', s)    # replace successive spaces with one instance
 
         return s.strip()
 
+    def _yaml_dump(self, print_as_line):
+        """ Serializes this object with PyYAML. Representers of floats and arrays are registered once.  """
+        import yaml     # loaded on first print, as it is not needed for pricing
+
+        if not getattr(SpecPrinter, '_yaml_ready', False):
+            def float_representer(dumper, value):
+                text = str(value if SpecPrinter.print_precision is None else round(value, SpecPrinter.print_precision))
+                return dumper.represent_scalar(u'tag:yaml.org,2002:float', text)
+
+            def numpy_representer_seq(dumper, data):
+                return dumper.represent_sequence('!ndarray:', data.tolist())
+
+            def spec_representer(dumper, data):
+                tag = u'tag:yaml.org,2002:python/object:' + type(data).__module__ + '.' + type(data).__name__
+                return dumper.represent_mapping(tag, data._print_state())
+
+            yaml.add_representer(float, float_representer)
+            yaml.add_representer(np.ndarray, numpy_representer_seq)
+            yaml.add_multi_representer(SpecPrinter, spec_representer)
+            SpecPrinter._yaml_ready = True
+
+        # '\n' is inserted after each "width" number of characters, and at the end. So, we set to large width.
+        return yaml.dump(self, default_flow_style=print_as_line, width=1000)  # , explicit_end=True
+
+    @staticmethod
+    def _scalar(v, flow=False):
+        """ YAML-like text of a scalar (quoted where YAML would quote it), or ``None`` if ``v`` is not a scalar.  """
+        if v is None: return 'null'
+        if isinstance(v, (bool, np.bool_)): return 'true' if v else 'false'
+        if isinstance(v, (numbers.Integral, np.integer)): return str(int(v))
+        if isinstance(v, (float, np.floating)):
+            p = SpecPrinter.print_precision
+            return str(float(v) if p is None else round(float(v), p))
+        if isinstance(v, str):
+            if v == '' or _re_implicit.match(v) or v != v.strip() or v[0] in _yaml_indicators or '\n' in v \
+                    or (v[0] in '-?:' and (len(v) == 1 or v[1] == ' ')) or ': ' in v or ' #' in v or v.endswith(':') \
+                    or (flow and any(c in v for c in ',[]{}')):
+                return "'" + v.replace("'", "''") + "'"
+            return v
+        return None
+
+    @staticmethod
+    def _state(v):
+        """ Tag and key/value pairs of a mapping-like ``v`` (object, dict or set), or ``None``.  """
+        if isinstance(v, dict): return '', v
+        if isinstance(v, (set, frozenset)): return '!!set', dict.fromkeys(v)
+        if hasattr(v, '__dict__') and not callable(v):
+            state = v._print_state() if isinstance(v, SpecPrinter) else vars(v)
+            return '!!python/object:' + type(v).__module__ + '.' + type(v).__name__, state
+        return None
+
+    @staticmethod
+    def _items(v):
+        """ Tag and elements of a sequence-like ``v`` (list, tuple, array), shortened to ``print_max_items``.  """
+        if isinstance(v, np.ndarray): tag, v = '!ndarray:', v.tolist() if v.ndim else [v.item()]
+        elif isinstance(v, tuple): tag = '!!python/tuple'
+        elif isinstance(v, list): tag = ''
+        else: return None
+        n = SpecPrinter.print_max_items
+        if n is not None and len(v) > n: v = list(v[:n // 2]) + [Ellipsis] + list(v[len(v) - n // 2:])
+        return tag, v
+
+    @staticmethod
+    def _dump(v, flow=False):
+        """ Fast YAML-like serialization of (nested) specs, which mimics ``yaml.dump`` output for types used in specs.
+
+        Parameters
+        ----------
+        v : object
+            object with specs, or any nested combination of mappings, sequences and scalars
+        flow : bool
+            If ``True``, single-line flow style is used; otherwise block style.
+
+        Returns
+        -------
+        str
+            YAML-like text
+        """
+        sc, st, it = SpecPrinter._scalar, SpecPrinter._state, SpecPrinter._items
+        tagged = lambda tag, s: tag + ' ' + s if tag else s
+
+        def node_flow(v):
+            if v is Ellipsis: return '...'
+            s = sc(v, flow=True)
+            if s is not None: return s
+            m = st(v)
+            if m is not None:
+                return tagged(m[0], '{' + ', '.join(sc(k, True) + ': ' + node_flow(x) for k, x in sorted(m[1].items())) + '}')
+            m = it(v)
+            if m is not None: return tagged(m[0], '[' + ', '.join(node_flow(x) for x in m[1]) + ']')
+            return sc(repr(v), flow=True)
+
+        def node_block(v, ind, out, in_seq=False):
+            """ Appends lines of ``v`` to ``out``. First line continues the current (key or dash) line.  """
+            if v is Ellipsis: out[-1] += ' ...'; return
+            s = sc(v)
+            if s is not None: out[-1] += ' ' + s; return
+            m = st(v)
+            if m is not None:
+                tag, d = m
+                if not d: out[-1] += ' ' + tagged(tag, '{}'); return
+                first = True
+                if tag: out[-1] += ' ' + tag
+                for k, x in sorted(d.items()):
+                    if first and in_seq and not tag: out[-1] += ' ' + sc(k) + ':'    # "- key: value"
+                    else: out.append(' ' * ind + sc(k) + ':')
+                    first = False
+                    node_block(x, ind + 2, out) if st(x) is not None else node_block(x, ind, out)
+                return
+            m = it(v)
+            if m is not None:
+                tag, xs = m
+                if not xs: out[-1] += ' ' + tagged(tag, '[]'); return
+                if tag: out[-1] += ' ' + tag
+                for i, x in enumerate(xs):
+                    if i == 0 and in_seq and not tag: out[-1] += ' -'      # "- - value"
+                    else: out.append(' ' * ind + '-')
+                    node_block(x, ind + 2, out, in_seq=True)
+                return
+            out[-1] += ' ' + sc(repr(v))
+
+        if flow: return node_flow(v)
+        out = ['']
+        node_block(v, 0, out)
+        return '\n'.join(out).lstrip() + '\n'
+
     def __repr__(self):
         return self.full_spec(print_as_line=False)
 
@@ -0,0 +1,291 @@
+import math
+import time
+import numpy as np
+
+try: from qfrm.Scenario import *  # production:  if qfrm package is installed
+except:   from Scenario import *  # development: if not installed and running from source
+try: from qfrm.Scenario import _shifted
+except:   from Scenario import _shifted
+
+
+class VaR:
+    """ Value at risk (VaR) and expected shortfall (ES) of an option (or a ``Portfolio``) over a horizon,
+    from its profits and losses (P&L) under historical or simulated market scenarios.
+
+    A scenario is a joint move of risk factors over the horizon: relative change of spot price ``S0``,
+    absolute changes of volatility ``vol`` and risk free rate ``rf_r``. Time to expiry of every option shrinks
+    by the horizon. Each factor is either common to all positions (an array with one value per scenario)
+    or given per underlying (a dictionary mapping ``Stock`` objects to arrays).
+
+    P&L is computed by full revaluation or, for speed, by delta-gamma(-vega-rho-theta) approximation.
+    Scenarios are revalued in batches:
+
+    - like contracts with a vectorized pricer (``Portfolio.batch_pricers``, ex. European BS, American LT) are priced
+      in one call per batch of scenarios;
+    - other positions (ex. exotics, LT, MC, FD pricing) are repriced scenario by scenario,
+      with batches spread over a pool of worker processes (see ``MonteCarlo.pmap()``).
+
+    Run time of every batch is recorded in ``timings``.
+
+    Examples
+    --------
+    A call (1000 contracts) under 10000 simulated daily moves of the stock:
+
+    >>> from qfrm import *
+    >>> o = European(ref=Stock(S0=42, vol=.2), right='call', K=40, T=.5, rf_r=.1)
+    >>> r = VaR.monte_carlo(Portfolio([(o, 1000)]), nscenarios=10000, rng_seed=0).calc(alpha=(.95, .99))
+    >>> r
+    <VaR of 10000 scenarios, full BS: VaR(99%) 918.54, ES(99%) 1031.49>
+    >>> print([round(r.var[a], 2) for a in (.95, .99)], [round(r.es[a], 2) for a in (.95, .99)])
+    [667.43, 918.54] [816.53, 1031.49]
+
+    Delta-gamma approximation is close for small moves (the largest error is about 1% of P&L):
+
+    >>> r2 = VaR.monte_carlo(Portfolio([(o, 1000)]), nscenarios=10000, rng_seed=0).calc(mode='delta-gamma')
+    >>> round(r2.var[.99], 2), float(np.abs(r2.pnl - r.pnl).max().round(2))
+    (921.02, 10.86)
+
+    Historical simulation from a series of prices (here, a made-up one) and run time per batch of scenarios:
+
+    >>> prices = 42 * np.exp(np.cumsum(np.random.RandomState(1).normal(0, .012, 501)))
+    >>> r = VaR.historical(o, prices).calc(batch_size=200)
+    >>> r.nscenarios, [t['nscenarios'] for t in r.timings], round(r.var[.99], 4)
+    (500, [200, 200, 100], 0.8751)
+
+    A barrier option (repriced in every scenario) in a portfolio, revalued on a pool of 2 worker processes:
+
+    >>> s = Stock(S0=50, vol=.25)
+    >>> p = Portfolio([Barrier(ref=s, right='call', K=45, T=2, rf_r=.1)], desc='barrier').add(o, qty=-1)
+    >>> r = VaR.monte_carlo(p, nscenarios=400, rng_seed=1).calc(batch_size=100, nworkers=2, H=35, knock='down', dir='out')
+    >>> round(r.var[.99], 4), len(r.timings), all(t['seconds'] > 0 for t in r.timings)
+    (1.8411, 4, True)
+    """
+    modes = ('full', 'delta-gamma')
+
+    def __init__(self, obj, S0=None, vol=None, rf_r=None, horizon=1/252, desc=None):
+        """ Constructor.
+
+        Parameters
+        ----------
+        obj : OptionValuation, Portfolio
+            an option of any class or a portfolio of positions
+        S0 : array_like, dict, optional
+            relative changes of spot prices, one per scenario; or a dictionary of these, keyed by underlyings
+        vol : array_like, dict, optional
+            absolute changes of volatilities (same layout as ``S0``)
+        rf_r : array_like, dict, optional
+            absolute changes of risk free rates (same layout as ``S0``)
+        horizon : float
+            VaR horizon (in years), by which times to expiry of options shrink. Default: 1 trading day.
+        desc : str, optional
+            description of scenarios
+        """
+        assert isinstance(obj, (OptionValuation, Portfolio)), 'Ooops. VaR is computed for an option or a Portfolio'
+        arr = lambda x: np.asarray(x, dtype=float).ravel()
+        self.shifts = {k: None if v is None else ({u: arr(x) for u, x in v.items()} if isinstance(v, dict) else arr(v))
+                       for k, v in (('S0', S0), ('vol', vol), ('rf_r', rf_r))}
+        sizes = {x.size for v in self.shifts.values() if v is not None for x in (v.values() if isinstance(v, dict) else [v])}
+        assert len(sizes) == 1, 'Ooops. Please supply the same (positive) number of scenarios of every risk factor'
+        self.portfolio = obj if isinstance(obj, Portfolio) else Portfolio([obj])
+        self.nscenarios, self.horizon, self.desc = sizes.pop(), horizon, desc
+        self.pnl = self.base = self.var = self.es = self.timings = self.method = self.mode = self.elapsed = None
+
+    def __repr__(self):
+        s = '<VaR of {} scenarios'.format(self.nscenarios)
+        if self.pnl is None: return s + '>'
+        a = max(self.var)
+        return s + ', {} {}: VaR({:g}%) {:.2f}, ES({:g}%) {:.2f}>'.format(self.mode, self.method, 100 * a, self.var[a],
+                                                                        100 * a, self.es[a])
+
+    @classmethod
+    def historical(cls, obj, prices, vols=None, rates=None, lag=1, horizon=None, desc='historical'):
+        """ Scenarios of historical changes of market specs over ``lag`` observations (overlapping, if ``lag > 1``).
+
+        Parameters
+        ----------
+        obj : OptionValuation, Portfolio
+            an option of any class or a portfolio of positions
+        prices : array_like, dict
+            historical prices of the underlying (common to all positions) or a dictionary of these, keyed by underlyings
+        vols, rates : array_like, dict, optional
+            historical (implied) volatilities and risk free rates (same layout as ``prices``)
+        lag : int
+            number of observations (ex. days) over which changes are taken
+        horizon : float, optional
+            VaR horizon (in years). Default: ``lag`` trading days.
+
+        Returns
+        -------
+        VaR
+        """
+        ret = lambda x: x[lag:] / x[:-lag] - 1
+        diff = lambda x: x[lag:] - x[:-lag]
+        f = lambda g, x: None if x is None else ({u: g(np.asarray(v, dtype=float)) for u, v in x.items()}
+                                                if isinstance(x, dict) else g(np.asarray(x, dtype=float)))
+        return cls(obj, S0=f(ret, prices), vol=f(diff, vols), rf_r=f(diff, rates),
+                   horizon=lag / 252 if horizon is None else horizon, desc=desc)
+
+    @classmethod
+    def monte_carlo(cls, obj, nscenarios=10000, horizon=1/252, corr=None, vol_of_vol=0., rng_seed=None,
+                    desc='Monte Carlo'):
+        """ Scenarios of simulated moves of underlyings: lognormal (driftless) with their own volatilities,
+        correlated by ``corr``. Volatilities optionally move by normal shocks.
+
+        Parameters
+        ----------
+        obj : OptionValuation, Portfolio
+            an option of any class or a portfolio of positions on stocks (``Stock`` with a single price each)
+        nscenarios : int
+            number of scenarios
+        horizon : float
+            VaR horizon (in years). Default: 1 trading day.
+        corr : array_like, optional
+            correlation matrix of underlyings (in order of their first appearance among positions)
+        vol_of_vol : float
+            annual volatility of absolute changes of volatilities. Default: volatilities are fixed.
+        rng_seed : int, optional
+            seed of random number generator (``numpy.random.RandomState``)
+
+        Returns
+        -------
+        VaR
+        """
+        p = obj if isinstance(obj, Portfolio) else Portfolio([obj])
+        refs = []
+        for pos in p.positions:
+            r = pos['opt'].ref
+            assert isinstance(r, Stock) and np.ndim(r.S0) == 0, 'Ooops. Scenarios are simulated for single stocks only'
+            if not any(r is x for x in refs): refs.append(r)
+
+        rng, k, sqrt_h = np.random.RandomState(rng_seed), len(refs), math.sqrt(horizon)
+        C = np.eye(k) if corr is None else np.asarray(corr, dtype=float)
+        z = rng.standard_normal((nscenarios, k)).dot(np.linalg.cholesky(C).T)
+        vol = np.array([r.vol for r in refs], dtype=float)
+        ret = np.exp(-.5 * vol ** 2 * horizon + vol * sqrt_h * z) - 1
+        dvol = np.maximum(vol_of_vol * sqrt_h * rng.standard_normal((nscenarios, k)), 1e-4 - vol) if vol_of_vol else None
+
+        by_ref = lambda x: None if x is None else (x[:, 0] if k == 1 else {r: x[:, j] for j, r in enumerate(refs)})
+        return cls(p, S0=by_ref(ret), vol=by_ref(dvol), horizon=horizon, desc=desc)
+
+    @staticmethod
+    def var_es(pnl, alpha=.99):
+        """ VaR and ES at confidence level ``alpha``: a quantile of losses and the mean of losses beyond it.
+
+        Parameters
+        ----------
+        pnl : array_like
+            profits and losses of scenarios
+        alpha : float
+            confidence level, ex. ``.99``
+
+        Returns
+        -------
+        tuple
+            ``(VaR, ES)``, both positive for losses
+
+        Examples
+        --------
+        >>> VaR.var_es(np.arange(-50, 50), alpha=.95)
+        (45.05, 48.0)
+        """
+        loss = -np.asarray(pnl, dtype=float)
+        var = float(np.quantile(loss, alpha))
+        return var, float(loss[loss >= var].mean())
+
+    def calc(self, method='BS', alpha=(.95, .99), mode='full', batch_size=1000, nworkers=None, **kwargs):
+        """ Revalues the portfolio in all scenarios and computes VaR and ES.
+
+        Parameters
+        ----------
+        method : {'BS', 'LT', 'MC', 'FD'}
+            pricing method of positions which do not specify their own (see ``Portfolio.add()``)
+        alpha : float, tuple of float
+            confidence level(s)
+        mode : {'full', 'delta-gamma'}
+            full revaluation or second order approximation of P&L by greeks of positions (see ``Portfolio.calc_px()``):
+            ``delta dS + gamma dS^2 / 2 + vega dvol + rho drf_r + theta horizon``
+        batch_size : int
+            number of scenarios revalued at once (and timed)
+        nworkers : int, optional
+            number of worker processes for full revaluation. ``None`` revalues batches in this process, ``-1`` uses all CPUs.
+        kwargs : optional
+            pricing parameters (ex. ``nsteps``, ``npaths``, ``H``) of positions which do not override them
+
+        Returns
+        -------
+        self : VaR
+            ``pnl`` (array of P&L of scenarios), ``base`` (current value), ``var`` and ``es`` (dictionaries keyed
+            by confidence levels), ``timings`` (list of dictionaries with ``batch``, ``nscenarios``, ``seconds``
+            and ``per_scenario`` run time of every batch of scenarios) and ``elapsed`` (total run time, in seconds)
+        """
+        assert mode in self.modes, 'Ooops. VaR mode must be one of ' + ', '.join(self.modes)
+        t0, p, n = time.perf_counter(), self.portfolio, self.nscenarios
+        batches = [slice(i, min(i + int(batch_size), n)) for i in range(0, n, int(batch_size))]
+
+        if mode == 'full':
+            self.base = p.calc_px(method=method, **kwargs).px_spec.px
+            groups = p.groups(method, **kwargs)
+            assert all(pos['opt'].T > self.horizon for g in groups.values() for _, pos, _ in g), \
+                'Ooops. All options must expire after VaR horizon'
+            job = lambda sl: self._timed(self._revalue, groups, sl)
+            out = [job(sl) for sl in batches] if nworkers is None else pmap(job, batches, nworkers)
+            out = [(v - self.base, s) for v, s in out]
+        else:
+            self.base = p.calc_px(method=method, greeks=True, **kwargs).px_spec.px
+            out = [self._timed(self._approx, sl) for sl in batches]
+
+        self.pnl = np.concatenate([v for v, _ in out])
+        self.timings = [dict(batch=k, nscenarios=v.size, seconds=s, per_scenario=s / v.size)
+                        for k, (v, s) in enumerate(out)]
+        self.var, self.es = {}, {}
+        for a in np.atleast_1d(alpha):
+            self.var[float(a)], self.es[float(a)] = self.var_es(self.pnl, a)
+        self.method, self.mode, self.elapsed = method, mode, time.perf_counter() - t0
+        return self
+
+    @staticmethod
+    def _timed(f, *args):
+        """ Result of ``f(*args)`` and its run time (in seconds).  """
+        t = time.perf_counter()
+        out = f(*args)
+        return out, time.perf_counter() - t
+
+    def _factor(self, name, opt, sl):
+        """ Changes of risk factor ``name`` of the underlying of ``opt`` in scenarios ``sl`` (zeros, if not supplied).  """
+        f = self.shifts[name]
+        if f is None: return np.zeros(len(range(*sl.indices(self.nscenarios))))
+        if not isinstance(f, dict): return f[sl]
+        assert opt.ref in f, 'Ooops. Scenarios of {} are missing for an underlying of {} option'.format(name, opt.style)
+        return f[opt.ref][sl]
+
+    def _revalue(self, groups, sl):
+        """ Portfolio values in scenarios ``sl``: like contracts are priced by a vectorized pricer, others one by one.  """
+        v = 0.
+        for (cls, m, _), group in groups.items():
+            opts = [pos['opt'] for _, pos, _ in group]
+            qty = np.array([pos['qty'] for _, pos, _ in group])
+            pricer = self.portfolio.batch_pricers.get((cls, m))
+            if pricer is not None:
+                r = OptionSpec.to_records([OptionSpec.from_option(o) for o in opts])
+                col = lambda k: r[k][:, None]
+                sh = lambda k: np.array([self._factor(k, o, sl) for o in opts])    # (positions, scenarios)
+                sp = dict(S0=col('S0') * (1 + sh('S0')), vol=col('vol') + sh('vol'), rf_r=col('rf_r') + sh('rf_r'),
+                          T=col('T') - self.horizon, K=col('K'), q=col('q'), frf_r=col('frf_r'), right=col('right'))
+                v = v + qty.dot(pricer(sp, False, **group[0][2]).px)
+            else:
+                for q, o, (_, _, kw) in zip(qty, opts, group):
+                    f = zip(*(self._factor(k, o, sl) for k in ('S0', 'vol', 'rf_r')))
+                    v = v + q * np.array([_shifted(o, S0=a, vol=b, rf_r=c, T=-self.horizon).calc_px(method=m, **kw).px_spec.px
+                                          for a, b, c in f])
+        return v
+
+    def _approx(self, sl):
+        """ Delta-gamma approximation of portfolio P&L in scenarios ``sl``, from greeks saved by ``Portfolio.calc_px()``.  """
+        v = 0.
+        for pos, rec in zip(self.portfolio.positions, self.portfolio.px_spec.positions):
+            o, g = pos['opt'], rec['greeks']
+            S0 = o.ref.S0[0] if isinstance(o.ref.S0, tuple) else o.ref.S0     # multi-asset: all spots move together
+            dS = S0 * self._factor('S0', o, sl)
+            v = v + g['delta'] * dS + .5 * g['gamma'] * dS ** 2 + g['vega'] * self._factor('vol', o, sl) \
+                + g['rho'] * self._factor('rf_r', o, sl) + g['theta'] * self.horizon
+        return v
@@ -102,7 +102,7 @@ class VarianceSwap(European):
             Andy Liao <Andy.Liao@rice.edu>
         """
         self.save2px_spec(L_Var=L_Var, Var_K=Var_K, **kwargs)
-        return getattr(self, '_calc_' + self.px_spec.method.upper())()
+        return self._dispatch_px()
 
 
     def _calc_BS(self):
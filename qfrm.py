@@ -1,10 +1,24 @@
 """ Development mode.
 These imports run in development mode (when qfrm package is not installed)
 User can use    'from qfrm import *'   to access underlying classes (in development or production).
+
+Plotting (matplotlib, pandas), YAML printing and scipy-dependent methods import their dependencies on first use.
+So, pricing with Black-Scholes formulas only needs numpy (see ``Benchmark.import_time()`` for import time):
+
+>>> import os, subprocess, sys
+>>> code = ('import sys; from qfrm import *; '
+...         'European(ref=Stock(S0=42, vol=.2), right="call", K=40, T=.5, rf_r=.1).pxBS(); '
+...         'print(*[m in sys.modules for m in ("matplotlib", "pandas", "scipy", "yaml")])')
+>>> out = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)))
+>>> [x.decode() for x in out.split()]      # heavy packages are not loaded
+['False', 'False', 'False', 'False']
 """
 
 from Util import *
 from OptionValuation import *
+from Lattice import *
+from MonteCarlo import *
+from FiniteDifference import *
 
 from European import *
 from American import *
@@ -29,4 +43,6 @@ from Shout import *
 from Spread import *
 from VarianceSwap import *
 
-
+from Portfolio import *
+from Scenario import *
+from VaR import *